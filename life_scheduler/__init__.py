@@ -1 +1,38 @@
-from .algorithms import Task, TaskList
\ No newline at end of file
+import importlib
+
+# Public API -> submodule that defines it. Submodules are only imported on
+# first attribute access (PEP 562), so `import life_scheduler` stays cheap.
+_exports = {
+    'Task': 'task',
+    'TaskTable': 'table',
+    'Scheduler': 'scheduler',
+    'ScheduledTasks': 'scheduler',
+    'RRScheduler': 'scheduler',
+    'SJFScheduler': 'scheduler',
+    'LJFScheduler': 'scheduler',
+    'FCFSScheduler': 'scheduler',
+    'EDFScheduler': 'scheduler',
+    'WSPTScheduler': 'scheduler',
+    'PriorityScheduler': 'scheduler',
+    'StrideScheduler': 'scheduler',
+    'MLFQScheduler': 'scheduler',
+    'get_scheduler_from_string': 'scheduler',
+    'Metrics': 'metrics',
+    'compare_schedulers': 'compare',
+}
+
+__all__ = list(_exports)
+
+
+def __getattr__(name):
+    if name not in _exports:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+    module = importlib.import_module('.' + _exports[name], __name__)
+    value = getattr(module, name)
+    # Cache it so __getattr__ is not hit again
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,164 @@
+import bisect
+import math
+
+# When work can happen. A Calendar keeps its open time as disjoint intervals
+# [start, end) in two sorted lists, starts and ends, so "when does it open
+# next" and "until when is it open" are bisections, O(log n). Recurring rules
+# (working hours, a weekly slot) are expanded lazily, one period at a time
+# and only as far as they have been asked about, so a year-long horizon costs
+# nothing until the clock gets there.
+#
+# Times are in the scheduler's units; the DAY and WEEK helpers take them to
+# be minutes, like workload.Diurnal. Day 0 starts at time 0.
+
+DAY = 1440
+WEEK = 7 * DAY
+
+
+class Recurring:
+    # Windows [start, end) repeating every `period`, relative to the start
+    # of each period (shifted by `origin`). A window may run past the end of
+    # the period, e.g. a night shift.
+    def __init__(self, windows, period=DAY, origin=0):
+        self.windows = sorted((start, end) for start, end in windows)
+        assert self.windows, "A recurring rule needs at least one window"
+        assert all(0 <= start < end <= start + period for start, end in self.windows), \
+            "Windows must be non-empty, start within the period and last at most one period"
+        self.period = period
+        self.origin = origin
+
+    def expand(self, low, high):
+        # The windows overlapping [low, high), clipped to it. Starting a
+        # period early catches windows spilling over from it.
+        period = self.period
+        base = self.origin + (math.floor((low - self.origin) / period) - 1) * period
+        while base < high:
+            for start, end in self.windows:
+                start += base
+                end += base
+                if end > low and start < high:
+                    yield max(start, low), min(end, high)
+            base += period
+
+
+def daily(start, end):
+    # e.g. daily(9 * 60, 17 * 60) for nine to five every day
+    return Recurring([(start, end)], DAY)
+
+
+def weekly(start, end, days=range(5)):
+    # The same hours on the given days of each week, by default days 0-4
+    return Recurring([(day * DAY + start, day * DAY + end) for day in days], WEEK)
+
+
+def merge_intervals(intervals):
+    # Sorted, disjoint starts and ends of the union of `intervals`
+    starts, ends = [], []
+    for start, end in sorted(intervals):
+        if start >= end:
+            continue
+        if ends and start <= ends[-1]:
+            ends[-1] = max(ends[-1], end)
+        else:
+            starts.append(start)
+            ends.append(end)
+    return starts, ends
+
+
+class Calendar:
+    # Open time is the union of `intervals` and of the windows of `rules`,
+    # less the `blocked` intervals (meetings, holidays). Without intervals
+    # and rules every time is open except the blocked ones. Time before
+    # `start` is not expanded and counts as closed.
+    def __init__(self, intervals=(), rules=(), blocked=(), start=0):
+        self.rules = list(rules)
+        if not intervals and not self.rules:
+            intervals = [(-math.inf, math.inf)]
+        self.interval_starts, self.interval_ends = merge_intervals(intervals)
+        self.blocked_starts, self.blocked_ends = merge_intervals(blocked)
+        # Without rules everything is expanded at once
+        self.chunk = max((rule.period for rule in self.rules), default=math.inf)
+        # Past the last explicit or blocked boundary only the rules remain,
+        # and each of them opens at least once per chunk
+        self.settled = max([bound for bound in (self.interval_starts + self.interval_ends
+                                                + self.blocked_starts + self.blocked_ends)
+                            if abs(bound) != math.inf], default=start)
+        self.starts = []  # The expanded open intervals
+        self.ends = []
+        self.horizon = start  # Expanded up to here
+
+    def extend(self, until):
+        # Expand the open intervals up to `until`, a chunk at a time
+        while self.horizon < until:
+            low = self.horizon
+            high = low + self.chunk
+            pieces = []
+            index = bisect.bisect_right(self.interval_ends, low)
+            while index < len(self.interval_starts) and self.interval_starts[index] < high:
+                pieces.append((max(self.interval_starts[index], low),
+                               min(self.interval_ends[index], high)))
+                index += 1
+            for rule in self.rules:
+                pieces.extend(rule.expand(low, high))
+            for start, end in zip(*merge_intervals(pieces)):
+                self.add_open(start, end)
+            self.horizon = high
+
+    def add_open(self, start, end):
+        # Appends [start, end) less the blocked intervals. Pieces come in
+        # order, so each one extends or follows the last.
+        index = bisect.bisect_right(self.blocked_ends, start)
+        while index < len(self.blocked_starts) and self.blocked_starts[index] < end:
+            if self.blocked_starts[index] > start:
+                self.append(start, self.blocked_starts[index])
+            start = max(start, self.blocked_ends[index])
+            index += 1
+        if start < end:
+            self.append(start, end)
+
+    def append(self, start, end):
+        if self.ends and start <= self.ends[-1]:
+            self.ends[-1] = max(self.ends[-1], end)
+        else:
+            self.starts.append(start)
+            self.ends.append(end)
+
+    def find(self, time):
+        # Index of the first open interval ending after `time`, or None if
+        # there is none
+        limit = max(time, self.settled) + self.chunk
+        while True:
+            index = bisect.bisect_right(self.ends, time)
+            if index < len(self.ends):
+                return index
+            if self.horizon >= limit:
+                return None
+            self.extend(self.horizon + self.chunk)
+
+    def is_open(self, time):
+        index = self.find(time)
+        return index is not None and self.starts[index] <= time
+
+    def next_open(self, time):
+        # The first open time from `time` on: `time` itself when open,
+        # math.inf if the calendar never opens again
+        index = self.find(time)
+        if index is None:
+            return math.inf
+        return max(time, self.starts[index])
+
+    def open_until(self, time):
+        # When the open stretch containing `time` closes. If it runs past
+        # what is expanded, the end of that: the caller asks again then.
+        self.extend(time + self.chunk)
+        index = self.find(time)
+        assert index is not None and self.starts[index] <= time, f"Closed at {time}"
+        return self.ends[index]
+
+    def open_intervals(self, start, end):
+        # The open intervals overlapping [start, end), clipped to it
+        self.extend(end)
+        index = bisect.bisect_right(self.ends, start)
+        while index < len(self.starts) and self.starts[index] < end:
+            yield max(self.starts[index], start), min(self.ends[index], end)
+            index += 1
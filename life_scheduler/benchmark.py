@@ -0,0 +1,171 @@
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import sys
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+from .compare import POLICIES
+from .scheduler import get_scheduler_from_string
+from .workload import ARRIVALS, Workload
+
+# Throughput and memory of every policy, preemptive or not, over workload
+# sizes and arrival patterns. Each case runs in a fresh process so its peak
+# RSS is its own. Results can be saved as a baseline and later runs checked
+# against it:
+#   python -m life_scheduler.benchmark --save benchmarks/baseline.json
+#   python -m life_scheduler.benchmark --baseline benchmarks/baseline.json
+
+SIZES = [100, 1000, 10000]  # up to 1000000 with --sizes
+DISTRIBUTIONS = ["uniform", "poisson", "bursty", "batch"]
+
+# Slowdown tolerated before a metric counts as a regression. Wall time is
+# noisy and machine dependent, memory much less so.
+TOLERANCE = {'elapsed': 0.5, 'ticks_per_second': 0.5,
+             'peak_rss': 0.2, 'alloc_peak': 0.1, 'alloc_blocks': 0.1}
+
+
+def make_workload(distribution, num_tasks, seed=69):
+    # About one task every 5 time units on average, like random_workload
+    assert distribution in ARRIVALS, f"Unknown arrival distribution {distribution!r}"
+    return Workload(num_tasks, seed, ARRIVALS[distribution]()).tasks()
+
+
+def simulate(policy, preemptive, task_list):
+    # Returns the number of events handled
+    scheduler = get_scheduler_from_string(policy, preemptive)
+    scheduler.keep_slices = False
+    scheduler.load(task_list)
+    ticks = 0
+    while scheduler.num_unfinished:
+        scheduler.step()
+        ticks += 1
+    scheduler.scheduled_tasks.finalize()
+    return ticks
+
+
+def peak_rss():
+    # In bytes; ru_maxrss is in kilobytes on Linux but bytes on macOS
+    if resource is None:
+        return math.nan
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def run_case(case):
+    policy, preemptive, distribution, num_tasks, allocations = case
+    task_list = make_workload(distribution, num_tasks)
+    start = time.perf_counter()
+    ticks = simulate(policy, preemptive, task_list)
+    elapsed = time.perf_counter() - start
+    result = {'elapsed': elapsed, 'ticks': ticks,
+              'ticks_per_second': ticks / elapsed if elapsed else math.inf,
+              'peak_rss': peak_rss()}
+    if allocations:
+        # A second run under tracemalloc, which is too slow to time
+        task_list = make_workload(distribution, num_tasks)
+        blocks = sys.getallocatedblocks()
+        tracemalloc.start()
+        simulate(policy, preemptive, task_list)
+        result['alloc_peak'] = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        # Blocks still allocated afterwards, i.e. retained by the run
+        result['alloc_blocks'] = sys.getallocatedblocks() - blocks
+    return case_name(policy, preemptive, distribution, num_tasks), result
+
+
+def case_name(policy, preemptive, distribution, num_tasks):
+    return f'{policy}/{"preemptive" if preemptive else "non-preemptive"}/{distribution}/{num_tasks}'
+
+
+def run_benchmarks(policies=POLICIES, preemptive=(False, True),
+                   distributions=DISTRIBUTIONS, sizes=SIZES, allocations=True,
+                   isolate=True):
+    # Returns {case name: metrics}. With isolate=False everything runs in
+    # this process, and peak RSS is only an upper bound.
+    cases = [(policy, mode, distribution, num_tasks, allocations)
+             for num_tasks in sizes
+             for distribution in distributions
+             for policy in policies
+             for mode in preemptive]
+    if not isolate:
+        return dict(run_case(case) for case in cases)
+    results = {}
+    # One process per case, one at a time, so neither RSS nor timings leak
+    # from one case into the next
+    with multiprocessing.Pool(1, maxtasksperchild=1) as pool:
+        for name, result in pool.imap(run_case, cases):
+            results[name] = result
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance=TOLERANCE):
+    # List of (case, metric, baseline value, new value) that got worse by
+    # more than the tolerance. Cases missing on either side are skipped.
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric, limit in tolerance.items():
+            old, new = baseline[name].get(metric), result.get(metric)
+            if old is None or new is None or not old > 0:
+                continue
+            if metric == 'ticks_per_second':
+                worse = new < old / (1 + limit)
+            else:
+                worse = new > old * (1 + limit)
+            if worse:
+                regressions.append((name, metric, old, new))
+    return regressions
+
+
+def print_results(results):
+    print(f'{"case":<40} {"time (s)":>9} {"ticks/s":>10} {"peak RSS (MB)":>14} '
+          f'{"alloc peak (MB)":>16}')
+    for name, r in results.items():
+        print(f'{name:<40} {r["elapsed"]:>9.3f} {r["ticks_per_second"]:>10.0f} '
+              f'{r["peak_rss"] / 2**20:>14.1f} {r.get("alloc_peak", math.nan) / 2**20:>16.2f}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Benchmark every scheduling policy over workload sizes and arrival patterns.')
+    parser.add_argument('--policies', default=','.join(POLICIES))
+    parser.add_argument('--distributions', default=','.join(DISTRIBUTIONS))
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)),
+                        help='task counts, e.g. 100,1000,10000,100000,1000000')
+    parser.add_argument('--no-allocations', action='store_true',
+                        help='skip the (slow) tracemalloc pass')
+    parser.add_argument('--save', metavar='FILE', help='store the results as a baseline')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare against a stored baseline, exit 1 on regressions')
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.policies.split(','), (False, True),
+                             args.distributions.split(','),
+                             [int(size) for size in args.sizes.split(',')],
+                             allocations=not args.no_allocations)
+    print_results(results)
+    if args.save:
+        os.makedirs(os.path.dirname(args.save) or '.', exist_ok=True)
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=1, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare_to_baseline(results, baseline)
+        for name, metric, old, new in regressions:
+            print(f'REGRESSION {name} {metric}: {old:.4g} -> {new:.4g}')
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
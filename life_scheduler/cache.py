@@ -0,0 +1,147 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+from .dependencies import prerequisite_ids
+from .scheduler import get_scheduler_from_string
+from .table import COLUMNS, TaskTable
+
+# Memoized schedules. A front end asks for the same schedule over and over,
+# once per page view; the cache keys each result by a fingerprint of the
+# task attributes and the (policy, preemptive) choice, so only a change to
+# the tasks or the policy schedules again.
+#
+# Results stay in memory, least recently used first out, within a number of
+# entries and optionally a total number of slices (a proxy for their size).
+# With a `directory` they are also written there and looked up after a
+# memory miss, so they survive eviction and restarts.
+
+# Attributes that decide a schedule, besides the prerequisites
+FINGERPRINT_FIELDS = [column for column, _ in COLUMNS] + ['remaining_time', 'name']
+
+
+def fingerprint(task_list, policy, preemptive):
+    # Stable across processes and runs, unlike hash(): a BLAKE2 digest of
+    # the policy and every task's attributes, in list order. A TaskTable is
+    # hashed column by column, so it doesn't get the key of the same tasks
+    # as a list.
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f'{policy}|{bool(preemptive)}|'.encode())
+    if isinstance(task_list, TaskTable):
+        for column, _ in COLUMNS:
+            values = task_list.columns[column]
+            digest.update(f'{column}:{values.typecode}:{len(values)}|'.encode())
+            digest.update(values.tobytes())
+        digest.update(repr(task_list.name).encode())
+        digest.update(repr(task_list.prerequisite).encode())
+    else:
+        for task in task_list:
+            record = tuple(getattr(task, field) for field in FINGERPRINT_FIELDS)
+            digest.update(repr((record, prerequisite_ids(task))).encode())
+            digest.update(b'\n')
+    return digest.hexdigest()
+
+
+class ScheduleCache:
+    # `schedule(task_list, policy, preemptive)` gives the finalized
+    # ScheduledTasks of get_scheduler_from_string(policy, preemptive), from
+    # the cache when it can. Results are shared between callers: read them,
+    # don't modify them. Safe to use from several threads.
+    def __init__(self, max_entries=128, max_slices=None, directory=None):
+        assert max_entries >= 1, "The cache needs room for at least one schedule"
+        self.max_entries = max_entries
+        self.max_slices = max_slices
+        self.directory = directory
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+        self.entries = OrderedDict()  # key -> ScheduledTasks, oldest use first
+        self.num_slices = 0
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def schedule(self, task_list, policy, preemptive=False):
+        key = fingerprint(task_list, policy, preemptive)
+        scheduled = self.get(key)
+        if scheduled is None:
+            scheduler = get_scheduler_from_string(policy, preemptive)
+            scheduler.schedule(task_list)
+            scheduled = scheduler.scheduled_tasks
+            with self.lock:
+                self.misses += 1
+            self.put(key, scheduled)
+        return scheduled
+
+    def get(self, key):
+        with self.lock:
+            scheduled = self.entries.get(key)
+            if scheduled is not None:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return scheduled
+        if self.directory is None:
+            return None
+        scheduled = self.read(key)
+        if scheduled is not None:
+            with self.lock:
+                self.disk_hits += 1
+            self.put(key, scheduled, write=False)
+        return scheduled
+
+    def put(self, key, scheduled, write=True):
+        # Indexed before it is shared, so timeline queries on it only read
+        scheduled.index()
+        if write and self.directory is not None:
+            self.write(key, scheduled)
+        with self.lock:
+            if key in self.entries:
+                self.num_slices -= len(self.entries.pop(key).slices)
+            self.entries[key] = scheduled
+            self.num_slices += len(scheduled.slices)
+            # The newest entry always stays, even if it alone is over budget
+            while len(self.entries) > 1 and (
+                    len(self.entries) > self.max_entries or
+                    (self.max_slices is not None and self.num_slices > self.max_slices)):
+                _, evicted = self.entries.popitem(last=False)
+                self.num_slices -= len(evicted.slices)
+                self.evictions += 1
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.schedule')
+
+    def read(self, key):
+        # A missing or unreadable file is a miss
+        try:
+            with open(self.path(key), 'rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def write(self, key, scheduled):
+        # Written aside and renamed into place, so readers never see half
+        path = self.path(key)
+        temporary = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(temporary, 'wb') as f:
+            pickle.dump(scheduled, f, pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary, path)
+
+    def clear(self):
+        # Empties memory; the directory is left alone
+        with self.lock:
+            self.entries.clear()
+            self.num_slices = 0
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {'hits': self.hits,
+                    'disk_hits': self.disk_hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0,
+                    'entries': len(self.entries),
+                    'slices': self.num_slices}
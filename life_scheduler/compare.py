@@ -0,0 +1,134 @@
+import argparse
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .dependencies import has_prerequisites
+from .scheduler import get_scheduler_from_string, random_workload
+from .table import COLUMNS, TaskTable
+
+POLICIES = ["FCFS", "EDF", "RR", "SJF", "LJF", "WSPT", "PRIO", "STRIDE", "MLFQ"]
+
+# One row of the results table
+Result = namedtuple('Result', ['workload', 'policy', 'preemptive', 'num_tasks',
+                               'makespan', 'lateness', 'deadline_missed',
+                               'num_slices', 'elapsed'])
+
+
+def pack_tasks(task_list):
+    # Columnar copy of a task list, a TaskTable: its typed arrays pickle to a
+    # few bytes per task, instead of a whole Task object each. Ids and names
+    # are not sent: the tasks are numbered by row, since only per-run
+    # statistics come back.
+    assert not has_prerequisites(task_list), "Prerequisites are not packed"
+    columns = {column: [getattr(task, column) for task in task_list]
+               for column, _ in COLUMNS if column != 'id'}
+    columns['id'] = range(len(task_list))
+    return TaskTable(columns)
+
+
+def unpack_tasks(packed):
+    return packed.tasks()
+
+
+# Workloads installed in a worker process by `init_worker`
+worker_workloads = []
+
+
+def init_worker(packed):
+    # Each workload is pickled once per worker, not once per job
+    global worker_workloads
+    worker_workloads = packed
+
+
+def run_job(job):
+    # Runs in a worker process
+    workload, policy, preemptive = job
+    # Scheduled straight from the table: tasks are built as they arrive
+    task_list = worker_workloads[workload]
+    start = time.perf_counter()
+    scheduler = get_scheduler_from_string(policy, preemptive)
+    scheduler.schedule(task_list)
+    elapsed = time.perf_counter() - start
+    scheduled = scheduler.scheduled_tasks
+    return Result(workload, policy, preemptive, len(task_list),
+                  scheduled.makespan, scheduled.lateness,
+                  scheduled.deadline_missed, len(scheduled.slices), elapsed)
+
+
+def compare_schedulers(workloads, policies=POLICIES, preemptive=(False, True),
+                       max_workers=None):
+    # Run every combination and return the results table, ordered by
+    # workload, then policy, then preemptive mode. Jobs are spread over a
+    # process pool; max_workers=1 runs everything in this process.
+    packed = [pack_tasks(task_list) for task_list in workloads]
+    jobs = [(index, policy, mode)
+            for index in range(len(packed))
+            for policy in policies
+            for mode in preemptive]
+    if max_workers == 1:
+        init_worker(packed)
+        return [run_job(job) for job in jobs]
+
+    max_workers = max_workers or os.cpu_count()
+    # A few chunks per worker keeps the pool busy without paying an IPC
+    # round trip per job
+    chunksize = max(1, len(jobs) // (max_workers * 4))
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=init_worker,
+                             initargs=(packed,)) as executor:
+        return list(executor.map(run_job, jobs, chunksize=chunksize))
+
+
+def print_table(results):
+    print(f'{"workload":>8} {"policy":>6} {"preemptive":>10} {"tasks":>7} '
+          f'{"makespan":>10} {"lateness":>10} {"missed":>7} {"slices":>8} {"time (s)":>9}')
+    for r in results:
+        print(f'{r.workload:>8} {r.policy:>6} {str(r.preemptive):>10} {r.num_tasks:>7} '
+              f'{r.makespan:>10.1f} {r.lateness:>10.1f} {r.deadline_missed:>7g} '
+              f'{r.num_slices:>8} {r.elapsed:>9.3f}')
+
+
+def summarize(results):
+    # Average each metric over the workloads, per (policy, preemptive)
+    groups = {}
+    for r in results:
+        groups.setdefault((r.policy, r.preemptive), []).append(r)
+    summary = []
+    for (policy, preemptive), rows in groups.items():
+        n = len(rows)
+        summary.append(Result('mean', policy, preemptive,
+                              sum(r.num_tasks for r in rows) // n,
+                              sum(r.makespan for r in rows) / n,
+                              sum(r.lateness for r in rows) / n,
+                              sum(r.deadline_missed for r in rows) / n,
+                              sum(r.num_slices for r in rows) // n,
+                              sum(r.elapsed for r in rows) / n))
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Compare scheduling policies over random workloads.')
+    parser.add_argument('--workloads', type=int, default=10)
+    parser.add_argument('--tasks', type=int, default=100,
+                        help='tasks per workload')
+    parser.add_argument('--seed', type=int, default=69)
+    parser.add_argument('--policies', default=','.join(POLICIES))
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    parser.add_argument('--all', action='store_true',
+                        help='print every run instead of the per-policy means')
+    args = parser.parse_args(argv)
+
+    workloads = [random_workload(args.tasks, args.seed + i)
+                 for i in range(args.workloads)]
+    start = time.perf_counter()
+    results = compare_schedulers(workloads, args.policies.split(','),
+                                 max_workers=args.workers)
+    print_table(results if args.all else summarize(results))
+    print(f'{len(results)} runs in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+from .table import TaskTable
+
+
+class DependencyIndex:
+    # Precedence constraints between tasks (`Task.prerequisite`), as a DAG.
+    # Each task keeps a count of unfinished prerequisites (its in-degree) and
+    # each prerequisite the list of its dependents, so finishing a task
+    # releases its dependents in O(out-degree) instead of rescanning the
+    # pending tasks. Prerequisites are given as task ids or Task objects.
+    def __init__(self, task_list):
+        self.in_degree = {}  # task id -> number of unfinished prerequisites
+        self.successors = {}  # task id -> ids of the tasks waiting for it
+        self.waiting = {}  # task id -> arrived task with unmet prerequisites
+
+        for task in task_list:
+            assert task.id not in self.in_degree, f"Duplicate task id {task.id!r}"
+            self.in_degree[task.id] = 0
+            self.successors[task.id] = []
+        for task in task_list:
+            # A set: listing the same prerequisite twice is one edge
+            for prerequisite in set(prerequisite_ids(task)):
+                assert prerequisite in self.successors, \
+                    f"Unknown prerequisite {prerequisite!r} of task {task.id!r}"
+                self.successors[prerequisite].append(task.id)
+                self.in_degree[task.id] += 1
+        self.check_acyclic()
+
+    def check_acyclic(self):
+        # Kahn's algorithm: peel off tasks without prerequisites. Whatever
+        # can't be peeled off lies on or behind a cycle.
+        in_degree = dict(self.in_degree)
+        ready = [id for id, degree in in_degree.items() if degree == 0]
+        num_sorted = 0
+        while ready:
+            id = ready.pop()
+            num_sorted += 1
+            for successor in self.successors[id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+        blocked = [id for id, degree in in_degree.items() if degree > 0]
+        assert not blocked, f"Prerequisite cycle among tasks {blocked[:10]!r}"
+
+    def blocked(self, task):
+        # Tasks added after the index was built have no prerequisites
+        return self.in_degree.get(task.id, 0) > 0
+
+    def hold(self, task):
+        # `task` arrived but must wait for its prerequisites
+        self.waiting[task.id] = task
+
+    def release(self, task):
+        # `task` finished: return the waiting tasks it was the last
+        # prerequisite of
+        released = []
+        in_degree = self.in_degree
+        for successor in self.successors.get(task.id, ()):
+            in_degree[successor] -= 1
+            if in_degree[successor] == 0 and successor in self.waiting:
+                released.append(self.waiting.pop(successor))
+        return released
+
+    def checkpoint(self):
+        return dict(self.in_degree), dict(self.waiting)
+
+    def restore(self, state):
+        in_degree, waiting = state
+        self.in_degree = dict(in_degree)
+        self.waiting = dict(waiting)
+
+
+def prerequisite_ids(task):
+    return [getattr(prerequisite, 'id', prerequisite)
+            for prerequisite in task.prerequisite]
+
+
+def has_prerequisites(task_list):
+    if isinstance(task_list, TaskTable):
+        return task_list.prerequisite is not None
+    return any(task.prerequisite for task in task_list)
@@ -0,0 +1,87 @@
+import heapq
+import itertools
+
+# Kinds of simulation events
+ARRIVAL = 'arrival'
+COMPLETION = 'completion'
+QUANTUM_EXPIRY = 'quantum-expiry'
+CUT = 'cut'  # The running slice is cut short by the next arrival
+PAUSE = 'pause'  # The running slice reaches closed time in a calendar
+RESUME = 'resume'  # The scheduler's calendar opens again
+WAKE = 'wake'  # A task set aside until its own window opens
+
+
+class EventQueue:
+    # All pending simulation events in a single time-ordered heap.
+    # Entries are [time, seq, kind, task]: events at the same time come out
+    # in the order they were pushed. Cancelling is lazy, like ReadyQueue.
+    #
+    # Arrivals can also be given up front as a sequence of tasks sorted by
+    # arrival time, or any iterable of them. They stay out of the heap and
+    # are read one at a time, so a lazy sequence (e.g. a TaskTable) or a
+    # stream only builds each task as it comes up. They come out before heap
+    # events at the same time, as if they had been pushed first.
+    CANCELLED = object()
+
+    def __init__(self, events=(), arrivals=()):
+        self.counter = itertools.count()
+        # Bulk load in O(n) rather than n pushes
+        self.heap = [[time, next(self.counter), kind, task]
+                     for time, kind, task in events]
+        heapq.heapify(self.heap)
+        self.arrivals = arrivals
+        self.upcoming = iter(arrivals)
+        self.num_arrived = 0
+        self.next_arrival = next(self.upcoming, None)
+
+    def push(self, time, kind, task):
+        entry = [time, next(self.counter), kind, task]
+        heapq.heappush(self.heap, entry)
+        return entry
+
+    def cancel(self, entry):
+        # Safe to call on an entry that was already popped
+        entry[-1] = EventQueue.CANCELLED
+
+    def prune(self):
+        heap = self.heap
+        while heap and heap[0][-1] is EventQueue.CANCELLED:
+            heapq.heappop(heap)
+
+    def arrival_first(self):
+        # Whether the next event comes from `arrivals`
+        return self.next_arrival is not None and not (
+            self.heap and self.heap[0][0] < self.next_arrival.arrival_time)
+
+    def peek_time(self):
+        self.prune()
+        if self.arrival_first():
+            return self.next_arrival.arrival_time
+        return self.heap[0][0]
+
+    def pop(self):
+        self.prune()
+        if self.arrival_first():
+            task = self.next_arrival
+            self.num_arrived += 1
+            self.next_arrival = next(self.upcoming, None)
+            return task.arrival_time, ARRIVAL, task
+        time, _, kind, task = heapq.heappop(self.heap)
+        return time, kind, task
+
+    def __bool__(self):
+        self.prune()
+        return bool(self.heap) or self.next_arrival is not None
+
+    def __iter__(self):
+        # In time order. Only meant for printing/debugging, O(n log n)
+        events = [(time, 1, seq, kind, task) for time, seq, kind, task in self.heap
+                  if task is not EventQueue.CANCELLED]
+        if self.next_arrival is not None:
+            events.append((self.next_arrival.arrival_time, 0, -1, ARRIVAL, self.next_arrival))
+        if hasattr(self.arrivals, '__getitem__'):
+            # Not for a stream, which can't be looked into
+            for index in range(self.num_arrived + 1, len(self.arrivals)):
+                task = self.arrivals[index]
+                events.append((task.arrival_time, 0, index, ARRIVAL, task))
+        return ((time, kind, task) for time, _, _, kind, task in sorted(events, key=lambda e: e[:3]))
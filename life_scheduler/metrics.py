@@ -0,0 +1,189 @@
+import math
+
+
+class QuantileSketch:
+    # Streaming quantiles in bounded memory: values are counted in buckets
+    # whose bounds grow geometrically (as in DDSketch), so any quantile comes
+    # back within `relative_accuracy` of a true value. A few hundred buckets
+    # cover everything from milliseconds to years.
+    def __init__(self, relative_accuracy=0.01):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.positive = {}  # bucket index -> count
+        self.negative = {}  # the same, for -value
+        self.zeros = 0
+        self.count = 0
+
+    def add(self, value):
+        self.count += 1
+        if value > 0:
+            buckets = self.positive
+        elif value < 0:
+            buckets = self.negative
+            value = -value
+        else:
+            self.zeros += 1
+            return
+        index = math.ceil(math.log(value) / self.log_gamma)
+        buckets[index] = buckets.get(index, 0) + 1
+
+    def copy(self):
+        sketch = QuantileSketch.__new__(QuantileSketch)
+        sketch.__dict__.update(self.__dict__)
+        sketch.positive = dict(self.positive)
+        sketch.negative = dict(self.negative)
+        return sketch
+
+    def merge(self, other):
+        # Adds the values counted by `other`, a sketch of the same accuracy
+        assert other.gamma == self.gamma, "Sketches of different accuracy"
+        for buckets, others in ((self.positive, other.positive),
+                                (self.negative, other.negative)):
+            for index, count in others.items():
+                buckets[index] = buckets.get(index, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def bucket_value(self, index):
+        # Midpoint of (gamma^(index-1), gamma^index], relative to its width
+        return 2 * self.gamma ** index / (self.gamma + 1)
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        # Most negative first
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self.bucket_value(index)
+        seen += self.zeros
+        if seen > rank:
+            return 0
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self.bucket_value(index)
+        return self.bucket_value(max(self.positive))
+
+
+class Summary:
+    # Count, mean, min, max and quantiles of a stream of values
+    QUANTILES = (0.5, 0.9, 0.99)  # Reported by as_dict
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch()
+
+    def add(self, value):
+        self.count += 1
+        self.total += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+        self.sketch.add(value)
+
+    def copy(self):
+        summary = Summary.__new__(Summary)
+        summary.__dict__.update(self.__dict__)
+        summary.sketch = self.sketch.copy()
+        return summary
+
+    def merge(self, other):
+        # As if the values added to `other` had been added here
+        self.count += other.count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def mean(self):
+        return self.total / self.count if self.count else math.nan
+
+    def percentile(self, p):
+        # e.g. percentile(0.9), clamped to the exact min and max
+        if not self.count:
+            return math.nan
+        if p <= 0:
+            return self.min
+        if p >= 1:
+            return self.max
+        return min(max(self.sketch.quantile(p), self.min), self.max)
+
+    def as_dict(self):
+        summary = {'count': self.count, 'mean': self.mean,
+                   'min': self.min, 'max': self.max}
+        for p in Summary.QUANTILES:
+            summary[f'p{round(p * 100)}'] = self.percentile(p)
+        return summary
+
+
+class Metrics:
+    # Per-task statistics, accumulated as tasks finish, in bounded memory.
+    # Unlike the legacy ScheduledTasks fields these use finish times:
+    # - flow time: arrival -> finish
+    # - waiting time: flow time minus the time spent running
+    # - response time: arrival -> first dispatch
+    # - lateness: finish - deadline, positive when the deadline is missed
+    # plus the weighted objectives, with Task.priority as the weight:
+    # - weighted flow time: sum of priority * flow time
+    # - weighted tardiness: sum of priority * max(0, lateness)
+    def __init__(self):
+        self.num_finished = 0
+        self.weighted_flow_time = 0
+        self.weighted_tardiness = 0
+        self.makespan = 0  # Finish time of the last task
+        self.deadline_missed = 0
+        self.flow_time = Summary()
+        self.waiting_time = Summary()
+        self.response_time = Summary()
+        self.lateness = Summary()
+
+    def add(self, task, first_start, finish):
+        self.num_finished += 1
+        if finish > self.makespan:
+            self.makespan = finish
+        flow_time = finish - task.arrival_time
+        self.flow_time.add(flow_time)
+        self.weighted_flow_time += task.priority * flow_time
+        self.waiting_time.add(flow_time - task.estimated_time)
+        self.response_time.add(first_start - task.arrival_time)
+        lateness = finish - task.deadline
+        self.lateness.add(lateness)
+        if lateness > 0:
+            self.deadline_missed += 1
+            self.weighted_tardiness += task.priority * lateness
+
+    def merge(self, other):
+        # As if the tasks finished in `other` had finished here
+        self.num_finished += other.num_finished
+        self.weighted_flow_time += other.weighted_flow_time
+        self.weighted_tardiness += other.weighted_tardiness
+        self.makespan = max(self.makespan, other.makespan)
+        self.deadline_missed += other.deadline_missed
+        for name in ('flow_time', 'waiting_time', 'response_time', 'lateness'):
+            getattr(self, name).merge(getattr(other, name))
+
+    def copy(self):
+        metrics = Metrics.__new__(Metrics)
+        metrics.__dict__.update(self.__dict__)
+        for name in ('flow_time', 'waiting_time', 'response_time', 'lateness'):
+            setattr(metrics, name, getattr(self, name).copy())
+        return metrics
+
+    def as_dict(self):
+        return {'num_finished': self.num_finished,
+                'makespan': self.makespan,
+                'deadline_missed': self.deadline_missed,
+                'weighted_flow_time': self.weighted_flow_time,
+                'weighted_tardiness': self.weighted_tardiness,
+                'flow_time': self.flow_time.as_dict(),
+                'waiting_time': self.waiting_time.as_dict(),
+                'response_time': self.response_time.as_dict(),
+                'lateness': self.lateness.as_dict()}
@@ -0,0 +1,213 @@
+import argparse
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from .compare import POLICIES
+from .metrics import Summary
+from .scheduler import get_scheduler_from_string, random_workload
+from .table import TaskTable
+
+# Monte Carlo robustness: how does each policy fare when tasks don't take
+# their estimated_time? Every replication draws an actual duration for each
+# task and simulates the policy, which still only sees the estimates.
+#
+# Replication r draws from its own generator, seeded with (seed, r): results
+# don't depend on the number of workers, and all policies see the same
+# durations in a replication, which makes their differences less noisy.
+
+
+class LogNormalDuration:
+    # Actual duration = estimate * a log-normal factor whose median is
+    # `median` (1.1: a 10% overrun is typical) and whose spread is `sigma`.
+    # An unknown estimate (<= 0, e.g. the default -1) is drawn from an
+    # exponential distribution of mean `unknown_mean`.
+    def __init__(self, sigma=0.3, median=1.0, unknown_mean=30):
+        self.sigma = sigma
+        self.median = median
+        self.unknown_mean = unknown_mean
+
+    def sample(self, task, rng):
+        if task.estimated_time <= 0:
+            return rng.expovariate(1 / self.unknown_mean)
+        return task.estimated_time * self.median * rng.lognormvariate(0, self.sigma)
+
+
+class TriangularDuration:
+    # Three-point estimate: the actual duration is between `low` and `high`
+    # times the estimate, most likely `mode` times it
+    def __init__(self, low=0.8, mode=1.0, high=2.0, unknown_mean=30):
+        self.low = low
+        self.mode = mode
+        self.high = high
+        self.unknown_mean = unknown_mean
+
+    def sample(self, task, rng):
+        if task.estimated_time <= 0:
+            return rng.expovariate(1 / self.unknown_mean)
+        return task.estimated_time * rng.triangular(self.low, self.high, self.mode)
+
+
+class Robustness:
+    # Results of one policy over many replications
+    def __init__(self, policy, preemptive, num_tasks):
+        self.policy = policy
+        self.preemptive = preemptive
+        self.replications = 0
+        self.task_misses = [0] * num_tasks  # per task, in input order
+        self.lateness = Summary()  # every task in every replication
+        self.num_missed = Summary()  # per replication
+        self.max_lateness = Summary()  # per replication
+        self.makespan = Summary()  # per replication
+
+    def add(self, lateness, makespan):
+        # `lateness`: finish - deadline of each task in one replication
+        self.replications += 1
+        num_missed = 0
+        for row, value in enumerate(lateness):
+            self.lateness.add(value)
+            if value > 0:
+                self.task_misses[row] += 1
+                num_missed += 1
+        self.num_missed.add(num_missed)
+        self.max_lateness.add(max(lateness, default=0))
+        self.makespan.add(makespan)
+
+    def merge(self, other):
+        self.replications += other.replications
+        self.task_misses = [a + b for a, b in zip(self.task_misses, other.task_misses)]
+        for name in ('lateness', 'num_missed', 'max_lateness', 'makespan'):
+            getattr(self, name).merge(getattr(other, name))
+
+    @property
+    def miss_probability(self):
+        # That a task picked at random, in a random replication, is late
+        total = self.replications * len(self.task_misses)
+        return sum(self.task_misses) / total if total else 0
+
+    def task_miss_probability(self):
+        return [misses / self.replications for misses in self.task_misses]
+
+    def as_dict(self):
+        return {'policy': self.policy,
+                'preemptive': self.preemptive,
+                'replications': self.replications,
+                'miss_probability': self.miss_probability,
+                'lateness': self.lateness.as_dict(),
+                'num_missed': self.num_missed.as_dict(),
+                'max_lateness': self.max_lateness.as_dict(),
+                'makespan': self.makespan.as_dict()}
+
+
+def replicate(task_table, models, policy, preemptive, seed, replication):
+    # One replication: returns (lateness per task, makespan)
+    rng = random.Random(f'{seed}/{replication}')
+    task_list = task_table.tasks()
+    for task, model in zip(task_list, models):
+        if model is not None:
+            # The policy keeps seeing estimated_time
+            task.remaining_time = model.sample(task, rng)
+    scheduler = get_scheduler_from_string(policy, preemptive)
+    scheduler.load(task_list)
+    scheduler.run()
+    finish = {record.task_id: record.end
+              for record in scheduler.scheduled_tasks.slices if record.finished()}
+    return ([finish[task.id] - task.deadline for task in task_list],
+            scheduler.scheduled_tasks.metrics.makespan)
+
+
+# Set up in each worker process by `init_worker`
+worker_state = None
+
+
+def init_worker(task_table, models, seed):
+    global worker_state
+    worker_state = (task_table, models, seed)
+
+
+def run_batch(job):
+    # Runs in a worker process: replications [first, first + count)
+    policy, preemptive, first, count = job
+    task_table, models, seed = worker_state
+    result = Robustness(policy, preemptive, len(task_table))
+    for replication in range(first, first + count):
+        result.add(*replicate(task_table, models, policy, preemptive, seed, replication))
+    return result
+
+
+def evaluate(task_list, durations=LogNormalDuration(), replications=1000,
+             policies=POLICIES, preemptive=(False, True), seed=0,
+             max_workers=None, batch_size=50):
+    # One Robustness per (policy, preemptive), in that order. `durations` is
+    # a duration model for every task, or a dict of task id -> model; tasks
+    # without one take exactly their estimated_time. Replications go to a
+    # process pool in batches of `batch_size`; max_workers=1 runs them here.
+    if isinstance(durations, dict):
+        models = [durations.get(task.id) for task in task_list]
+    else:
+        models = [durations] * len(task_list)
+    task_table = TaskTable.from_tasks(task_list)
+    jobs = [(policy, mode, first, min(batch_size, replications - first))
+            for policy in policies
+            for mode in preemptive
+            for first in range(0, replications, batch_size)]
+
+    if max_workers == 1:
+        init_worker(task_table, models, seed)
+        batches = map(run_batch, jobs)
+    else:
+        executor = ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                                       initializer=init_worker,
+                                       initargs=(task_table, models, seed))
+        with executor:
+            batches = list(executor.map(run_batch, jobs))
+
+    # Merged in job order, so the sums don't depend on the worker count
+    results = {}
+    for batch in batches:
+        key = (batch.policy, batch.preemptive)
+        if key in results:
+            results[key].merge(batch)
+        else:
+            results[key] = batch
+    return list(results.values())
+
+
+def print_table(results):
+    print(f'{"policy":>6} {"preemptive":>10} {"P(miss)":>8} {"lateness":>9} '
+          f'{"p90":>8} {"p99":>8} {"missed/run":>10} {"worst run":>9}')
+    for r in results:
+        print(f'{r.policy:>6} {str(r.preemptive):>10} {r.miss_probability:>8.3f} '
+              f'{r.lateness.mean:>9.1f} {r.lateness.percentile(0.9):>8.1f} '
+              f'{r.lateness.percentile(0.99):>8.1f} {r.num_missed.mean:>10.1f} '
+              f'{r.num_missed.max:>9g}')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Deadline misses and lateness of each policy when tasks '
+                    'overrun their estimates.')
+    parser.add_argument('--tasks', type=int, default=50)
+    parser.add_argument('--replications', type=int, default=1000)
+    parser.add_argument('--sigma', type=float, default=0.3,
+                        help='spread of the log-normal duration factor')
+    parser.add_argument('--median', type=float, default=1.0,
+                        help='typical actual/estimated ratio')
+    parser.add_argument('--seed', type=int, default=69)
+    parser.add_argument('--policies', default=','.join(POLICIES))
+    parser.add_argument('--workers', type=int, default=None,
+                        help='worker processes (default: one per core)')
+    args = parser.parse_args(argv)
+
+    task_list = random_workload(args.tasks, args.seed)
+    start = time.perf_counter()
+    results = evaluate(task_list, LogNormalDuration(args.sigma, args.median),
+                       args.replications, args.policies.split(','), seed=args.seed,
+                       max_workers=args.workers)
+    print_table(results)
+    print(f'{args.replications * len(results)} runs in {time.perf_counter() - start:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,348 @@
+import argparse
+import heapq
+import random
+import time
+from array import array
+
+from .scheduler import ScheduledTasks, get_scheduler_from_string
+from .task import Task
+
+# Offline solvers: with the whole task list known up front, look for the
+# best non-preemptive sequence on one machine instead of deciding greedily
+# as tasks arrive. A task starts at max(its arrival time, the previous
+# finish). Objectives use finish times, with Task.priority as the weight:
+# - number of late tasks (finish > deadline)
+# - weighted tardiness: sum of priority * max(0, finish - deadline)
+
+
+class OfflineSchedule:
+    # A task sequence with its timing and objective values
+    def __init__(self, sequence, start=0, optimal=False, nodes=0, elapsed=0):
+        self.sequence = list(sequence)
+        self.start, self.finish = sequence_times(self.sequence, start)
+        self.optimal = optimal  # proven optimal for the solver's objective
+        self.nodes = nodes  # search nodes / DP states explored
+        self.elapsed = elapsed
+        self.num_late = sum(1 for task, finish in zip(self.sequence, self.finish)
+                            if finish > task.deadline)
+        self.weighted_tardiness = weighted_tardiness(self.sequence, start)
+
+    def scheduled_tasks(self):
+        # The same schedule as a finalized ScheduledTasks, for its metrics
+        # and printing
+        scheduled = ScheduledTasks()
+        for task, start in zip(self.sequence, self.start):
+            task = Task(id=task.id, name=task.name, deadline=task.deadline,
+                        arrival_time=task.arrival_time,
+                        estimated_time=task.estimated_time, priority=task.priority)
+            scheduled.add_task(task, start, task.estimated_time)
+        scheduled.finalize()
+        return scheduled
+
+
+def sequence_times(sequence, clock=0):
+    starts, finishes = [], []
+    for task in sequence:
+        clock = max(clock, task.arrival_time)
+        starts.append(clock)
+        clock += task.estimated_time
+        finishes.append(clock)
+    return starts, finishes
+
+
+def weighted_tardiness(sequence, clock=0):
+    total = 0
+    for task in sequence:
+        clock = max(clock, task.arrival_time) + task.estimated_time
+        if clock > task.deadline:
+            total += task.priority * (clock - task.deadline)
+    return total
+
+
+def sequence_from_schedule(scheduled, task_list):
+    # Tasks of `task_list` in the order a scheduler finished them; works for
+    # preemptive runs too
+    by_id = {task.id: task for task in task_list}
+    return [by_id[s.task_id] for s in scheduled.slices if s.finished()]
+
+
+def heuristic_sequence(policy, task_list):
+    # The order an existing (non-preemptive) policy runs the tasks in
+    scheduler = get_scheduler_from_string(policy)
+    scheduler.schedule(task_list)
+    return sequence_from_schedule(scheduler.scheduled_tasks, task_list)
+
+
+def moore_hodgson(task_list, start=0):
+    # Minimizes the number of late tasks in O(n log n) (Moore-Hodgson):
+    # go through the tasks by deadline and whenever one would be late, drop
+    # the longest one kept so far. Kept tasks run by deadline, dropped ones
+    # after them.
+    # Optimal when every task is available at `start` (1||sum U_j). Later
+    # arrival times are honoured when timing the result, but the optimality
+    # guarantee no longer holds.
+    begin = time.perf_counter()
+    by_deadline = sorted(task_list, key=lambda task: task.deadline)
+    kept = []  # max-heap of (-estimated_time, index)
+    clock = start
+    for index, task in enumerate(by_deadline):
+        heapq.heappush(kept, (-task.estimated_time, index))
+        clock += task.estimated_time
+        if clock > task.deadline:
+            longest, _ = heapq.heappop(kept)
+            clock += longest
+    on_time = set(index for _, index in kept)
+    sequence = ([task for index, task in enumerate(by_deadline) if index in on_time] +
+                [task for index, task in enumerate(by_deadline) if index not in on_time])
+    optimal = all(task.arrival_time <= start for task in task_list)
+    return OfflineSchedule(sequence, start, optimal, len(task_list),
+                           time.perf_counter() - begin)
+
+
+def dp_weighted_tardiness(task_list, start=0, node_budget=2**22, time_budget=None):
+    # Exact minimum weighted tardiness by dynamic programming over subsets:
+    # best[S] is the least cost of running the set S first, which then
+    # finishes at start + its total processing time. O(2^n * n), so only for
+    # small lists (n <= ~20), and only valid when every task is available at
+    # `start`. Past either budget, returns the WSPT/EDF sequence, optimal=False.
+    begin = time.perf_counter()
+    n = len(task_list)
+    assert all(task.arrival_time <= start for task in task_list), \
+        "The subset DP needs every task available at the start"
+    if 2 ** n > node_budget:
+        return fallback(task_list, start, 0, begin)
+
+    processing = [task.estimated_time for task in task_list]
+    best = [0] * (1 << n)
+    last = array('b', bytes(1 << n))  # task ending each best[S] prefix
+    length = [start] * (1 << n)
+    for mask in range(1, 1 << n):
+        if time_budget is not None and mask & 0xfff == 0 and \
+                time.perf_counter() - begin > time_budget:
+            return fallback(task_list, start, mask, begin)
+        low = mask & -mask
+        j = low.bit_length() - 1
+        finish = length[mask] = length[mask ^ low] + processing[j]
+        choice, cost = -1, None
+        bits = mask
+        while bits:
+            low = bits & -bits
+            bits ^= low
+            j = low.bit_length() - 1
+            task = task_list[j]
+            c = best[mask ^ low]
+            if finish > task.deadline:
+                c += task.priority * (finish - task.deadline)
+            if cost is None or c < cost:
+                choice, cost = j, c
+        best[mask] = cost
+        last[mask] = choice
+
+    sequence = []
+    mask = (1 << n) - 1
+    while mask:
+        j = last[mask]
+        sequence.append(task_list[j])
+        mask ^= 1 << j
+    sequence.reverse()
+    return OfflineSchedule(sequence, start, True, 1 << n, time.perf_counter() - begin)
+
+
+def branch_and_bound(task_list, start=0, node_budget=200000, time_budget=None,
+                     initial=None):
+    # Minimum weighted tardiness by depth-first branch and bound; arrival
+    # times are allowed. A partial sequence is pruned when its cost plus a
+    # lower bound for the rest (each remaining task finishing as early as it
+    # possibly could) can't beat the best sequence so far, or when another
+    # partial sequence of the same tasks finished no later for no more.
+    # Starts from `initial` (a sequence) or the best heuristic improved by a
+    # short local search. Returns the
+    # best sequence found; optimal=True if the search completed within the
+    # budgets.
+    begin = time.perf_counter()
+    n = len(task_list)
+    if initial is None:
+        initial = local_search(task_list, fallback(task_list, start, 0, begin).sequence,
+                               start, max_passes=10,
+                               time_budget=time_budget and time_budget / 4).sequence
+    best_cost = weighted_tardiness(initial, start)
+    best_sequence = list(initial)
+    # Children are tried in deadline order, which finds good sequences early
+    order = sorted(range(n), key=lambda j: (task_list[j].deadline, task_list[j].estimated_time))
+    seen = {}  # mask -> (clock, cost) of the best partial sequence of it
+
+    def lower_bound(mask, clock):
+        bound = 0
+        for j in order:
+            if not mask >> j & 1:
+                task = task_list[j]
+                finish = max(clock, task.arrival_time) + task.estimated_time
+                if finish > task.deadline:
+                    bound += task.priority * (finish - task.deadline)
+        return bound
+
+    nodes = 0
+    complete = True
+    path = []
+    # Each frame: (mask, clock, cost, position of the next child in `order`)
+    stack = [[0, start, 0, 0]]
+    while stack:
+        frame = stack[-1]
+        mask, clock, cost, position = frame
+        if position == n or best_cost == 0:
+            stack.pop()
+            if path:
+                path.pop()
+            continue
+        frame[3] += 1
+        j = order[position]
+        if mask >> j & 1:
+            continue
+
+        nodes += 1
+        if nodes > node_budget or (time_budget is not None and nodes & 0x3ff == 0 and
+                                   time.perf_counter() - begin > time_budget):
+            complete = False
+            break
+        task = task_list[j]
+        finish = max(clock, task.arrival_time) + task.estimated_time
+        child_cost = cost
+        if finish > task.deadline:
+            child_cost += task.priority * (finish - task.deadline)
+        child = mask | 1 << j
+        if child_cost >= best_cost:
+            continue
+        previous = seen.get(child)
+        if previous is not None and previous[0] <= finish and previous[1] <= child_cost:
+            continue
+        seen[child] = (finish, child_cost)
+        if child == (1 << n) - 1:
+            best_cost = child_cost
+            best_sequence = [task_list[i] for i in path] + [task]
+            continue
+        if child_cost + lower_bound(child, finish) >= best_cost:
+            continue
+        path.append(j)
+        stack.append([child, finish, child_cost, 0])
+
+    return OfflineSchedule(best_sequence, start, complete, nodes, time.perf_counter() - begin)
+
+
+def local_search(task_list, initial, start=0, max_passes=100, time_budget=None):
+    # Improves a sequence by swapping adjacent tasks and moving late tasks
+    # earlier, keeping every change that lowers the weighted tardiness,
+    # until no move helps or a budget runs out. `initial` is a sequence, a
+    # policy name ("EDF", "WSPT", ...) or a ScheduledTasks from any
+    # scheduler (run over `task_list`).
+    begin = time.perf_counter()
+    if isinstance(initial, str):
+        sequence = heuristic_sequence(initial, task_list)
+    elif isinstance(initial, ScheduledTasks):
+        sequence = sequence_from_schedule(initial, task_list)
+    else:
+        sequence = list(initial)
+    assert len(sequence) == len(task_list), "The initial schedule must cover every task"
+    cost = weighted_tardiness(sequence, start)
+    moves = 0
+    for _ in range(max_passes):
+        improved = False
+        for i in range(len(sequence) - 1):
+            if time_budget is not None and time.perf_counter() - begin > time_budget:
+                return OfflineSchedule(sequence, start, False, moves, time.perf_counter() - begin)
+            # Adjacent interchange
+            sequence[i], sequence[i + 1] = sequence[i + 1], sequence[i]
+            moves += 1
+            new_cost = weighted_tardiness(sequence, start)
+            if new_cost < cost:
+                cost, improved = new_cost, True
+                continue
+            sequence[i], sequence[i + 1] = sequence[i + 1], sequence[i]
+        # Insertion: pull each late task forward to the best earlier spot
+        finishes = sequence_times(sequence, start)[1]
+        for i in range(1, len(sequence)):
+            if finishes[i] <= sequence[i].deadline:
+                continue
+            if time_budget is not None and time.perf_counter() - begin > time_budget:
+                return OfflineSchedule(sequence, start, False, moves, time.perf_counter() - begin)
+            task = sequence.pop(i)
+            best_position, best_cost = i, cost
+            for position in range(i):
+                sequence.insert(position, task)
+                moves += 1
+                new_cost = weighted_tardiness(sequence, start)
+                if new_cost < best_cost:
+                    best_position, best_cost = position, new_cost
+                del sequence[position]
+            sequence.insert(best_position, task)
+            if best_cost < cost:
+                cost, improved = best_cost, True
+                finishes = sequence_times(sequence, start)[1]
+        if not improved:
+            break
+    return OfflineSchedule(sequence, start, False, moves, time.perf_counter() - begin)
+
+
+def fallback(task_list, start, nodes, begin):
+    # Best of the weighted and deadline-ordered sequences
+    candidates = [sorted(task_list, key=lambda task: task.estimated_time / task.priority),
+                  sorted(task_list, key=lambda task: task.deadline)]
+    sequence = min(candidates, key=lambda sequence: weighted_tardiness(sequence, start))
+    return OfflineSchedule(sequence, start, False, nodes, time.perf_counter() - begin)
+
+
+def random_batch(num_tasks, seed=69):
+    # Tasks all available at 0, weights 1-3, deadlines tight enough that
+    # some are missed
+    rng = random.Random(seed)
+    total = 0
+    task_list = []
+    for i in range(num_tasks):
+        estimated_time = rng.randint(1, 20)
+        total += estimated_time
+        task_list.append(Task(name="Task_" + str(i), id=i, arrival_time=0,
+                              estimated_time=estimated_time, priority=rng.randint(1, 3),
+                              deadline=rng.randint(estimated_time, 10 * num_tasks)))
+    return task_list
+
+
+def compare_solvers(task_list, time_budget=1.0, node_budget=200000):
+    # Quality against run time for every method on one workload: list of
+    # (method, weighted tardiness, late tasks, seconds, optimal)
+    rows = []
+    for policy in ("EDF", "SJF", "WSPT"):
+        begin = time.perf_counter()
+        schedule = OfflineSchedule(heuristic_sequence(policy, task_list))
+        rows.append((policy, schedule.weighted_tardiness, schedule.num_late,
+                     time.perf_counter() - begin, False))
+    solvers = [("Moore-Hodgson", lambda: moore_hodgson(task_list)),
+               ("local search (EDF)", lambda: local_search(task_list, "EDF", time_budget=time_budget))]
+    if len(task_list) <= 18:
+        solvers.append(("DP", lambda: dp_weighted_tardiness(task_list, time_budget=time_budget)))
+    solvers.append(("branch and bound", lambda: branch_and_bound(
+        task_list, node_budget=node_budget, time_budget=time_budget)))
+    for name, solve in solvers:
+        schedule = solve()
+        rows.append((name, schedule.weighted_tardiness, schedule.num_late,
+                     schedule.elapsed, schedule.optimal))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        description='Solution quality against run time of the offline solvers.')
+    parser.add_argument('--sizes', default='8,12,16,50,200')
+    parser.add_argument('--seed', type=int, default=69)
+    parser.add_argument('--time-budget', type=float, default=1.0,
+                        help='seconds per solver')
+    parser.add_argument('--node-budget', type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    print(f'{"tasks":>6} {"method":<20} {"w. tardiness":>13} {"late":>5} {"time (s)":>9} {"optimal":>8}')
+    for size in map(int, args.sizes.split(',')):
+        for method, cost, late, elapsed, optimal in compare_solvers(
+                random_batch(size, args.seed), args.time_budget, args.node_budget):
+            print(f'{size:>6} {method:<20} {cost:>13g} {late:>5} {elapsed:>9.4f} {str(optimal):>8}')
+
+
+if __name__ == '__main__':
+    main()
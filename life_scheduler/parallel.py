@@ -0,0 +1,207 @@
+import copy
+import heapq
+
+from .dependencies import DependencyIndex, has_prerequisites
+from .events import EventQueue, ARRIVAL, COMPLETION
+from .ready_queue import ReadyQueue
+from .scheduler import (ScheduledTasks, EDFScheduler, FCFSScheduler, LJFScheduler,
+                        SJFScheduler, WSPTScheduler, arrival_order)
+
+# Several workers (people, devices) sharing one stream of tasks: N parallel
+# execution slots instead of the single `active` one of Scheduler.
+# Non-preemptive: a task runs to completion on the worker that started it.
+
+# Dispatch order of the ready queues. LPT (longest processing time first)
+# with a shared pool is Graham's LPT list scheduling.
+KEYS = {"FCFS": FCFSScheduler.ready_key,
+        "EDF": EDFScheduler.ready_key,
+        "SPT": SJFScheduler.ready_key,
+        "LPT": LJFScheduler.ready_key,
+        "WSPT": WSPTScheduler.ready_key}
+
+
+class Worker:
+    __slots__ = ('id', 'active', 'pending', 'scheduled_tasks', 'busy_time',
+                 'load', 'queued')
+
+    def __init__(self, id, pending, keep_slices):
+        self.id = id
+        self.active = None
+        self.pending = pending  # Its own ready queue, when partitioned
+        self.scheduled_tasks = ScheduledTasks(keep_slices)  # What it ran
+        self.busy_time = 0
+        self.load = 0  # Estimated work assigned and not finished
+        self.queued = 0  # Estimated work waiting in its own queue
+
+
+class LoadIndex:
+    # The worker with the smallest value, in O(log n): a heap of
+    # (value, worker id) where entries are lazily replaced on update. The
+    # heap is rebuilt when stale entries pile up.
+    def __init__(self, num_workers):
+        self.value = [0] * num_workers
+        self.heap = [(0, id) for id in range(num_workers)]
+
+    def set(self, id, value):
+        self.value[id] = value
+        heapq.heappush(self.heap, (value, id))
+        if len(self.heap) > 4 * len(self.value):
+            self.heap = [(value, id) for id, value in enumerate(self.value)]
+            heapq.heapify(self.heap)
+
+    def min(self):
+        heap = self.heap
+        while heap[0][0] != self.value[heap[0][1]]:
+            heapq.heappop(heap)
+        return heap[0][1]
+
+
+class ParallelScheduler:
+    # `policy` orders the ready queues, see KEYS.
+    # - Shared pool (partitioned=False): list scheduling. Whenever a worker
+    #   is idle it takes the first task of the one ready queue.
+    # - Partitioned: each arriving task goes to the worker with the least
+    #   estimated work outstanding and waits in that worker's own queue,
+    #   e.g. per-worker EDF. With `stealing`, a worker running out of work
+    #   takes the first task of the worker with the most queued work.
+    # Idle workers, the least and most loaded worker and the next completion
+    # are all kept in heaps, so each event costs O(log n) in the number of
+    # workers and tasks.
+    keep_slices = True
+
+    def __init__(self, num_workers, policy="FCFS", partitioned=False, stealing=False):
+        assert num_workers >= 1, "Need at least one worker"
+        assert policy in KEYS, f"Unknown policy {policy!r}, expected one of {list(KEYS)}"
+        self.num_workers = num_workers
+        self.policy = policy
+        self.key = KEYS[policy]
+        self.partitioned = partitioned
+        self.stealing = stealing
+        self.load([])
+
+    def schedule(self, task_list):
+        self.load(copy.deepcopy(task_list))
+        self.run()
+        self.finalize()
+
+    def load(self, task_list):
+        self.task_list = task_list
+        self.clock = 0
+        self.num_unfinished = len(task_list)
+        self.events = EventQueue(arrivals=arrival_order(task_list))
+        self.pending = ReadyQueue(self.key)  # The shared pool
+        self.workers = [Worker(id, ReadyQueue(self.key) if self.partitioned else None,
+                               self.keep_slices)
+                        for id in range(self.num_workers)]
+        self.idle = list(range(self.num_workers))  # Heap of worker ids
+        self.least_loaded = LoadIndex(self.num_workers)
+        self.most_queued = LoadIndex(self.num_workers)  # Values negated
+        # Overall statistics, merged from the workers' at the end
+        self.scheduled_tasks = ScheduledTasks(keep_slices=False)
+        self.dependencies = (DependencyIndex(task_list)
+                             if has_prerequisites(task_list) else None)
+
+    def finalize(self):
+        # The overall statistics are those of all workers together
+        for worker in self.workers:
+            self.scheduled_tasks.merge(worker.scheduled_tasks)
+            worker.scheduled_tasks.finalize()
+        self.scheduled_tasks.finalize()
+
+    def run(self):
+        while self.num_unfinished:
+            self.step()
+
+    def step(self):
+        # Handle every event at the next event time, then dispatch
+        events = self.events
+        time = self.clock = events.peek_time()
+        while events and events.peek_time() == time:
+            _, kind, item = events.pop()
+            if kind == ARRIVAL:
+                self.on_arrival(item)
+            else:
+                self.on_completion(item)
+        self.dispatch()
+        return time
+
+    def on_arrival(self, task):
+        if self.dependencies and self.dependencies.blocked(task):
+            self.dependencies.hold(task)
+            return
+        self.enqueue(task)
+
+    def enqueue(self, task):
+        if not self.partitioned:
+            self.pending.push(task)
+            return
+        worker = self.workers[self.least_loaded.min()]
+        self.set_load(worker, worker.load + task.estimated_time)
+        if worker.active is None:
+            # Idle workers have nothing queued: start at once
+            self.start(worker, task)
+        else:
+            worker.pending.push(task)
+            self.set_queued(worker, worker.queued + task.estimated_time)
+
+    def on_completion(self, worker):
+        task = worker.active
+        worker.active = None
+        self.num_unfinished -= 1
+        if self.partitioned:
+            self.set_load(worker, worker.load - task.estimated_time)
+        if not self.partitioned:
+            heapq.heappush(self.idle, worker.id)
+        elif worker.pending:
+            self.start_queued(worker, worker)
+        elif self.stealing:
+            victim = self.workers[self.most_queued.min()]
+            if victim.pending:
+                self.start_queued(worker, victim)
+        # Only now that the worker is settled: a released task may go to it
+        if self.dependencies:
+            for released in self.dependencies.release(task):
+                self.enqueue(released)
+
+    def dispatch(self):
+        # Shared pool: idle workers, lowest id first, take the best tasks
+        idle, pending = self.idle, self.pending
+        while idle and pending:
+            self.start(self.workers[heapq.heappop(idle)], pending.pop())
+
+    def start_queued(self, worker, owner):
+        # `worker` runs the first task of `owner`'s queue
+        task = owner.pending.pop()
+        self.set_queued(owner, owner.queued - task.estimated_time)
+        if owner is not worker:
+            # Stolen: the work moves over
+            self.set_load(owner, owner.load - task.estimated_time)
+            self.set_load(worker, worker.load + task.estimated_time)
+        self.start(worker, task)
+
+    def start(self, worker, task):
+        duration = task.remaining_time
+        worker.active = task
+        worker.busy_time += duration
+        worker.scheduled_tasks.add_task(task, self.clock, duration)
+        task.remaining_time = 0
+        self.events.push(self.clock + duration, COMPLETION, worker)
+
+    def set_load(self, worker, load):
+        worker.load = load
+        self.least_loaded.set(worker.id, load)
+
+    def set_queued(self, worker, queued):
+        worker.queued = queued
+        self.most_queued.set(worker.id, -queued)
+
+    def worker_stats(self):
+        # Per worker: tasks run, busy time, utilization over the makespan and
+        # the statistics of its tasks
+        makespan = self.scheduled_tasks.metrics.makespan
+        return [{'worker': worker.id,
+                 'num_tasks': worker.scheduled_tasks.metrics.num_finished,
+                 'busy_time': worker.busy_time,
+                 'utilization': worker.busy_time / makespan if makespan else 0,
+                 'metrics': worker.scheduled_tasks.metrics.as_dict()}
+                for worker in self.workers]
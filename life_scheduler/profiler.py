@@ -0,0 +1,238 @@
+import time
+
+from .metrics import Summary
+
+# Where a simulation spends its time. Attach with `scheduler.profiler =
+# Profiler()`: `run` and `stream` then step through it, and without one they
+# run exactly as before.
+#
+# A step takes a few microseconds, so nothing is measured on most of them:
+# steps, arrivals and completions are exact, counted from the scheduler's
+# state at the start and end of the run. Everything else is sampled: one
+# step in `sample_every` runs with the policy hooks wrapped in timers, which
+# is what a phase is here:
+# - arrival: on_arrival
+# - dispatch: get_next_task, picking the next task
+# - preemption: should_preempt and on_preempt
+# - refill: refill, a new quantum
+# - retire: on_retire, including releasing dependents
+# - log: ScheduledTasks.add_task
+# and the rest of the step (events, bookkeeping) is "other". The same steps
+# count dispatches, preemptions and context switches and sample the queue
+# length. Figures for the whole run are the samples scaled up; with
+# sample_every=1 they are exact, at a much higher cost.
+
+PHASES = {'on_arrival': 'arrival', 'get_next_task': 'dispatch',
+          'should_preempt': 'preemption', 'on_preempt': 'preemption',
+          'refill': 'refill', 'on_retire': 'retire'}
+PHASE_NAMES = ['arrival', 'dispatch', 'preemption', 'refill', 'retire', 'log', 'other']
+
+COUNTERS = ['steps', 'arrivals', 'completions', 'dispatches', 'preemptions',
+            'context_switches']  # The last three are estimates
+
+
+class Phase:
+    __slots__ = ('calls', 'nanoseconds')
+
+    def __init__(self):
+        self.calls = 0
+        self.nanoseconds = 0
+
+
+class Profiler:
+    def __init__(self, sample_every=256):
+        assert sample_every >= 1, "sample_every must be at least 1"
+        self.sample_every = sample_every
+        self.steps = 0
+        self.arrivals = 0
+        self.completions = 0
+        self.sampled_dispatches = 0
+        self.sampled_preemptions = 0  # The running task stopped before finishing
+        self.sampled_context_switches = 0  # From one task straight to another
+        self.sampled_steps = 0
+        self.sampled_nanoseconds = 0  # Whole sampled steps
+        self.phases = {name: Phase() for name in PHASE_NAMES}
+        self.queue_length = Summary()
+
+    def run(self, scheduler):
+        # Scheduler.run, profiled: on most steps only a countdown is added
+        self.prepare(scheduler)
+        step = scheduler.step
+        sample_every = self.sample_every
+        countdown = sample_every
+        while scheduler.num_unfinished:
+            countdown -= 1
+            if countdown:
+                step()
+            else:
+                countdown = sample_every
+                self.timed_step(scheduler)
+        self.finish(scheduler, sample_every - countdown)
+
+    def begin(self, scheduler):
+        # The step function to call instead of scheduler.step, for loops
+        # other than `run`, like `stream`. Call `end` when done.
+        self.prepare(scheduler)
+        step = scheduler.step
+        timed_step = self.timed_step
+        sample_every = self.sample_every
+        countdown = sample_every
+
+        def profiled_step():
+            nonlocal countdown
+            countdown -= 1
+            if countdown:
+                return step()
+            countdown = sample_every
+            return timed_step(scheduler)
+
+        self.unsampled = lambda: sample_every - countdown
+        return profiled_step
+
+    def end(self, scheduler):
+        self.finish(scheduler, self.unsampled())
+
+    def prepare(self, scheduler):
+        self.start = self.totals(scheduler) + (self.sampled_steps,)
+        self.hooks = self.timers(scheduler)
+
+    def finish(self, scheduler, unsampled):
+        # `unsampled`: steps since the last sample
+        arrived, completed = self.totals(scheduler)
+        start_arrived, start_completed, start_sampled = self.start
+        self.arrivals += arrived - start_arrived
+        self.completions += completed - start_completed
+        self.steps += (self.sampled_steps - start_sampled) * self.sample_every + unsampled
+        self.hooks = None
+
+    @staticmethod
+    def totals(scheduler):
+        # Tasks arrived and finished so far. A stream adds the tasks it
+        # reads ahead to both num_not_arrived and num_unfinished.
+        arrived = scheduler.events.num_arrived
+        return arrived, arrived + scheduler.num_not_arrived - scheduler.num_unfinished
+
+    def timers(self, scheduler):
+        # Timing wrappers for the hooks, built once per run. They shadow the
+        # methods on the instance only while a sampled step runs.
+        clock = time.perf_counter_ns
+        timed = [0]  # Time spent in the hooks during the current step
+
+        def wrap(method, phase):
+            def call(*args):
+                start = clock()
+                try:
+                    return method(*args)
+                finally:
+                    elapsed = clock() - start
+                    phase.calls += 1
+                    phase.nanoseconds += elapsed
+                    timed[0] += elapsed
+            return call
+
+        hooks = {name: wrap(getattr(scheduler, name), self.phases[phase])
+                 for name, phase in PHASES.items()}
+        log = scheduler.scheduled_tasks
+        return timed, hooks, log, wrap(log.add_task, self.phases['log'])
+
+    def timed_step(self, scheduler):
+        # One step with every hook timed, and the change of running task
+        # counted
+        timed, hooks, log, add_task = self.hooks
+        timed[0] = 0
+        # setattr rather than __dict__.update: touching an instance's
+        # __dict__ makes all its attribute lookups slower for good
+        for name, hook in hooks.items():
+            setattr(scheduler, name, hook)
+        log.add_task = add_task
+        self.queue_length.add(len(scheduler.pending))
+        active = scheduler.active
+        start = time.perf_counter_ns()
+        try:
+            return scheduler.step()
+        finally:
+            elapsed = time.perf_counter_ns() - start
+            for name in hooks:
+                delattr(scheduler, name)
+            del log.add_task
+            other = self.phases['other']
+            other.calls += 1
+            other.nanoseconds += elapsed - timed[0]
+            self.sampled_steps += 1
+            self.sampled_nanoseconds += elapsed
+            running = scheduler.active
+            if running is not active:
+                if active is not None and active.remaining_time > 0:
+                    self.sampled_preemptions += 1
+                if running is not None:
+                    self.sampled_dispatches += 1
+                    if active is not None:
+                        self.sampled_context_switches += 1
+
+    @property
+    def scale(self):
+        # Sampled figures times this estimate the whole run
+        return self.steps / self.sampled_steps if self.sampled_steps else 0
+
+    @property
+    def dispatches(self):
+        return self.sampled_dispatches * self.scale
+
+    @property
+    def preemptions(self):
+        return self.sampled_preemptions * self.scale
+
+    @property
+    def context_switches(self):
+        return self.sampled_context_switches * self.scale
+
+    def as_dict(self):
+        # Per phase: calls and seconds in the sampled steps, and estimates
+        # for the whole run
+        scale = self.scale
+        stats = {name: getattr(self, name) for name in COUNTERS}
+        stats['sampled_steps'] = self.sampled_steps
+        stats['estimated_seconds'] = self.sampled_nanoseconds * scale / 1e9
+        stats['phases'] = {name: {'calls': phase.calls,
+                                  'seconds': phase.nanoseconds / 1e9,
+                                  'estimated_calls': phase.calls * scale,
+                                  'estimated_seconds': phase.nanoseconds * scale / 1e9,
+                                  'share': (phase.nanoseconds / self.sampled_nanoseconds
+                                            if self.sampled_nanoseconds else 0)}
+                           for name, phase in self.phases.items()}
+        stats['queue_length'] = self.queue_length.as_dict()
+        return stats
+
+    def prometheus(self, prefix='life_scheduler', labels=None):
+        # Prometheus text exposition format, e.g. for a /metrics endpoint or
+        # the node exporter's textfile collector
+        base = ','.join(f'{key}="{value}"' for key, value in (labels or {}).items())
+
+        def sample(name, value, **extra):
+            pairs = ','.join(filter(None, [base] + [f'{key}="{value}"'
+                                                    for key, value in extra.items()]))
+            return f'{prefix}_{name}{{{pairs}}} {value}' if pairs else f'{prefix}_{name} {value}'
+
+        lines = []
+
+        def family(name, kind, help, samples):
+            lines.append(f'# HELP {prefix}_{name} {help}')
+            lines.append(f'# TYPE {prefix}_{name} {kind}')
+            lines.extend(samples)
+
+        for counter in COUNTERS:
+            family(f'{counter}_total', 'counter', f'Scheduler {counter.replace("_", " ")}',
+                   [sample(f'{counter}_total', getattr(self, counter))])
+        scale = self.scale
+        family('phase_calls_total', 'counter', 'Estimated calls per phase',
+               [sample('phase_calls_total', phase.calls * scale, phase=name)
+                for name, phase in self.phases.items()])
+        family('phase_seconds_total', 'counter', 'Estimated seconds spent per phase',
+               [sample('phase_seconds_total', phase.nanoseconds * scale / 1e9, phase=name)
+                for name, phase in self.phases.items()])
+        queue = self.queue_length
+        family('queue_length', 'summary', 'Ready queue length, sampled',
+               [sample('queue_length', queue.percentile(p), quantile=p)
+                for p in (0.5, 0.9, 0.99) if queue.count] +
+               [sample('queue_length_sum', queue.total), sample('queue_length_count', queue.count)])
+        return '\n'.join(lines) + '\n'
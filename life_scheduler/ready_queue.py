@@ -0,0 +1,169 @@
+import heapq
+import itertools
+from collections import deque
+
+
+class ReadyQueue:
+    # Priority queue of pending tasks, backed by a binary heap.
+    # Each policy plugs in through a key function; the smallest key is
+    # served first and ties are broken by insertion order, which is exactly
+    # what the stable `list.sort` used to give us.
+    # Removal is lazy: the heap entry is only marked dead and dropped once it
+    # reaches the top, so every operation is O(log n) amortized.
+    REMOVED = object()
+
+    def __init__(self, key):
+        self.key = key
+        self.heap = []
+        self.entries = {}  # task -> heap entry
+        self.counter = itertools.count()
+
+    def push(self, task):
+        # Re-pushing a task that is already queued re-prioritizes it
+        if task in self.entries:
+            self.remove(task)
+        entry = [self.key(task), next(self.counter), task]
+        self.entries[task] = entry
+        heapq.heappush(self.heap, entry)
+
+    # Keep the list spelling so policies can treat the queue like `pending`
+    append = push
+    # Recompute a queued task's key after its attributes changed, O(log n)
+    update = push
+
+    def remove(self, task):
+        entry = self.entries.pop(task)
+        entry[-1] = ReadyQueue.REMOVED
+
+    def peek(self):
+        heap = self.heap
+        while heap[0][-1] is ReadyQueue.REMOVED:
+            heapq.heappop(heap)
+        return heap[0][-1]
+
+    def pop(self):
+        heap = self.heap
+        while True:
+            task = heapq.heappop(heap)[-1]
+            if task is not ReadyQueue.REMOVED:
+                del self.entries[task]
+                return task
+
+    def snapshot(self):
+        # Contents plus the next sequence number, for `restore`
+        return ([tuple(entry) for entry in self.entries.values()],
+                next(self.counter))
+
+    def snapshot_tasks(self):
+        return self.entries.keys()
+
+    def restore(self, snapshot):
+        items, seq = snapshot
+        self.heap = [list(item) for item in items]
+        heapq.heapify(self.heap)
+        self.entries = {entry[-1]: entry for entry in self.heap}
+        self.counter = itertools.count(seq)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __bool__(self):
+        return bool(self.entries)
+
+    def __contains__(self, task):
+        return task in self.entries
+
+    def __iter__(self):
+        # In dispatch order. Only meant for printing/debugging, O(n log n)
+        return (entry[-1] for entry in sorted(self.entries.values()))
+
+
+class FIFOQueue(deque):
+    # First-in first-out queue for policies that serve in arrival/rotation
+    # order (round robin). Dispatch takes the head, so every operation the
+    # scheduler needs is O(1).
+    push = deque.append
+
+    def peek(self):
+        return self[0]
+
+    def remove(self, task):
+        if self[0] is task:
+            self.popleft()
+        else:
+            deque.remove(self, task)
+
+    def update(self, task):
+        # Position doesn't depend on the task's attributes
+        pass
+
+    def snapshot(self):
+        return list(self)
+
+    snapshot_tasks = snapshot
+
+    def restore(self, snapshot):
+        self.clear()
+        self.extend(snapshot)
+
+
+class MultiLevelQueue:
+    # One FIFOQueue per level, level 0 first: the ready queue of a
+    # multilevel feedback scheduler. `level` remembers where each task
+    # belongs; peek, push and remove are O(number of levels).
+    def __init__(self, num_levels):
+        self.levels = [FIFOQueue() for _ in range(num_levels)]
+        self.level = {}  # task id -> level, for every task in the system
+        self.size = 0
+
+    def push(self, task):
+        self.levels[self.level.setdefault(task.id, 0)].append(task)
+        self.size += 1
+
+    append = push
+
+    def push_front(self, task):
+        # Back to the head of its level, e.g. when preempted mid-quantum
+        self.levels[self.level[task.id]].appendleft(task)
+        self.size += 1
+
+    def top_level(self):
+        for index, queue in enumerate(self.levels):
+            if queue:
+                return index
+        return len(self.levels)
+
+    def peek(self):
+        return self.levels[self.top_level()][0]
+
+    def remove(self, task):
+        self.levels[self.level[task.id]].remove(task)
+        self.size -= 1
+
+    def update(self, task):
+        pass
+
+    def snapshot(self):
+        return [list(queue) for queue in self.levels], dict(self.level)
+
+    def snapshot_tasks(self):
+        return [task for queue in self.levels for task in queue]
+
+    def restore(self, snapshot):
+        levels, level = snapshot
+        for queue, tasks in zip(self.levels, levels):
+            queue.restore(tasks)
+        self.level = dict(level)
+        self.size = sum(map(len, levels))
+
+    def __len__(self):
+        return self.size
+
+    def __bool__(self):
+        return self.size > 0
+
+    def __contains__(self, task):
+        return any(task in queue for queue in self.levels)
+
+    def __iter__(self):
+        return iter(self.snapshot_tasks())
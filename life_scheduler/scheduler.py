@@ -1,45 +1,60 @@
+import bisect
+import math
 import random
-from operator import attrgetter
 import copy
+from collections import deque
+from operator import attrgetter
+
+from .dependencies import DependencyIndex, has_prerequisites
+from .metrics import Metrics
+from .events import (EventQueue, ARRIVAL, COMPLETION, QUANTUM_EXPIRY, CUT, PAUSE,
+                     RESUME, WAKE)
+from .ready_queue import ReadyQueue, FIFOQueue, MultiLevelQueue
+from .table import TaskTable
+from .task import Task
+from .tracing import (Tracer, PrintSink, ARRIVE, DISPATCH, PREEMPT, RETIRE,
+                      QUOTA_REFILL)
+
+
+class Slice:
+    # One execution slice of a task. Compact on purpose: a preemptive run can
+    # record millions of these, so we keep only the id and three numbers.
+    __slots__ = ('task_id', 'start', 'length', 'remaining_after')
 
+    def __init__(self, task_id, start, length, remaining_after):
+        self.task_id = task_id
+        self.start = start
+        self.length = length
+        self.remaining_after = remaining_after
 
-class Task:
-    # There are 6 characteristics of jobs (taken from Scheduling Algorithms book):
-    # 1. preemption,
-    # 2. precedence relations,
-    # 3. release date,
-    # 4. restriction on processing time (time limit?) / number of operation ,
-    # 5. deadline
-    # 6. batching (is it needed?)
-    def __init__(self, id, name, deadline, arrival_time, estimated_time=-1, priority=1, prerequisite=[], preemptible=True, min_quantum=20):
-        self.name = name
-        self.id = id
-        self.priority = priority
-        self.remaining_time = estimated_time
-        self.estimated_time = estimated_time
-        self.preemptible = preemptible
-        self.arrival_time = arrival_time
-        self.deadline = deadline
-        self.min_quantum = min_quantum  # Minimum scheduling granularity
-        self.quota = min_quantum
-
-        # TODO
-        self.prerequisite = prerequisite
-
-        self.scheduled_time = []  # Maybe contains pairs of start and end
-        self.finish_time = 0
-
-    def add_scheduled_time(self, start, stop):
-        self.scheduled_time.append((start, stop))
+    @property
+    def end(self):
+        return self.start + self.length
 
     def finished(self):
-        return self.remaining_time <= 0
+        return self.remaining_after <= 0
 
-    def refill_quota(self):
-        self.quota = self.min_quantum
 
-    def name_elasped_time(self):
-        return f'{self.name}({self.estimated_time-self.remaining_time}/{self.estimated_time})'
+START = attrgetter('start')
+
+
+def first_ending_after(slices, starts, time, key=None):
+    # Index of the first of `slices` (in time order, not overlapping) that
+    # ends after `time`. `starts` is bisected with `key` for their starts.
+    index = bisect.bisect_right(starts, time, key=key) - 1
+    if index < 0 or slices[index].end <= time:
+        index += 1
+    return index
+
+
+def overlapping(slices, starts, start, end, offset=0, limit=None, key=None):
+    # A page of the slices overlapping [start, end): O(log n + k)
+    assert offset >= 0 and (limit is None or limit >= 0), "offset and limit can't be negative"
+    first = first_ending_after(slices, starts, start, key) + offset
+    last = bisect.bisect_left(starts, end, key=key)
+    if limit is not None:
+        last = min(last, first + limit)
+    return slices[first:last] if first < last else []
 
 
 class ScheduledTasks:
@@ -47,12 +62,31 @@ class ScheduledTasks:
     # Should have: timestamps, task
     # Should be algorithm-agnostic
     # TODO: should also be clock-agnostic...
-    def __init__(self):
-        self.scheduled_tasks = {}
+    #
+    # Statistics are kept up to date as slices arrive and consecutive slices
+    # of the same task are merged on insert, so `finalize` is O(1). With
+    # keep_slices=False only the statistics are kept and memory stays
+    # bounded however long the simulation runs.
+    #
+    # Slices are appended in time order and never overlap, so their starts
+    # (and ends) are sorted. The timeline index, the starts and each task's
+    # slices, is built on the first query and then only extended with the
+    # slices added since: "what runs at t", a time range or a page of it cost
+    # O(log n + k), with nothing added to recording a slice.
+    def __init__(self, keep_slices=True):
+        self.keep_slices = keep_slices
+        self.slices = []  # Slice records, in dispatch order
+        self.tasks = {}  # task id -> Task, for names / deadlines
+        self.first_start = {}  # task id -> first dispatch, until it finishes
+        self.metrics = Metrics()
+        self.last = None  # Latest slice, merged into when the task goes on
+        self.starts = []  # Start of each indexed slice
+        self.task_slices = {}  # task id -> its indexed slices, in order
         self.waiting_time = 0
         self.makespan = 0  # a.k.a turnaround time
         self.lateness = 0
         self.deadline_missed = 0
+        self.finalized = False
 
     def add_task(self, task, clock, process_time):
         # Add a task into the queue
@@ -61,18 +95,34 @@ class ScheduledTasks:
         # Update clock to match arrival time
         # self.curr_clock = max(task.arrival_time, self.curr_clock)
 
-        # TODO: Should it be copied or referenced? Copy for now
-        copied_task = copy.deepcopy(task)
-        copied_task.process_time = process_time
-        copied_task.remaining_time -= process_time
-
-        self.scheduled_tasks[clock] = copied_task
+        # Only the slice is recorded; the task itself is referenced once
+        # and a full copy can be rebuilt with `get_task_snapshot`
+        remaining_time = task.remaining_time - process_time
+        last = self.last
+        if last is not None and last.task_id == task.id:
+            # Same task again: extend the previous slice
+            self.update_statistics(task, clock, process_time, remaining_time)
+            last.length += process_time
+            last.remaining_after = remaining_time
+            return
+        record = Slice(task.id, clock, process_time, remaining_time)
+        self.last = record
+        if self.keep_slices:
+            self.slices.append(record)
+            self.tasks[task.id] = task
+        if task.id not in self.first_start:
+            self.first_start[task.id] = clock
         # TODO: each task should have its own scheduled time / departure time
-        self.update_statistics(copied_task, clock)
+        self.update_statistics(task, clock, process_time, remaining_time)
 
-    def update_statistics(self, task, clock):
+    def break_slice(self):
+        # The running task stops for a while: its next slice is a new record
+        # rather than an extension of the latest one
+        self.last = None
+
+    def update_statistics(self, task, clock, process_time, remaining_time):
         # Update statistics based on scheduled task
-        if task.finished():
+        if remaining_time <= 0:
             # FIX: The use of curr_clock is not clean?
             # Waiting time (or flow time): from arrival time -> finish task
             self.makespan += (clock - task.arrival_time)
@@ -83,39 +133,138 @@ class ScheduledTasks:
             if lateness < 0:
                 # self.deadline_missed.append((task, self.curr_clock))
                 self.deadline_missed += 1
+            # The same, measured at the finish time
+            self.metrics.add(task, self.first_start.pop(task.id), clock + process_time)
+
+    def get_task_snapshot(self, record):
+        # Rebuild the task as it was right after the given slice
+        task = copy.deepcopy(self.tasks[record.task_id])
+        task.process_time = record.length
+        task.remaining_time = record.remaining_after
+        return task
 
     def finalize(self):
+        if self.finalized:
+            return
+        self.finalized = True
         num_unique_tasks = self.get_num_unique_tasks()
+        if not num_unique_tasks:
+            return  # Nothing scheduled, e.g. an empty live session
         self.makespan /= num_unique_tasks
         self.lateness /= num_unique_tasks
 
-        previous_task = None
-        # Use a remove list to keep the length consistent
-        remove_list = []
-
-        # Merge entries
-        for time, task in self.scheduled_tasks.items():
-            if previous_task is not None:
-                if task.id == previous_task.id:
-                    previous_task.process_time += task.process_time
-                    previous_task.remaining_time = task.remaining_time
-                    remove_list.append(time)
-                else:
-                    previous_task = task
-            else:
-                previous_task = task
-
-        [self.scheduled_tasks.pop(item) for item in remove_list]
-
     def get_num_unique_tasks(self):
-        unique_tasks = set(
-            [task.id for _, task in self.scheduled_tasks.items()])
-        return len(unique_tasks)
-#        for _ , task in self.scheduled_tasks.items():
-
-    def print(self):
-        for time, task in self.scheduled_tasks.items():
-            print(f'[{time} -> {time + task.process_time}]: {task.name} (remaining time: {task.remaining_time}, deadline: {task.deadline})')
+        # Every scheduled task finishes exactly once
+        return self.metrics.num_finished
+
+    def checkpoint(self):
+        # The log only grows, apart from the latest slice which may still be
+        # extended, so its length and that slice are enough to rewind it
+        last = self.last
+        return (len(self.slices), len(self.tasks),
+                self.makespan, self.lateness, self.deadline_missed,
+                last, last and (last.length, last.remaining_after),
+                dict(self.first_start), self.metrics.copy())
+
+    def restore(self, state):
+        (num_slices, num_tasks, self.makespan, self.lateness,
+         self.deadline_missed, self.last, last_state, first_start,
+         metrics) = state
+        # Each task's dropped slices are its latest ones
+        for record in self.slices[num_slices:len(self.starts)]:
+            task_slices = self.task_slices[record.task_id]
+            task_slices.pop()
+            if not task_slices:
+                del self.task_slices[record.task_id]
+        del self.starts[num_slices:]
+        del self.slices[num_slices:]
+        while len(self.tasks) > num_tasks:
+            self.tasks.popitem()
+        if self.last is not None:
+            self.last.length, self.last.remaining_after = last_state
+        self.first_start = dict(first_start)
+        self.metrics = metrics.copy()
+        self.finalized = False
+
+    def merge(self, other):
+        # Adds the statistics of `other`, a log of other tasks run in
+        # parallel, e.g. on another worker. Slices are not copied over.
+        assert not (self.finalized or other.finalized), "Merge before finalizing"
+        self.makespan += other.makespan
+        self.lateness += other.lateness
+        self.deadline_missed += other.deadline_missed
+        self.metrics.merge(other.metrics)
+
+    def copy(self):
+        # Independent copy, e.g. to finalize without touching this log.
+        # Only the latest slice can still change, so only it is duplicated.
+        scheduled = copy.copy(self)
+        scheduled.slices = list(self.slices)
+        if scheduled.slices:
+            last = self.slices[-1]
+            scheduled.slices[-1] = scheduled.last = Slice(
+                last.task_id, last.start, last.length, last.remaining_after)
+        scheduled.tasks = dict(self.tasks)
+        scheduled.first_start = dict(self.first_start)
+        scheduled.metrics = self.metrics.copy()
+        # Its latest slice is another object: index the copy afresh
+        scheduled.starts = []
+        scheduled.task_slices = {}
+        return scheduled
+
+    # Timeline queries
+
+    def index(self):
+        # Brings the index up to date with the slices added since the last
+        # query. Call it before sharing the log between threads: queries
+        # then only read.
+        new = self.slices[len(self.starts):]
+        if not new:
+            return
+        self.starts.extend([record.start for record in new])
+        task_slices = self.task_slices
+        for record in new:
+            if record.task_id in task_slices:
+                task_slices[record.task_id].append(record)
+            else:
+                task_slices[record.task_id] = [record]
+
+    def at(self, time):
+        # The slice running at `time`, or None when idle
+        self.index()
+        index = bisect.bisect_right(self.starts, time) - 1
+        if index >= 0 and self.slices[index].end > time:
+            return self.slices[index]
+        return None
+
+    def next_slice(self, time):
+        # The slice running at `time`, else the next one to start, else None
+        self.index()
+        index = first_ending_after(self.slices, self.starts, time)
+        return self.slices[index] if index < len(self.slices) else None
+
+    def between(self, start=-math.inf, end=math.inf, offset=0, limit=None):
+        # The slices overlapping [start, end), in time order; `offset` and
+        # `limit` select a page of them
+        self.index()
+        return overlapping(self.slices, self.starts, start, end, offset, limit)
+
+    def count_between(self, start=-math.inf, end=math.inf):
+        # How many slices `between` has, e.g. for the number of pages
+        self.index()
+        return max(0, bisect.bisect_left(self.starts, end) -
+                   first_ending_after(self.slices, self.starts, start))
+
+    def slices_of(self, task_id, start=-math.inf, end=math.inf, offset=0, limit=None):
+        # The same for the slices of one task
+        self.index()
+        task_slices = self.task_slices.get(task_id, [])
+        return overlapping(task_slices, task_slices, start, end, offset, limit, START)
+
+    def print(self, start=-math.inf, end=math.inf):
+        for record in self.between(start, end):
+            task = self.tasks[record.task_id]
+            print(f'[{record.start} -> {record.end}]: {task.name} (remaining time: {record.remaining_after}, deadline: {task.deadline})')
     def print_statistics(self):
         print(f'Average makespan: {self.makespan}')
         print(f'Average lateness : {self.lateness}')
@@ -126,51 +275,213 @@ class ScheduledTasks:
 
 
 class Scheduler:
+    # Discrete-event simulation: arrivals and the end of the running slice
+    # (completion or quantum expiry) live in one time-ordered EventQueue, and
+    # the clock jumps straight from one event to the next.
+    # Policies plug in through the hooks below (`make_ready_queue`,
+    # `ready_key`, `get_next_task`, `should_preempt`, `refill`, `on_arrival`,
+    # `on_preempt`, `on_retire`).
+    # Set `keep_slices = False` to keep only the statistics, not the slices.
+    # Availability: `calendar` (an availability.Calendar) says when anything
+    # can run, `windows` maps task ids to calendars of when each task can.
+    # The clock jumps over closed time, and a task outside its window is set
+    # aside until it opens.
+    keep_slices = True
+
     def __init__(self, preemptive, verbose=False):
+        if type(self) is Scheduler:
+            raise TypeError("Scheduler is abstract: use a policy subclass, "
+                            "e.g. from get_scheduler_from_string")
         self.preemptive = preemptive
-        self.not_arrived = []
-        self.pending = []
+        self.clock = 0
+        self.events = EventQueue()
+        self.num_not_arrived = 0
+        self.num_unfinished = 0
+        self.pending = self.make_ready_queue()
         self.completed = []
         self.active = None
-        self.unscheduled_task_list = []
+        self.stop_event = None  # Event ending the running slice
+        self.dependencies = None  # DependencyIndex, if any task has prerequisites
+        self.calendar = None
+        self.windows = {}  # task id -> Calendar
+        self.asleep = {}  # task id -> WAKE event of a task set aside
+        self.profiler = None  # profiler.Profiler, to see where a run goes
+        self.task_list = []
         self.scheduled_tasks = ScheduledTasks()
         self.verbose = verbose
+        # Tracing is off unless a sink is attached; verbose prints the trace
+        self.tracer = None
+        if verbose:
+            self.add_trace_sink(PrintSink())
 
     def schedule(self, task_list):
         # https://nicomedes.assistedcoding.eu/#/app/os/process_scheduling ref
         # Copy so that the original list is not affected
         # Maybe we shouldn't handle it here...
-        self.unscheduled_task_list = copy.deepcopy(task_list)
+        self.load(copy.deepcopy(task_list))
+        self.run()
+        self.scheduled_tasks.finalize()
 
-        # [self.not_arrived.put(task) for task in self.unscheduled_task_list]
-        self.not_arrived = copy.copy(self.unscheduled_task_list)
-        self.not_arrived.sort(key=lambda t: t.arrival_time)
-        # Nothing arrived now
+    def load(self, task_list):
+        # Start a fresh simulation over `task_list` (used as is, not copied).
+        # A TaskTable is read lazily: each Task is built as it arrives.
+        self.task_list = task_list
+        self.num_not_arrived = self.num_unfinished = len(self.task_list)
+        self.pending = self.make_ready_queue()
+        self.completed = []
+        self.active = None
+        self.stop_event = None
+        self.asleep = {}
+        self.scheduled_tasks = ScheduledTasks(self.keep_slices)
+        self.dependencies = (DependencyIndex(self.task_list)
+                             if has_prerequisites(self.task_list) else None)
 
-        # Shallow copy (different order, same references)
-        # all_task_list = copy.copy(self.unscheduled_task_list)
+        # Nothing arrived now. Same-time arrivals keep their list order.
+        self.events = EventQueue(arrivals=arrival_order(self.task_list))
 
         self.clock = 0
-        # Sort the list first
-        # self.sort_task_list()
-        # scheduled_tasks = ScheduledTasks()
-        # Begin scheduling
-        next_tick = 0
-        while self.unscheduled_task_list:
-            next_tick = self.process_tick(next_tick)
-
-        self.scheduled_tasks.finalize()
-
-    def print_verbose(self, format):
-        if self.verbose:
-            print(format)
+        self.process_tick(0)
+
+    def stream(self, task_iterable):
+        # Simulate tasks pulled lazily from any iterable (a generator, a
+        # trace being read, ...) in arrival order. Yields each Slice once it
+        # is final; statistics are in `scheduled_tasks.metrics` as it goes.
+        # Only the pending and running tasks are held, not the slices nor
+        # the finished tasks, so memory is bounded by concurrency rather
+        # than by the length of the stream. Prerequisites are not supported:
+        # they need the whole task list up front.
+        self.load([])
+        self.completed = deque(maxlen=0)  # Finished tasks are not kept
+        self.scheduled_tasks = log = ScheduledTasks(keep_slices=False)
+        self.task_list = task_iterable
+        self.events = EventQueue(arrivals=self.pull(task_iterable))
+        self.process_tick(0)
+
+        last = None
+        profiler = self.profiler
+        step = self.step if profiler is None else profiler.begin(self)
+        while self.num_unfinished:
+            step()
+            if log.last is not last:
+                # A new slice started: the previous one can't grow anymore
+                if last is not None:
+                    yield last
+                last = log.last
+        if last is not None:
+            yield last
+        if profiler is not None:
+            profiler.end(self)
+        log.finalize()
+
+    def pull(self, task_iterable):
+        # Counts the tasks as the event queue reads them, so that "still
+        # to arrive" means the one read ahead
+        previous = None
+        for task in task_iterable:
+            assert previous is None or task.arrival_time >= previous, \
+                "Streamed tasks must come in arrival order"
+            assert not task.prerequisite, "Prerequisites can't be streamed"
+            previous = task.arrival_time
+            self.num_not_arrived += 1
+            self.num_unfinished += 1
+            yield task
+
+    def run(self):
+        if self.profiler is not None:
+            # Checked once per run, not per step
+            self.profiler.run(self)
+            return
+        while self.num_unfinished:
+            self.step()
+
+    def step(self):
+        # Handle the next event and return its time
+        time, kind, task = self.events.pop()
+        if kind == ARRIVAL or kind == WAKE:
+            if kind == ARRIVAL:
+                self.on_arrival(task)
+            else:
+                self.wake(task)
+            if not (self.active is None or self.preemptible()):
+                # A running task that can't be preempted doesn't care
+                return time
+        self.process_tick(time)
+        return time
+
+    def checkpoint(self):
+        # Everything needed to resume the simulation from here, except the
+        # tasks that have not arrived yet: they are untouched so far, and
+        # `restore` gets them back from the caller
+        in_flight = list(self.pending.snapshot_tasks())
+        if self.active:
+            in_flight.append(self.active)
+        if self.dependencies:
+            # Waiting tasks haven't run yet, but will have after the rewind
+            in_flight.extend(self.dependencies.waiting.values())
+        asleep = [(entry[0], entry[3]) for entry in self.asleep.values()]
+        in_flight.extend(task for _, task in asleep)
+        return {
+            'clock': self.clock,
+            'pending': self.pending.snapshot(),
+            'active': self.active,
+            # (time, kind) of the event ending the running slice
+            'stop': (self.stop_event[0], self.stop_event[2]) if self.stop_event else None,
+            'asleep': asleep,  # (wake time, task)
+            'tasks': [(task, task.remaining_time, task.quota) for task in in_flight],
+            'num_arrived': len(self.task_list) - self.num_not_arrived,
+            'num_not_arrived': self.num_not_arrived,
+            'num_unfinished': self.num_unfinished,
+            'num_completed': len(self.completed),
+            'log': self.scheduled_tasks.checkpoint(),
+            'dependencies': self.dependencies and self.dependencies.checkpoint(),
+        }
+
+    def restore(self, state, not_arrived):
+        # Rewind to `state`. `not_arrived` are the tasks still to arrive,
+        # which may differ from the ones at checkpoint time.
+        self.clock = state['clock']
+        self.pending.restore(state['pending'])
+        self.active = state['active']
+        for task, remaining_time, quota in state['tasks']:
+            task.remaining_time = remaining_time
+            task.quota = quota
+        if not isinstance(not_arrived, TaskTable):
+            # Rows of a table are built fresh as they arrive
+            for task in not_arrived:
+                task.reset()
+        self.events = EventQueue(arrivals=arrival_order(not_arrived))
+        self.stop_event = None
+        if state['stop']:
+            time, kind = state['stop']
+            self.stop_event = self.events.push(time, kind, self.active)
+        self.asleep = {task.id: self.events.push(time, WAKE, task)
+                       for time, task in state.get('asleep', ())}
+        self.num_unfinished = (state['num_unfinished'] - state['num_not_arrived']
+                               + len(not_arrived))
+        self.num_not_arrived = len(not_arrived)
+        del self.completed[state['num_completed']:]
+        self.scheduled_tasks.restore(state['log'])
+        if self.dependencies:
+            self.dependencies.restore(state['dependencies'])
+
+    def add_trace_sink(self, sink):
+        # e.g. RingBufferSink(), JSONLinesSink(path), ChromeTraceSink(path)
+        if self.tracer is None:
+            self.tracer = Tracer()
+        self.tracer.sinks.append(sink)
+        return sink
 
     def print_lists(self):
+        # O(n): only called in verbose mode
         if self.verbose:
+            print(f'[Tick {self.clock}]:')
             print('Not arrived:', [
-                  f'{task.name_elasped_time()}' for task in self.not_arrived])
+                  f'{task.name_elasped_time()}' for _, kind, task in self.events if kind == ARRIVAL])
             print('Pending:', [
                   f'{task.name_elasped_time()}' for task in self.pending])
+            if self.dependencies:
+                print('Waiting:', [
+                      f'{task.name_elasped_time()}' for task in self.dependencies.waiting.values()])
             print(
                 'Active:', f'{self.active.name_elasped_time()}' if self.active else 'None')
             print('Completed:', [
@@ -178,136 +489,332 @@ class Scheduler:
     def preemptible(self):
         return self.active and self.active.preemptible and self.preemptive
 
-    def process_tick(self, tick):
-        self.clock += tick
-        self.print_verbose(f'[Tick {self.clock}]:')
-        self.print_lists()
+    def on_arrival(self, task):
+        if self.tracer is not None:
+            self.tracer.emit(task.arrival_time, ARRIVE, task)
+        self.num_not_arrived -= 1
+        if self.dependencies and self.dependencies.blocked(task):
+            # Kept out of the ready queue until its prerequisites finish
+            self.dependencies.hold(task)
+            return
+        self.pending.append(task)
+
+    def on_preempt(self, task):
+        if self.tracer is not None:
+            self.tracer.emit(self.clock, PREEMPT, task)
+        self.pending.append(task)
+
+    def on_retire(self, task):
+        if self.tracer is not None:
+            self.tracer.emit(self.clock, RETIRE, task)
+        self.num_unfinished -= 1
+        self.completed.append(task)
+        if self.dependencies:
+            for released in self.dependencies.release(task):
+                self.pending.append(released)
+
+    def process_tick(self, time):
+        # Make one scheduling decision at `time`
+        tick = time - self.clock
+        self.clock = time
+        if self.verbose:
+            self.print_lists()
+        ended = None
+        if self.stop_event:
+            if self.stop_event[2] == RESUME:
+                tick = 0  # Nothing ran while the calendar was closed
+            elif self.stop_event[0] == time:
+                ended = self.stop_event[2]
+            self.events.cancel(self.stop_event)
+            self.stop_event = None
         if self.active:
             self.active.quota -= tick
             self.active.remaining_time -= tick
-          
-            self.print_verbose(
-                f'Execute Process {self.active.name_elasped_time()}')
+            if ended is not None:
+                # The slice ran to its planned end. With float times
+                # (clock + x) - clock may not be x: take the log's figure,
+                # so no sliver of work or quantum is left behind.
+                self.active.remaining_time = self.scheduled_tasks.last.remaining_after
+                if ended == QUANTUM_EXPIRY:
+                    self.active.quota = 0
             if self.active.remaining_time <= 0:
-                self.print_verbose(f'Process {self.active.name} retired')
-                self.unscheduled_task_list.remove(self.active)
-                self.completed.append(self.active)
+                self.on_retire(self.active)
                 self.active = None
 
         # Move not_arrived -> arrived
-        while True:
-            if self.not_arrived:
-                arriving_task = self.not_arrived[0]
-                if arriving_task.arrival_time <= self.clock:
-                    self.print_verbose(
-                        f'Process {arriving_task.name} enter pending queue')
-                    self.not_arrived.remove(arriving_task)
-                    self.pending.append(arriving_task)
-                else:
-                    break
+        while self.events and self.events.peek_time() <= self.clock:
+            _, kind, arriving_task = self.events.pop()
+            if kind == WAKE:
+                self.wake(arriving_task)
             else:
-                arriving_task = None
-                break
-        
+                self.on_arrival(arriving_task)
+
+        if self.calendar is not None:
+            # Closed: jump straight to the next opening, O(log n)
+            opens = self.calendar.next_open(self.clock)
+            if opens > self.clock:
+                if self.active or self.pending:
+                    assert opens != math.inf, f"The calendar never opens after {self.clock}"
+                    self.stop_event = self.events.push(opens, RESUME, self.active)
+                    self.scheduled_tasks.break_slice()
+                return
+        if self.windows and self.active and not self.in_window(self.active):
+            # Its window closed: set aside, even if it can't be preempted
+            self.set_aside(self.active)
+            self.active = None
+            self.scheduled_tasks.break_slice()
+
         # Check if we should preempt
         if self.preemptible():
-            if arriving_task or self.pending:
-                self.print_verbose(f'Preempted {self.active.name}')
-                self.pending.append(self.active)
+            if (self.num_not_arrived or self.pending) and self.should_preempt():
+                self.on_preempt(self.active)
                 self.active = None
             elif self.active.quota <= 0:
-                self.active.refill_quota()
+                self.refill(self.active)
 
         # Move pending -> active
         if self.pending:
             task = self.get_next_task()
             if not self.active:
-                # Idling
-                self.print_verbose(
-                    f'Process {task.name} moved pending -> active')
-                self.active = task
-                if self.preemptible():
-                    self.active.refill_quota()
-                self.pending.remove(task)
-
-        # No disrupting event, so refil quota
-        # if not self.pending and not arriving_task and self.active.quota <= 0:
-        #     self.active.quota = self.active.min_quantum
-
-       # Finally, return next tick?
+                if self.windows:
+                    task = self.first_in_window(task)
+                if task is not None:
+                    # Idling
+                    self.active = task
+                    self.pending.remove(task)
+                    if self.tracer is not None:
+                        self.tracer.emit(self.clock, DISPATCH, task)
+                    if self.preemptible():
+                        self.refill(task)
+
+        # Finally, schedule the end of this slice. An earlier arrival
+        # preempts it through its own event.
         if self.active:
-            if self.preemptible():
-                if arriving_task:
-                    next_tick = min(self.active.quota, self.active.remaining_time,
-                                    arriving_task.arrival_time - self.clock)
-                elif self.pending:
-                    next_tick = min(self.active.quota,
-                                    self.active.remaining_time)
-                else:
-                    next_tick = self.active.remaining_time
-            else:
-                # Non-preemptible
-                # if arriving_task:
-                    # next_tick = min(self.active.remaining_time,
-                                    # arriving_task.arrival_time - self.clock)
-                # else:
-                next_tick = self.active.remaining_time
+            next_tick = self.active.remaining_time
+            kind = COMPLETION
+            if self.preemptible() and (self.num_not_arrived or self.pending or self.asleep):
+                if self.active.quota < next_tick:
+                    next_tick = self.active.quota
+                    kind = QUANTUM_EXPIRY
+                if self.num_not_arrived or self.asleep:
+                    until_arrival = self.events.peek_time() - self.clock
+                    if until_arrival < next_tick:
+                        next_tick = until_arrival
+                        kind = CUT
+            if self.calendar is not None or self.windows:
+                until_closed = self.closes(self.active) - self.clock
+                if until_closed < next_tick:
+                    next_tick = until_closed
+                    kind = PAUSE
+            self.stop_event = self.events.push(
+                self.clock + next_tick, kind, self.active)
             self.scheduled_tasks.add_task(self.active, self.clock, next_tick)
-        else:
-            if arriving_task:
-                next_tick = arriving_task.arrival_time - self.clock
-            else:
-                next_tick = 0
-        return next_tick
+
+    def in_window(self, task):
+        window = self.windows.get(task.id)
+        return window is None or window.is_open(self.clock)
+
+    def first_in_window(self, task):
+        # `task` or the next pending task that is in its window now, setting
+        # aside the ones that aren't; None if none is
+        while not self.in_window(task):
+            self.pending.remove(task)
+            self.set_aside(task)
+            if not self.pending:
+                return None
+            task = self.get_next_task()
+        return task
+
+    def set_aside(self, task):
+        # Out of the ready queue until its window opens again
+        opens = self.windows[task.id].next_open(self.clock)
+        assert opens != math.inf, f"Task {task.id!r} has no time left in its window"
+        self.asleep[task.id] = self.events.push(opens, WAKE, task)
+
+    def wake(self, task):
+        del self.asleep[task.id]
+        self.pending.append(task)
+
+    def closes(self, task):
+        # When `task` has to stop running, by the calendar or its window
+        closes = math.inf
+        if self.calendar is not None:
+            closes = self.calendar.open_until(self.clock)
+        window = self.windows.get(task.id)
+        if window is not None:
+            closes = min(closes, window.open_until(self.clock))
+        return closes
+
+    def should_preempt(self):
+        # Called at each decision while other work is pending or still to
+        # arrive: whether the running task goes back to the ready queue so
+        # the policy can pick again
+        return True
+
+    def refill(self, task):
+        # Give `task` a new quantum
+        task.refill_quota()
+        if self.tracer is not None:
+            self.tracer.emit(self.clock, QUOTA_REFILL, task)
+
+    def set_priority(self, task, priority):
+        # Change a task's priority mid-run. A pending task is re-keyed in
+        # O(log n) rather than re-sorting the queue.
+        task.priority = priority
+        if task in self.pending:
+            self.pending.update(task)
+
+    def make_ready_queue(self):
+        # Policies plug in through `ready_key(task)`: the pending task with
+        # the smallest key is dispatched first. Policies that don't order by
+        # key (e.g. RR) override this instead.
+        return ReadyQueue(self.ready_key)
 
     def get_next_task(self):
         # Get next task based on the algorithm
-        self.sort_task_list()
-        task = self.pending[0]
-        return task
+        return self.pending.peek()
         # Shortest remaining time first is a preemtive mode of SJF
         # Earliest due date
-        # self.task_list.sort(key=lambda t: t.deadline)
 
 
 class RRScheduler(Scheduler):
-    def __init__(self, preemtive=False, verbose=False):
+    # Round robin over a FIFO deque: dispatch takes the head and a task whose
+    # quantum ran out goes to the tail, all O(1). In preemptive mode a task
+    # only gives up the CPU when its quantum is used up; arrivals just queue.
+    # The quantum is `quantum` time units if set, else each task's own
+    # min_quantum.
+    quantum = None
+
+    def __init__(self, preemtive=False, verbose=False, quantum=None):
         Scheduler.__init__(self, preemtive, verbose)
-        self.rr_index = -1
+        if quantum is not None:
+            self.quantum = quantum
+
+    def make_ready_queue(self):
+        return FIFOQueue()
+
+    def quantum_for(self, task):
+        return task.min_quantum if self.quantum is None else self.quantum
+
+    def on_arrival(self, task):
+        task.quota = 0  # Gets a fresh quantum at its first dispatch
+        Scheduler.on_arrival(self, task)
+
+    def should_preempt(self):
+        return self.active.quota <= 0
+
+    def refill(self, task):
+        # A task keeps what is left of its quantum until it is used up
+        if task.quota <= 0:
+            task.quota = self.quantum_for(task)
+            if self.tracer is not None:
+                self.tracer.emit(self.clock, QUOTA_REFILL, task)
+
+
+class MLFQScheduler(RRScheduler):
+    # Multilevel feedback queue: round robin within each level, level 0
+    # first, with quanta growing down the levels. New tasks start at the
+    # top; a task that uses up its quantum moves one level down, so long
+    # tasks sink and short or interactive ones stay responsive. A task at a
+    # higher level preempts one at a lower level, which resumes its quantum
+    # later. Every `boost_interval` time units all tasks go back to level 0
+    # so nothing starves (applied at the next decision after the interval).
+    quanta = (10, 20, 40)
+    boost_interval = None
+
+    def __init__(self, preemtive=False, verbose=False, quanta=None,
+                 boost_interval=None):
+        if quanta is not None:
+            self.quanta = tuple(quanta)
+        if boost_interval is not None:
+            self.boost_interval = boost_interval
+        RRScheduler.__init__(self, preemtive, verbose)
+        self.next_boost = self.boost_interval
+
+    def make_ready_queue(self):
+        return MultiLevelQueue(len(self.quanta))
+
+    def load(self, task_list):
+        self.next_boost = self.boost_interval
+        RRScheduler.load(self, task_list)
+
+    def checkpoint(self):
+        state = RRScheduler.checkpoint(self)
+        state['next_boost'] = self.next_boost
+        return state
+
+    def restore(self, state, not_arrived):
+        RRScheduler.restore(self, state, not_arrived)
+        self.next_boost = state['next_boost']
+
+    def quantum_for(self, task):
+        return self.quanta[self.pending.level[task.id]]
+
+    def should_preempt(self):
+        return (self.active.quota <= 0 or
+                self.pending.top_level() < self.pending.level[self.active.id])
+
+    def on_preempt(self, task):
+        if task.quota <= 0:
+            level = self.pending.level
+            level[task.id] = min(level[task.id] + 1, len(self.quanta) - 1)
+            Scheduler.on_preempt(self, task)
+        else:
+            if self.tracer is not None:
+                self.tracer.emit(self.clock, PREEMPT, task)
+            self.pending.push_front(task)
 
-    def sort_task_list(self):
-        # self.pending.sort(key=lambda t: t.arrival_time)
-        pass
+    def on_retire(self, task):
+        del self.pending.level[task.id]
+        RRScheduler.on_retire(self, task)
 
     def get_next_task(self):
-        self.rr_index = (self.rr_index + 1) % len(self.pending)
-        # task = self.try_get_task(clock, self.rr_index)
-        task = self.pending[self.rr_index]
-        return task
+        if self.next_boost is not None and self.clock >= self.next_boost:
+            self.boost()
+        return self.pending.peek()
+
+    def boost(self):
+        # Everything back to level 0, queued in level order. O(n), once per
+        # interval.
+        pending = self.pending
+        tasks = pending.snapshot_tasks()
+        for queue in pending.levels:
+            queue.clear()
+        pending.size = 0
+        for id in pending.level:
+            pending.level[id] = 0
+        for task in tasks:
+            pending.push(task)
+        while self.next_boost <= self.clock:
+            self.next_boost += self.boost_interval
 
 
 class SJFScheduler(Scheduler):
     def __init__(self, preemtive=False, verbose=False):
         Scheduler.__init__(self, preemtive, verbose)
 
-    def sort_task_list(self):
-        self.pending.sort(key=lambda t: t.estimated_time)
+    @staticmethod
+    def ready_key(task):
+        return task.estimated_time
 
 
 class LJFScheduler(Scheduler):
     def __init__(self, preemtive=False, verbose=False):
         Scheduler.__init__(self, preemtive, verbose)
 
-    def sort_task_list(self):
-        self.pending.sort(key=lambda t: t.estimated_time, reverse=True)
+    @staticmethod
+    def ready_key(task):
+        # Negated rather than reversed: ties must still go first-in first-out
+        return -task.estimated_time
 
 
 class FCFSScheduler(Scheduler):
     def __init__(self, preemtive=False, verbose=False):
         Scheduler.__init__(self, preemtive, verbose)
 
-    def sort_task_list(self):
-        self.pending.sort(key=lambda t: t.arrival_time)
+    @staticmethod
+    def ready_key(task):
+        return task.arrival_time
 
 
 class EDFScheduler(Scheduler):
@@ -315,8 +822,95 @@ class EDFScheduler(Scheduler):
     def __init__(self, preemtive=False, verbose=False):
         Scheduler.__init__(self, preemtive, verbose)
 
-    def sort_task_list(self):
-        self.pending.sort(key=lambda t: t.deadline)
+    @staticmethod
+    def ready_key(task):
+        return task.deadline
+
+
+# Weighted policies. `Task.priority` is the task's weight: higher is more
+# important.
+
+class WSPTScheduler(Scheduler):
+    # Weighted shortest processing time first (Smith's rule): smallest
+    # estimated_time / priority first, which minimizes the total weighted
+    # completion time on one machine.
+    def __init__(self, preemtive=False, verbose=False):
+        Scheduler.__init__(self, preemtive, verbose)
+
+    @staticmethod
+    def ready_key(task):
+        return task.estimated_time / task.priority
+
+
+class PriorityScheduler(Scheduler):
+    # Highest priority first, with aging: a task's effective priority grows
+    # by `aging_rate` per time unit spent in the queue, so low priorities
+    # don't starve.
+    # Effective priority at time t is priority + aging_rate * (t - enqueued),
+    # and the aging_rate * t term is the same for every queued task. The
+    # order therefore never changes while tasks wait, and the key can be
+    # fixed at enqueue time: aging costs nothing per tick.
+    aging_rate = 0.01
+
+    def __init__(self, preemtive=False, verbose=False):
+        Scheduler.__init__(self, preemtive, verbose)
+
+    def ready_key(self, task):
+        # Arrivals are queued at their arrival time, before the clock moves
+        enqueued = max(self.clock, task.arrival_time)
+        return self.aging_rate * enqueued - task.priority
+
+
+class StrideScheduler(Scheduler):
+    # Stride scheduling, the discrete form of weighted fair queueing: each
+    # task advances a virtual "pass" by 1 / priority per time unit it runs,
+    # and the lowest pass goes next, so in preemptive mode CPU time is
+    # shared in proportion to priority. Tasks join at the current virtual
+    # time rather than at 0, so late arrivals can't monopolize the CPU.
+    def __init__(self, preemtive=False, verbose=False):
+        Scheduler.__init__(self, preemtive, verbose)
+        self.start_pass = {}  # task id -> virtual time when it arrived
+        self.virtual_time = 0
+
+    def load(self, task_list):
+        self.start_pass = {}
+        self.virtual_time = 0
+        Scheduler.load(self, task_list)
+
+    def checkpoint(self):
+        state = Scheduler.checkpoint(self)
+        state['start_pass'] = dict(self.start_pass)
+        state['virtual_time'] = self.virtual_time
+        return state
+
+    def restore(self, state, not_arrived):
+        Scheduler.restore(self, state, not_arrived)
+        self.start_pass = dict(state['start_pass'])
+        self.virtual_time = state['virtual_time']
+
+    def on_arrival(self, task):
+        self.start_pass[task.id] = self.virtual_time
+        Scheduler.on_arrival(self, task)
+
+    def on_retire(self, task):
+        del self.start_pass[task.id]
+        Scheduler.on_retire(self, task)
+
+    def ready_key(self, task):
+        executed = task.estimated_time - task.remaining_time
+        return self.start_pass[task.id] + executed / task.priority
+
+    def get_next_task(self):
+        task = self.pending.peek()
+        self.virtual_time = max(self.virtual_time, self.ready_key(task))
+        return task
+
+
+def arrival_order(task_list):
+    # Tasks sorted by arrival time, ties in list order
+    if isinstance(task_list, TaskTable):
+        return task_list.in_arrival_order()
+    return sorted(task_list, key=lambda task: task.arrival_time)
 
 
 def get_scheduler_from_string(name, preemptive=False, verbose=False):
@@ -332,6 +926,14 @@ def get_scheduler_from_string(name, preemptive=False, verbose=False):
         scheduler = SJFScheduler(preemptive, verbose=verbose)
     if name == "LJF":
         scheduler = LJFScheduler(preemptive, verbose=verbose)
+    if name == "WSPT":
+        scheduler = WSPTScheduler(preemptive, verbose=verbose)
+    if name == "PRIO":
+        scheduler = PriorityScheduler(preemptive, verbose=verbose)
+    if name == "STRIDE":
+        scheduler = StrideScheduler(preemptive, verbose=verbose)
+    if name == "MLFQ":
+        scheduler = MLFQScheduler(preemptive, verbose=verbose)
 
     assert scheduler is not None, "Unknown scheduler name"
     return scheduler
@@ -348,23 +950,28 @@ def test_scheduler(algorithm, task_list, preemptive=False, verbose=False):
 
 
 def test_all_schedulers(task_list, verbose=False):
-    all_schedulers = ["FCFS", "EDF", "RR", "SJF", "LJF"]
+    all_schedulers = ["FCFS", "EDF", "RR", "SJF", "LJF", "WSPT", "PRIO", "STRIDE", "MLFQ"]
     for sched in all_schedulers:
         test_scheduler(sched, task_list, False, verbose)
         test_scheduler(sched, task_list, True,verbose)
 
 
-def test_schedulers_random_tasks(num_tasks=100):
-    print("------ Random tasks test -------")
-    print(f'Generating {num_tasks} tasks')
-    random.seed(69)
+def random_workload(num_tasks, seed=69):
+    # Random tasks arriving in order, with their own generator
+    rng = random.Random(seed)
     task_list = []
     arrival_time = 0
     for i in range(num_tasks):
-        arrival_time += random.randint(0, 10)
+        arrival_time += rng.randint(0, 10)
         task_list.append(Task(name="Task_" + str(i), id=i, arrival_time=arrival_time,
-                         estimated_time=random.randint(10, 100), deadline=arrival_time + random.randint(10, 1000)))
+                         estimated_time=rng.randint(10, 100), deadline=arrival_time + rng.randint(10, 1000)))
+    return task_list
 
+
+def test_schedulers_random_tasks(num_tasks=100):
+    print("------ Random tasks test -------")
+    print(f'Generating {num_tasks} tasks')
+    task_list = random_workload(num_tasks, 69)
     test_all_schedulers(task_list, verbose=False)
 
 
@@ -395,6 +1002,8 @@ def test_schedulers_basic():
     # test_scheduler("EDF",task_list, preemptive = False)
 
 
-# test_schedulers_basic()
-test_schedulers_random_tasks(10)
+if __name__ == '__main__':
+    # python -m life_scheduler.scheduler
+    # test_schedulers_basic()
+    test_schedulers_random_tasks(10)
 
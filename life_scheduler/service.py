@@ -0,0 +1,262 @@
+import argparse
+import asyncio
+import itertools
+import json
+import math
+import time
+from urllib.parse import parse_qs, urlsplit
+
+from .scheduler import get_scheduler_from_string
+from .session import SchedulingSession
+from .task import Task
+
+# Live scheduling service: one long-lived SchedulingSession behind a small
+# JSON-over-HTTP API, on TCP or a Unix socket.
+#
+#   GET    /next?now=T          what to work on at T (default: the clock)
+#   GET    /tasks               open tasks
+#   GET    /schedule            the planned slices; ?start=&end= for a time
+#                               range, ?task= for one task's, and
+#                               ?offset=&limit= for a page of them
+#   GET    /stats               metrics of the planned schedule
+#   POST   /tasks               create a task (JSON body of Task fields)
+#   PATCH  /tasks/<id>          change estimated_time, deadline or priority
+#   POST   /tasks/<id>/complete mark a task done
+#   DELETE /tasks/<id>          drop a task
+#
+# Changes are applied one at a time, in a worker thread, so the event loop
+# keeps answering reads while the session recomputes. Reads are served from
+# the last published copy of the schedule, which is replaced in one
+# assignment after each change. Its timeline index is built on publishing,
+# so "what next" and each page of slices are binary searches over it.
+
+TASK_FIELDS = ('name', 'arrival_time', 'estimated_time', 'deadline', 'priority',
+               'preemptible', 'min_quantum', 'prerequisite')
+UPDATE_FIELDS = ('estimated_time', 'deadline', 'priority')
+
+
+class RequestError(Exception):
+    # Turned into an HTTP error response
+    def __init__(self, status, message):
+        Exception.__init__(self, message)
+        self.status = status
+
+
+class SchedulingService:
+    def __init__(self, scheduler, task_list=(), clock=None):
+        self.session = SchedulingSession(scheduler, task_list)
+        # Current time in task time units; minutes since start by default
+        self.clock = clock or self.minutes_since_start()
+        self.ids = itertools.count(max((task.id for task in task_list), default=-1) + 1)
+        self.completed = {}  # task id -> completion time
+        self.lock = asyncio.Lock()
+        self.publish()
+
+    @staticmethod
+    def minutes_since_start():
+        start = time.monotonic()
+        return lambda: (time.monotonic() - start) / 60
+
+    def publish(self):
+        # Snapshot for readers; the raw log keeps changing under the session
+        scheduled = self.session.scheduled_tasks
+        scheduled.index()
+        self.schedule = scheduled
+        self.open_tasks = list(self.session.tasks)
+
+    # Reads: no lock, no waiting on a recomputation
+
+    def next_task(self, now=None):
+        now = self.clock() if now is None else now
+        scheduled = self.schedule
+        tasks = scheduled.tasks
+        upcoming = scheduled.next_slice(now)
+        if upcoming is not None and upcoming.start <= now:
+            return {'now': now, 'task': task_json(tasks[upcoming.task_id]),
+                    'until': upcoming.end}
+        return {'now': now, 'task': None,
+                'next': upcoming and {'task': task_json(tasks[upcoming.task_id]),
+                                      'start': upcoming.start}}
+
+    def list_tasks(self):
+        return [task_json(task) for task in self.open_tasks]
+
+    def list_slices(self, start=-math.inf, end=math.inf, offset=0, limit=None, task=None):
+        scheduled = self.schedule
+        tasks = scheduled.tasks
+        if task is None:
+            slices = scheduled.between(start, end, offset, limit)
+        else:
+            slices = scheduled.slices_of(task, start, end, offset, limit)
+        return [{'task_id': s.task_id, 'name': tasks[s.task_id].name,
+                 'start': s.start, 'end': s.end} for s in slices]
+
+    def stats(self):
+        return self.schedule.metrics.as_dict()
+
+    # Changes: serialized, computed off the event loop
+
+    async def change(self, function, *args):
+        async with self.lock:
+            result = await asyncio.get_running_loop().run_in_executor(None, function, *args)
+            self.publish()
+            return result
+
+    async def create(self, fields):
+        unknown = set(fields) - set(TASK_FIELDS) - {'id'}
+        if unknown:
+            raise RequestError(400, f'Unknown task fields {sorted(unknown)}')
+        for field in ('estimated_time', 'deadline'):
+            if field not in fields:
+                raise RequestError(400, f'Missing task field {field!r}')
+        fields = dict(fields)
+        fields.setdefault('arrival_time', self.clock())
+        id = fields.pop('id', None)
+        if id is None:
+            id = next(self.ids)
+        fields.setdefault('name', f'Task_{id}')
+        task = Task(id=id, **fields)
+        await self.change(self.session.insert, task)
+        return task_json(self.session.by_id[id])
+
+    async def update(self, id, fields):
+        unknown = set(fields) - set(UPDATE_FIELDS)
+        if unknown:
+            raise RequestError(400, f'Only {", ".join(UPDATE_FIELDS)} can be changed')
+        self.find(id)
+        await self.change(lambda: self.session.update(id, **fields))
+        return task_json(self.session.by_id[id])
+
+    async def complete(self, id):
+        task = self.find(id)
+        await self.change(self.session.remove, id)
+        self.completed[id] = self.clock()
+        return dict(task_json(task), completed=self.completed[id])
+
+    async def remove(self, id):
+        task = self.find(id)
+        await self.change(self.session.remove, id)
+        return task_json(task)
+
+    def find(self, id):
+        if id not in self.session.by_id:
+            raise RequestError(404, f'No task {id!r}')
+        return self.session.by_id[id]
+
+    # HTTP
+
+    async def route(self, method, path, query, body):
+        parts = [part for part in path.split('/') if part]
+        if method == 'GET' and parts == ['next']:
+            now = query.get('now')
+            return self.next_task(float(now[0]) if now else None)
+        if method == 'GET' and parts == ['tasks']:
+            return self.list_tasks()
+        if method == 'GET' and parts == ['schedule']:
+            return self.list_slices(**slice_query(query))
+        if method == 'GET' and parts == ['stats']:
+            return self.stats()
+        if method == 'POST' and parts == ['tasks']:
+            return await self.create(body)
+        if len(parts) >= 2 and parts[0] == 'tasks':
+            id = parse_id(parts[1])
+            if method == 'PATCH' and len(parts) == 2:
+                return await self.update(id, body)
+            if method == 'DELETE' and len(parts) == 2:
+                return await self.remove(id)
+            if method == 'POST' and parts[2:] == ['complete']:
+                return await self.complete(id)
+        raise RequestError(404, f'No route for {method} {path}')
+
+    async def handle(self, reader, writer):
+        # One connection; HTTP/1.1 keep-alive
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length', 0))
+                raw = await reader.readexactly(length) if length else b''
+
+                status, payload = 200, None
+                try:
+                    body = json.loads(raw) if raw else {}
+                    url = urlsplit(target)
+                    payload = await self.route(method, url.path, parse_qs(url.query), body)
+                except RequestError as error:
+                    status, payload = error.status, {'error': str(error)}
+                except (ValueError, TypeError, AssertionError) as error:
+                    status, payload = 400, {'error': str(error)}
+                data = json.dumps(payload).encode()
+                writer.write(b'HTTP/1.1 %d %s\r\nContent-Type: application/json\r\n'
+                             b'Content-Length: %d\r\n\r\n' % (status, REASONS[status], len(data)) + data)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host='127.0.0.1', port=8000, path=None):
+        # Returns the asyncio server; a Unix socket if `path` is given
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle, path)
+        return await asyncio.start_server(self.handle, host, port)
+
+
+REASONS = {200: b'OK', 400: b'Bad Request', 404: b'Not Found'}
+
+
+def slice_query(query):
+    # Arguments of list_slices from the query string
+    arguments = {}
+    for name, parse in (('start', float), ('end', float), ('offset', int), ('limit', int),
+                        ('task', parse_id)):
+        if name in query:
+            arguments[name] = parse(query[name][0])
+    return arguments
+
+
+def parse_id(text):
+    try:
+        return int(text)
+    except ValueError:
+        return text
+
+
+def task_json(task):
+    return {'id': task.id, 'name': task.name, 'arrival_time': task.arrival_time,
+            'estimated_time': task.estimated_time, 'deadline': task.deadline,
+            'priority': task.priority}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve a live schedule over HTTP/JSON.')
+    parser.add_argument('--policy', default='EDF')
+    parser.add_argument('--preemptive', action='store_true')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--unix', metavar='PATH', help='listen on a Unix socket instead')
+    args = parser.parse_args(argv)
+
+    async def serve():
+        service = SchedulingService(get_scheduler_from_string(args.policy, args.preemptive))
+        server = await service.start(args.host, args.port, args.unix)
+        print(f'Serving on {args.unix or f"http://{args.host}:{args.port}"}')
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(serve())
+
+
+if __name__ == '__main__':
+    main()
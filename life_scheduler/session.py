@@ -0,0 +1,146 @@
+import bisect
+import copy
+import itertools
+
+
+class SchedulingSession:
+    # Keeps a schedule up to date while tasks are added, cancelled or
+    # re-estimated one at a time, e.g. from an interactive to-do app.
+    #
+    # The scheduler is checkpointed as it runs. A change can only affect the
+    # timeline from the changed task's arrival on, so the session rewinds to
+    # the last checkpoint before that point and re-simulates only the rest.
+    # Checkpoints are thinned out as the run grows, so memory stays bounded
+    # by `max_checkpoints`.
+    # With a `wal` (a WriteAheadLog), every change is logged once applied,
+    # before the call returns; see snapshot.py to restart from it.
+    def __init__(self, scheduler, task_list=(), checkpoint_interval=64,
+                 max_checkpoints=256, wal=None):
+        self.scheduler = scheduler
+        self.checkpoint_interval = checkpoint_interval
+        self.max_checkpoints = max_checkpoints
+        # Tasks in event order: by arrival time, then insertion order.
+        # Tasks that have arrived at a checkpoint are always a prefix.
+        self.tasks = []
+        self.keys = []  # (arrival_time, seq), parallel to `tasks`
+        self.by_id = {}
+        self.counter = itertools.count()
+        self.checkpoints = []  # (time of the last event handled, state)
+        self.num_recomputed = 0  # events re-simulated, for the curious
+        self.wal = wal
+
+        for task in task_list:
+            self.add(copy.deepcopy(task))
+        self.recompute(None)
+
+    def add(self, task):
+        assert task.id not in self.by_id, "Duplicate task id"
+        key = (task.arrival_time, next(self.counter))
+        index = bisect.bisect(self.keys, key)
+        self.keys.insert(index, key)
+        self.tasks.insert(index, task)
+        self.by_id[task.id] = task
+
+    def discard(self, task):
+        index = self.tasks.index(task, self.find(task))
+        del self.keys[index]
+        del self.tasks[index]
+        del self.by_id[task.id]
+
+    def find(self, task):
+        # Index of the first task arriving at the same time
+        return bisect.bisect_left(self.keys, (task.arrival_time,))
+
+    def affected_time(self, task):
+        # Earliest time whose decisions can depend on `task`.
+        # A decision at time c only looks at the task once it has arrived,
+        # with two exceptions while it is still to arrive:
+        # - its arrival can cut the slice planned at c. `rewind` handles
+        #   that by only keeping checkpoints whose slice ends before then.
+        # - in preemptive mode, whether any task is still to arrive. If
+        #   another task arrives after c, the answer is yes with or without
+        #   `task`, so only decisions after the last arrival among the other
+        #   tasks can change.
+        # Hence min(arrival, last arrival of the others).
+        time = task.arrival_time
+        last = self.tasks[-1] if self.tasks[-1] is not task else None
+        if last is None and len(self.tasks) > 1:
+            last = self.tasks[-2]
+        if last is not None:
+            time = min(time, last.arrival_time)
+        return time
+
+    def insert(self, task):
+        task = copy.deepcopy(task)
+        self.add(task)
+        # New prerequisites change the dependency index: start over
+        self.recompute(None if task.prerequisite else self.affected_time(task))
+        if self.wal is not None:
+            self.wal.insert(task)
+
+    def remove(self, task_id):
+        task = self.by_id[task_id]
+        dependencies = self.scheduler.dependencies
+        assert not (dependencies and dependencies.successors.get(task_id)), \
+            "Task is a prerequisite of other tasks"
+        time = None if task.prerequisite else self.affected_time(task)
+        self.discard(task)
+        self.recompute(time)
+        if self.wal is not None:
+            self.wal.remove(task_id)
+
+    def update(self, task_id, estimated_time=None, deadline=None, priority=None):
+        task = self.by_id[task_id]
+        if estimated_time is not None:
+            task.estimated_time = estimated_time
+        if deadline is not None:
+            task.deadline = deadline
+        if priority is not None:
+            task.priority = priority
+        # The task is reset to its new estimate when the session rewinds to
+        # before its arrival
+        self.recompute(self.affected_time(task))
+        if self.wal is not None:
+            self.wal.update(task_id, estimated_time, deadline, priority)
+
+    def rewind(self, time):
+        # Restore the latest checkpoint taken strictly before `time`, whose
+        # running slice (planned with the old set of arrivals) also ends
+        # strictly before it: a slice cut exactly at `time` may have been cut
+        # by the changed task's arrival. Returns False if there is none.
+        while self.checkpoints:
+            last_time, state = self.checkpoints[-1]
+            if last_time < time and (state['stop'] is None or state['stop'][0] < time):
+                self.scheduler.restore(state, self.tasks[state['num_arrived']:])
+                return True
+            self.checkpoints.pop()
+        return False
+
+    def recompute(self, time):
+        if time is None or not self.rewind(time):
+            for task in self.tasks:
+                task.reset()
+            self.scheduler.load(self.tasks)
+            self.checkpoints = []
+
+        scheduler = self.scheduler
+        interval = self.checkpoint_interval
+        steps = 0
+        while scheduler.num_unfinished:
+            time = scheduler.step()
+            steps += 1
+            if steps % interval == 0:
+                self.checkpoints.append((time, scheduler.checkpoint()))
+                if len(self.checkpoints) > self.max_checkpoints:
+                    # Keep every other one and space the next ones out
+                    del self.checkpoints[::2]
+                    interval *= 2
+        self.checkpoint_interval = interval
+        self.num_recomputed += steps
+
+    @property
+    def scheduled_tasks(self):
+        # A finalized copy; the session keeps the raw log to resume from
+        scheduled = self.scheduler.scheduled_tasks.copy()
+        scheduled.finalize()
+        return scheduled
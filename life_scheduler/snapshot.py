@@ -0,0 +1,219 @@
+import io
+import mmap
+import os
+import pickle
+import struct
+from array import array
+
+from .dependencies import DependencyIndex
+from .scheduler import ScheduledTasks, Slice
+from .session import SchedulingSession
+from .table import TaskTable, TableView
+from .task import Task
+
+# Binary snapshots of a running Scheduler (or a SchedulingSession), so that a
+# restart picks up where it stopped instead of re-simulating from zero.
+#
+# Bulk data is stored as raw typed arrays: the tasks, as TaskTable columns,
+# and the slices of the log. Loading maps the file and copies each array out
+# in one go; the tasks still to arrive stay a TaskTable and are only built
+# as they arrive. The rest of the state (ready queue, counters, metrics) is
+# what `Scheduler.checkpoint` returns, pickled with tasks replaced by their
+# row number.
+#
+# File layout: MAGIC, header length (u64), pickled header, then the arrays,
+# each 8-byte aligned. The header holds the array directory.
+MAGIC = b'LSSNAP01'
+ALIGN = 8
+
+SLICE_COLUMNS = ('task_id', 'start', 'length', 'remaining_after')
+
+
+def save_snapshot(scheduler, path, session_tasks=None):
+    # Written to a temporary file and renamed, so `path` is always whole
+    state = scheduler.checkpoint()
+    # Completed tasks first, then the pending, running and waiting ones
+    arrived = scheduler.completed + [task for task, _, _ in state['tasks']]
+    rows = {id(task): row for row, task in enumerate(arrived)}
+
+    log = scheduler.scheduled_tasks
+    arrays = {}
+    header = {
+        'policy': type(scheduler).__name__,
+        'state': dump_state(state, rows),
+        'arrived': table_arrays('arrived', TaskTable.from_tasks(arrived), arrays),
+        'not_arrived': table_arrays('not_arrived', arrivals_table(scheduler.events), arrays),
+        'has_dependencies': scheduler.dependencies is not None,
+        'keep_slices': log.keep_slices,
+        'finalized': log.finalized,
+        'num_completed': len(scheduler.completed),
+        'log_tasks': [rows[id(task)] for task in log.tasks.values()],
+    }
+    arrays['remaining_time'] = pack(task.remaining_time for task in arrived)
+    arrays['quota'] = pack(task.quota for task in arrived)
+    for column in SLICE_COLUMNS:
+        arrays['slice.' + column] = pack(getattr(record, column) for record in log.slices)
+    if session_tasks is not None:
+        header['session'] = table_arrays('session', TaskTable.from_tasks(session_tasks), arrays)
+    write_file(path, header, arrays)
+
+
+def load_snapshot(path, scheduler):
+    # Restores into `scheduler`, which must be of the policy that was saved
+    # (and configured the same way). Returns it, ready to `step` or `run`.
+    return restore(scheduler, *read_file(path))
+
+
+def restore(scheduler, header, arrays):
+    assert header['policy'] == type(scheduler).__name__, \
+        f"Snapshot of a {header['policy']}, not a {type(scheduler).__name__}"
+    arrived = table_from(header['arrived'], arrays).tasks()
+    for task, remaining_time, quota in zip(arrived, arrays['remaining_time'], arrays['quota']):
+        task.remaining_time = remaining_time
+        task.quota = quota
+    not_arrived = table_from(header['not_arrived'], arrays)
+    state = load_state(header['state'], arrived)
+
+    log = ScheduledTasks(header['keep_slices'])
+    columns = [arrays['slice.' + column] for column in SLICE_COLUMNS]
+    log.slices = [Slice(*values) for values in zip(*columns)]
+    log.tasks = {arrived[row].id: arrived[row] for row in header['log_tasks']}
+    last = state['log'][5]
+    if log.slices and last is not None:
+        log.slices[-1] = last  # The same object the log keeps extending
+
+    scheduler.load([])
+    scheduler.task_list = SnapshotTasks(arrived, not_arrived)
+    scheduler.completed = arrived[:header['num_completed']]
+    scheduler.scheduled_tasks = log
+    if header['has_dependencies']:
+        scheduler.dependencies = DependencyIndex(scheduler.task_list)
+    scheduler.restore(state, not_arrived)
+    log.finalized = header['finalized']
+    return scheduler
+
+
+def save_session(session, path):
+    save_snapshot(session.scheduler, path, session.tasks)
+
+
+def load_session(path, scheduler, wal=None):
+    # The session's tasks plus its scheduler where it stopped: the schedule
+    # is there at once, without a recomputation. The first change after
+    # loading re-simulates from the start.
+    header, arrays = read_file(path)
+    assert 'session' in header, "Not a session snapshot"
+    session = SchedulingSession(scheduler)
+    for task in table_from(header['session'], arrays):
+        session.add(task)
+    restore(scheduler, header, arrays)
+    session.wal = wal
+    return session
+
+
+class SnapshotTasks:
+    # The task list of a restored scheduler: the tasks that had arrived,
+    # then the table of the ones still to arrive
+    def __init__(self, arrived, not_arrived):
+        self.arrived = arrived
+        self.not_arrived = not_arrived
+
+    def __len__(self):
+        return len(self.arrived) + len(self.not_arrived)
+
+    def __iter__(self):
+        yield from self.arrived
+        yield from self.not_arrived
+
+
+def arrivals_table(events):
+    # The arrivals an EventQueue has not handed out yet, as a table
+    arrivals, start = events.arrivals, events.num_arrived
+    if isinstance(arrivals, TaskTable):
+        return arrivals.take(slice(start, None))
+    if isinstance(arrivals, TableView):
+        return arrivals.table.take(arrivals.order[start:])
+    return TaskTable.from_tasks(list(arrivals[start:]))
+
+
+def pack(values):
+    # Typed array, 'q' until a float shows up, as in TaskTable
+    store = array('q')
+    for value in values:
+        if store.typecode == 'q' and isinstance(value, float):
+            store = array('d', store)
+        store.append(value)
+    return store
+
+
+def table_arrays(prefix, table, arrays):
+    # Adds the columns of `table` to `arrays`; returns what goes in the
+    # header to rebuild it
+    for column, values in table.columns.items():
+        arrays[f'{prefix}.{column}'] = values
+    return prefix, list(table.columns), table.name, table.prerequisite
+
+
+def table_from(entry, arrays):
+    prefix, columns, name, prerequisite = entry
+    return TaskTable({column: arrays[f'{prefix}.{column}'] for column in columns},
+                     name, prerequisite)
+
+
+def dump_state(state, rows):
+    file = io.BytesIO()
+    pickler = pickle.Pickler(file, pickle.HIGHEST_PROTOCOL)
+    # Tasks are stored in the arrived table: pickle their row instead
+    pickler.persistent_id = lambda obj: rows[id(obj)] if isinstance(obj, Task) else None
+    pickler.dump(state)
+    return file.getvalue()
+
+
+def load_state(data, arrived):
+    unpickler = pickle.Unpickler(io.BytesIO(data))
+    unpickler.persistent_load = arrived.__getitem__
+    return unpickler.load()
+
+
+def padding(size):
+    return -size % ALIGN
+
+
+def write_file(path, header, arrays):
+    directory = {}
+    offset = 0
+    for name, values in arrays.items():
+        size = len(values) * values.itemsize
+        directory[name] = (values.typecode, offset, len(values))
+        offset += size + padding(size)
+    data = pickle.dumps((header, directory), pickle.HIGHEST_PROTOCOL)
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        f.write(MAGIC + struct.pack('<Q', len(data)) + data)
+        f.write(bytes(padding(len(data))))
+        for values in arrays.values():
+            values.tofile(f)
+            f.write(bytes(padding(len(values) * values.itemsize)))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def read_file(path):
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        assert mapped[:len(MAGIC)] == MAGIC, f"{path} is not a scheduler snapshot"
+        (size,) = struct.unpack_from('<Q', mapped, len(MAGIC))
+        start = len(MAGIC) + 8
+        header, directory = pickle.loads(mapped[start:start + size])
+        base = start + size + padding(size)
+        arrays = {}
+        with memoryview(mapped) as view:
+            for name, (typecode, offset, length) in directory.items():
+                values = array(typecode)
+                begin = base + offset
+                chunk = view[begin:begin + length * values.itemsize]
+                values.frombytes(chunk)
+                chunk.release()
+                arrays[name] = values
+    return header, arrays
@@ -0,0 +1,187 @@
+import csv
+from array import array
+
+from .task import Task
+
+# Numeric Task attributes stored as typed arrays, with their default values.
+# Integer columns are packed as 'q' and switch to 'd' as soon as they meet a
+# float, so values come back with the type they went in with.
+COLUMNS = (('id', None), ('arrival_time', None), ('estimated_time', -1),
+           ('deadline', None), ('priority', 1), ('min_quantum', 20),
+           ('preemptible', True))
+
+
+class TaskTable:
+    # Columnar store of tasks: one typed array per numeric attribute, about
+    # 8 bytes per value instead of a Task object per row. Task objects are
+    # only built on access (`table[row]`); a Scheduler loading a table builds
+    # each one when it is about to arrive.
+    # Names and prerequisites are optional: without them tasks are called
+    # "Task_<id>" and have no prerequisites.
+    def __init__(self, columns=None, name=None, prerequisite=None):
+        self.columns = {column: array('q') for column, _ in COLUMNS}
+        self.columns['preemptible'] = array('b')
+        for column, values in (columns or {}).items():
+            typecodes = 'b' if column == 'preemptible' else 'qd'
+            if isinstance(values, array) and values.typecode in typecodes:
+                self.columns[column] = values  # Already packed, e.g. by read_csv
+            else:
+                self.extend(column, values)
+        length = len(self.columns['id'])
+        for column, default in COLUMNS:
+            if length and not self.columns[column]:
+                assert default is not None, f"Missing column {column!r}"
+                self.extend(column, [default] * length)
+            assert len(self.columns[column]) == length, \
+                f"Column {column!r} has {len(self.columns[column])} rows, expected {length}"
+        self.name = list(name) if name is not None else None
+        self.prerequisite = None
+        if prerequisite is not None and any(prerequisite):
+            self.prerequisite = [tuple(ids) for ids in prerequisite]
+
+    def extend(self, column, values):
+        store = self.columns[column]
+        for value in values:
+            if type(value) is bool:
+                value = int(value)
+            assert isinstance(value, (int, float)), \
+                f"Task.{column} must be a number, got {value!r}"
+            if store.typecode == 'q' and isinstance(value, float):
+                store = self.columns[column] = array('d', store)
+            elif store.typecode == 'b':
+                value = bool(value)
+            store.append(value)
+
+    @classmethod
+    def from_tasks(cls, task_list, ids=None):
+        # `ids` replaces the task ids, e.g. range(n) for non-numeric ids
+        columns = {column: [getattr(task, column) for task in task_list]
+                   for column, _ in COLUMNS}
+        if ids is not None:
+            columns['id'] = ids
+        return cls(columns, name=[task.name for task in task_list],
+                   prerequisite=[task.prerequisite for task in task_list])
+
+    def __len__(self):
+        return len(self.columns['id'])
+
+    def __getitem__(self, row):
+        columns = self.columns
+        id = columns['id'][row]
+        return Task(id=id,
+                    name=self.name[row] if self.name is not None else "Task_" + str(id),
+                    arrival_time=columns['arrival_time'][row],
+                    estimated_time=columns['estimated_time'][row],
+                    deadline=columns['deadline'][row],
+                    priority=columns['priority'][row],
+                    min_quantum=columns['min_quantum'][row],
+                    preemptible=bool(columns['preemptible'][row]),
+                    prerequisite=self.prerequisite[row] if self.prerequisite is not None else ())
+
+    def __iter__(self):
+        return (self[row] for row in range(len(self)))
+
+    def tasks(self):
+        return list(self)
+
+    def take(self, rows):
+        # New table of some rows: a slice, or a sequence of row numbers
+        def pick(values):
+            if isinstance(rows, slice):
+                return values[rows]
+            if isinstance(values, array):
+                return array(values.typecode, map(values.__getitem__, rows))
+            return [values[row] for row in rows]
+        return TaskTable({column: pick(values) for column, values in self.columns.items()},
+                         pick(self.name) if self.name is not None else None,
+                         pick(self.prerequisite) if self.prerequisite is not None else None)
+
+    def in_arrival_order(self):
+        # Lazy view of the rows by arrival time, ties in row order
+        arrival_time = self.columns['arrival_time']
+        if all(a <= b for a, b in zip(arrival_time, arrival_time[1:])):
+            return self
+        order = array('q', sorted(range(len(self)), key=arrival_time.__getitem__))
+        return TableView(self, order)
+
+
+class TableView:
+    # Rows of a table in a given order, built into Tasks on access
+    def __init__(self, table, order):
+        self.table = table
+        self.order = order
+
+    def __len__(self):
+        return len(self.order)
+
+    def __getitem__(self, index):
+        return self.table[self.order[index]]
+
+    def __iter__(self):
+        return (self.table[row] for row in self.order)
+
+
+def read_csv(path):
+    # Header row with the COLUMNS names; `name` and `prerequisite`
+    # (space-separated ids) are optional columns
+    with open(path, newline='') as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        table = TaskTable()
+        present = [column for column, _ in COLUMNS if column in fields]
+        names = [] if 'name' in fields else None
+        prerequisites = [] if 'prerequisite' in fields else None
+        for record in reader:
+            for column in present:
+                table.extend(column, (parse_number(record[column]),))
+            if names is not None:
+                names.append(record['name'])
+            if prerequisites is not None:
+                prerequisites.append([parse_number(id) for id in record['prerequisite'].split()])
+    return TaskTable(table.columns, names, prerequisites)
+
+
+def write_csv(table, path):
+    fields = [column for column, _ in COLUMNS]
+    columns = [table.columns[column] for column in fields]
+    if table.name is not None:
+        fields.append('name')
+        columns.append(table.name)
+    if table.prerequisite is not None:
+        fields.append('prerequisite')
+        columns.append([' '.join(map(str, ids)) for ids in table.prerequisite])
+    with open(path, 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        writer.writerows(zip(*columns))
+
+
+def parse_number(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def read_parquet(path):
+    # Parquet (or any file pyarrow.parquet reads); needs pyarrow
+    import pyarrow.parquet as pq
+    data = pq.read_table(path)
+    fields = data.column_names
+    columns = {column: data.column(column).to_pylist()
+               for column, _ in COLUMNS if column in fields}
+    return TaskTable(columns,
+                     data.column('name').to_pylist() if 'name' in fields else None,
+                     data.column('prerequisite').to_pylist() if 'prerequisite' in fields else None)
+
+
+def write_parquet(table, path):
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    data = {column: pa.array(list(table.columns[column])) for column, _ in COLUMNS}
+    data['preemptible'] = pa.array([bool(value) for value in table.columns['preemptible']])
+    if table.name is not None:
+        data['name'] = pa.array(table.name)
+    if table.prerequisite is not None:
+        data['prerequisite'] = pa.array([list(ids) for ids in table.prerequisite])
+    pq.write_table(pa.table(data), path)
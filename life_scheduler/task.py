@@ -0,0 +1,53 @@
+class Task:
+    # There are 6 characteristics of jobs (taken from Scheduling Algorithms book):
+    # 1. preemption,
+    # 2. precedence relations,
+    # 3. release date,
+    # 4. restriction on processing time (time limit?) / number of operation ,
+    # 5. deadline
+    # 6. batching (is it needed?)
+    #
+    # Slotted: no per-instance __dict__, since workloads can have millions
+    # of tasks. For bulk data see TaskTable, which stores them column-wise.
+    __slots__ = ('name', 'id', 'priority', 'remaining_time', 'estimated_time',
+                 'preemptible', 'arrival_time', 'deadline', 'min_quantum',
+                 'quota', 'prerequisite', 'scheduled_time', 'finish_time',
+                 'process_time')
+
+    def __init__(self, id, name, deadline, arrival_time, estimated_time=-1, priority=1, prerequisite=(), preemptible=True, min_quantum=20):
+        self.name = name
+        self.id = id
+        self.priority = priority
+        self.remaining_time = estimated_time
+        self.estimated_time = estimated_time
+        self.preemptible = preemptible
+        self.arrival_time = arrival_time
+        self.deadline = deadline
+        self.min_quantum = min_quantum  # Minimum scheduling granularity
+        self.quota = min_quantum
+
+        # Ids (or Tasks) that must finish before this task can start
+        self.prerequisite = prerequisite
+
+        self.scheduled_time = ()  # Maybe contains pairs of start and end
+        self.finish_time = 0
+
+    def add_scheduled_time(self, start, stop):
+        # The list is only allocated for tasks that use it
+        if not isinstance(self.scheduled_time, list):
+            self.scheduled_time = list(self.scheduled_time)
+        self.scheduled_time.append((start, stop))
+
+    def finished(self):
+        return self.remaining_time <= 0
+
+    def refill_quota(self):
+        self.quota = self.min_quantum
+
+    def reset(self):
+        # Back to the state before it was ever scheduled
+        self.remaining_time = self.estimated_time
+        self.quota = self.min_quantum
+
+    def name_elasped_time(self):
+        return f'{self.name}({self.estimated_time-self.remaining_time}/{self.estimated_time})'
@@ -0,0 +1,119 @@
+import json
+from collections import deque, namedtuple
+
+# Structured trace of a simulation. The scheduler only builds events when a
+# sink is attached (`Scheduler.add_trace_sink`); otherwise the tick path
+# pays a single `is None` check and formats nothing.
+
+# Event kinds
+ARRIVE = 'arrive'
+DISPATCH = 'dispatch'
+PREEMPT = 'preempt'
+RETIRE = 'retire'
+QUOTA_REFILL = 'quota-refill'
+
+TraceEvent = namedtuple('TraceEvent', ['time', 'kind', 'task_id', 'task_name',
+                                       'remaining_time'])
+
+
+class Tracer:
+    # Fans events out to the attached sinks
+    def __init__(self):
+        self.sinks = []
+
+    def emit(self, time, kind, task):
+        event = TraceEvent(time, kind, task.id, task.name, task.remaining_time)
+        for sink in self.sinks:
+            sink.write(event)
+
+    def close(self):
+        for sink in self.sinks:
+            sink.close()
+
+
+class RingBufferSink:
+    # Keeps the latest `capacity` events in memory
+    def __init__(self, capacity=10000):
+        self.events = deque(maxlen=capacity)
+
+    def write(self, event):
+        self.events.append(event)
+
+    def close(self):
+        pass
+
+    def __iter__(self):
+        return iter(self.events)
+
+    def __len__(self):
+        return len(self.events)
+
+
+class JSONLinesSink:
+    # One JSON object per event. Takes a path or an open text file.
+    def __init__(self, file):
+        self.owned = isinstance(file, str)
+        self.file = open(file, 'w') if self.owned else file
+
+    def write(self, event):
+        self.file.write(json.dumps(event._asdict()) + '\n')
+
+    def close(self):
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class ChromeTraceSink:
+    # Chrome trace-event format, for chrome://tracing or Perfetto. Running
+    # slices are duration events on the CPU track, arrivals and quota
+    # refills instant events. One time unit is `scale` microseconds.
+    def __init__(self, file, scale=1000):
+        self.owned = isinstance(file, str)
+        self.file = open(file, 'w') if self.owned else file
+        self.scale = scale
+        self.running = None  # (task id, name) of the open duration event
+        self.file.write('[\n')
+        self.first = True
+
+    def write(self, event):
+        ts = event.time * self.scale
+        if event.kind == DISPATCH:
+            self.end(ts)
+            self.running = (event.task_id, event.task_name)
+            self.emit({'ph': 'B', 'ts': ts, 'name': event.task_name,
+                       'args': {'id': event.task_id, 'remaining_time': event.remaining_time}})
+        elif event.kind in (PREEMPT, RETIRE):
+            if self.running and self.running[0] == event.task_id:
+                self.end(ts)
+        else:
+            self.emit({'ph': 'i', 's': 't', 'ts': ts,
+                       'name': f'{event.kind} {event.task_name}',
+                       'args': {'id': event.task_id}})
+
+    def end(self, ts):
+        if self.running:
+            self.emit({'ph': 'E', 'ts': ts, 'name': self.running[1]})
+            self.running = None
+
+    def emit(self, record):
+        record['pid'] = record['tid'] = 0
+        self.file.write(('' if self.first else ',\n') + json.dumps(record))
+        self.first = False
+
+    def close(self):
+        self.file.write('\n]\n')
+        if self.owned:
+            self.file.close()
+        else:
+            self.file.flush()
+
+
+class PrintSink:
+    # Human-readable lines on stdout; what `verbose=True` attaches
+    def write(self, event):
+        print(f'[{event.time}] {event.kind} {event.task_name} (remaining time: {event.remaining_time})')
+
+    def close(self):
+        pass
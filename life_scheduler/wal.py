@@ -0,0 +1,119 @@
+import os
+import struct
+import zlib
+
+from .task import Task
+
+# Append-only log of the changes made to a SchedulingSession: with the last
+# snapshot (see snapshot.py), replaying it brings a restarted session back
+# to where it was.
+#
+# Each record is a header (operation, payload length, CRC-32 of the payload)
+# and a struct-packed payload. Numbers are tagged 'q' or 'd' so that they
+# come back with their type; 'n' is a missing value. Replay stops at the
+# first torn or corrupt record, i.e. a write cut short by a crash.
+INSERT, REMOVE, UPDATE = 1, 2, 3
+
+RECORD = struct.Struct('<BII')
+TASK_FIELDS = ('id', 'arrival_time', 'estimated_time', 'deadline', 'priority',
+               'min_quantum', 'preemptible')
+UPDATE_FIELDS = ('estimated_time', 'deadline', 'priority')
+
+
+class WriteAheadLog:
+    # Set `sync=True` to fsync every record, not just flush it
+    def __init__(self, path, sync=False):
+        self.path = path
+        self.sync = sync
+        self.file = open(path, 'ab')
+
+    def insert(self, task):
+        payload = pack_numbers([getattr(task, field) for field in TASK_FIELDS])
+        name = task.name.encode()
+        prerequisite = [getattr(id, 'id', id) for id in task.prerequisite]
+        payload += struct.pack('<I', len(name)) + name + pack_numbers(prerequisite, count=True)
+        self.append(INSERT, payload)
+
+    def remove(self, task_id):
+        self.append(REMOVE, pack_numbers([task_id]))
+
+    def update(self, task_id, estimated_time=None, deadline=None, priority=None):
+        self.append(UPDATE, pack_numbers([task_id, estimated_time, deadline, priority]))
+
+    def append(self, operation, payload):
+        self.file.write(RECORD.pack(operation, len(payload), zlib.crc32(payload)) + payload)
+        self.file.flush()
+        if self.sync:
+            os.fsync(self.file.fileno())
+
+    def truncate(self):
+        # After a snapshot: the changes so far are in it
+        self.file.truncate(0)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+
+def read_records(path):
+    # (operation, arguments) of each whole record
+    if not os.path.exists(path):
+        return
+    with open(path, 'rb') as f:
+        data = f.read()
+    offset = 0
+    while offset + RECORD.size <= len(data):
+        operation, length, checksum = RECORD.unpack_from(data, offset)
+        payload = data[offset + RECORD.size:offset + RECORD.size + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            return
+        offset += RECORD.size + length
+        if operation == INSERT:
+            values, end = unpack_numbers(payload, 0, len(TASK_FIELDS))
+            (size,) = struct.unpack_from('<I', payload, end)
+            name = payload[end + 4:end + 4 + size].decode()
+            prerequisite, _ = unpack_numbers(payload, end + 4 + size)
+            fields = dict(zip(TASK_FIELDS, values))
+            fields['preemptible'] = bool(fields['preemptible'])
+            yield INSERT, (Task(name=name, prerequisite=tuple(prerequisite), **fields),)
+        elif operation == REMOVE:
+            yield REMOVE, tuple(unpack_numbers(payload, 0, 1)[0])
+        elif operation == UPDATE:
+            yield UPDATE, tuple(unpack_numbers(payload, 0, 1 + len(UPDATE_FIELDS))[0])
+
+
+def replay(path, session):
+    # Applies the logged changes to `session`; returns how many
+    count = 0
+    for operation, arguments in read_records(path):
+        if operation == INSERT:
+            session.insert(*arguments)
+        elif operation == REMOVE:
+            session.remove(*arguments)
+        else:
+            session.update(*arguments)
+        count += 1
+    return count
+
+
+def pack_numbers(values, count=False):
+    tags = ''.join('n' if value is None else 'd' if isinstance(value, float) else 'q'
+                   for value in values)
+    for value in values:
+        assert value is None or isinstance(value, (int, float)), \
+            f"Only numbers can be logged, got {value!r}"
+    head = struct.pack('<I', len(values)) if count else b''
+    return head + tags.encode() + struct.pack('<' + tags.replace('n', ''),
+                                              *[value for value in values if value is not None])
+
+
+def unpack_numbers(payload, offset, count=None):
+    # Returns the values and the offset after them
+    if count is None:
+        (count,) = struct.unpack_from('<I', payload, offset)
+        offset += 4
+    tags = payload[offset:offset + count].decode()
+    offset += count
+    packed = tags.replace('n', '')
+    numbers = iter(struct.unpack_from('<' + packed, payload, offset))
+    return [None if tag == 'n' else next(numbers) for tag in tags], offset + 8 * len(packed)
@@ -0,0 +1,305 @@
+import argparse
+import bisect
+import csv
+import gzip
+import itertools
+import math
+import random
+from collections import deque
+
+from .table import COLUMNS, parse_number
+from .task import Task
+
+# Synthetic workloads, generated lazily: a Workload is an iterable of Tasks in
+# arrival order that builds each task when asked for it, so a trace of any
+# length can be streamed to a file or a scheduler without holding it all.
+#
+# A workload combines an arrival process, a duration distribution, a slack
+# model (deadline = arrival + slack), an optional priority mix and optional
+# random prerequisites. Everything is drawn from one generator seeded with
+# `seed`, so the same parameters always give the same trace.
+
+
+# Arrival processes: `times(rng, num_tasks)` yields non-decreasing times
+
+class Poisson:
+    # Exponential gaps, `rate` arrivals per time unit on average
+    def __init__(self, rate=0.2):
+        self.rate = rate
+
+    def times(self, rng, num_tasks):
+        time = 0
+        for _ in range(num_tasks):
+            time += rng.expovariate(self.rate)
+            yield time
+
+
+class Bursty:
+    # Bursts of 1 to `max_burst` simultaneous arrivals, exponential gaps of
+    # mean `mean_gap` in between
+    def __init__(self, mean_gap=125, max_burst=50):
+        self.mean_gap = mean_gap
+        self.max_burst = max_burst
+
+    def times(self, rng, num_tasks):
+        time = 0
+        count = 0
+        while count < num_tasks:
+            time += rng.expovariate(1 / self.mean_gap)
+            burst = min(rng.randint(1, self.max_burst), num_tasks - count)
+            count += burst
+            for _ in range(burst):
+                yield time
+
+
+class Diurnal:
+    # Poisson arrivals whose rate follows the time of day:
+    # rate * (1 + amplitude * sin(2 pi t / period)), by thinning. One time
+    # unit is a minute with the default period.
+    def __init__(self, rate=0.2, amplitude=0.8, period=1440):
+        self.rate = rate
+        self.amplitude = amplitude
+        self.period = period
+
+    def times(self, rng, num_tasks):
+        peak = self.rate * (1 + abs(self.amplitude))
+        time = 0
+        count = 0
+        while count < num_tasks:
+            time += rng.expovariate(peak)
+            rate = self.rate * (1 + self.amplitude * math.sin(2 * math.pi * time / self.period))
+            if rng.random() * peak < rate:
+                count += 1
+                yield time
+
+
+class UniformArrivals:
+    # num_tasks arrivals spread uniformly over [0, horizon], by default
+    # `mean_gap` per task. The sorted sample is drawn in order, one order
+    # statistic at a time, so nothing needs sorting.
+    def __init__(self, horizon=None, mean_gap=5):
+        self.horizon = horizon
+        self.mean_gap = mean_gap
+
+    def times(self, rng, num_tasks):
+        horizon = self.horizon if self.horizon is not None else self.mean_gap * num_tasks
+        fraction = 0
+        for left in range(num_tasks, 0, -1):
+            # Minimum of `left` uniforms over what remains of the range
+            fraction += (1 - fraction) * (1 - rng.random() ** (1 / left))
+            yield fraction * horizon
+
+
+class Batch:
+    # Everything at once
+    def __init__(self, time=0):
+        self.time = time
+
+    def times(self, rng, num_tasks):
+        return itertools.repeat(self.time, num_tasks)
+
+
+# Durations and slacks: `sample(rng)` returns one value
+
+class Uniform:
+    def __init__(self, low=10, high=100):
+        self.low = low
+        self.high = high
+
+    def sample(self, rng):
+        return rng.uniform(self.low, self.high)
+
+
+class Exponential:
+    def __init__(self, mean=50):
+        self.mean = mean
+
+    def sample(self, rng):
+        return rng.expovariate(1 / self.mean)
+
+
+class LogNormal:
+    # Parameterized by its median and the sigma of the underlying normal
+    def __init__(self, median=40, sigma=1):
+        self.median = median
+        self.sigma = sigma
+
+    def sample(self, rng):
+        return self.median * rng.lognormvariate(0, self.sigma)
+
+
+class Pareto:
+    # Heavy tail: P(X > x) = (minimum / x) ** alpha, optionally capped at
+    # `maximum` (a bounded Pareto)
+    def __init__(self, minimum=10, alpha=1.5, maximum=None):
+        self.minimum = minimum
+        self.alpha = alpha
+        self.maximum = maximum
+
+    def sample(self, rng):
+        if self.maximum is None:
+            return self.minimum * rng.paretovariate(self.alpha)
+        # Inverse CDF of the truncated distribution
+        low, high, alpha = self.minimum, self.maximum, self.alpha
+        u = rng.random()
+        ratio = (low / high) ** alpha
+        return low / (1 - u * (1 - ratio)) ** (1 / alpha)
+
+
+class SlackFactor:
+    # Slack proportional to the task's own duration: deadline = arrival +
+    # duration * a factor drawn from `factor`. Tight when the factor is
+    # near 1.
+    def __init__(self, factor=Uniform(1.5, 4)):
+        self.factor = factor
+
+    def sample(self, rng, duration):
+        return duration * self.factor.sample(rng)
+
+
+class PriorityMix:
+    # Priority drawn from {priority: weight}
+    def __init__(self, weights):
+        self.priorities = list(weights)
+        self.cumulative = list(itertools.accumulate(weights.values()))
+
+    def sample(self, rng):
+        point = rng.random() * self.cumulative[-1]
+        return self.priorities[bisect.bisect_right(self.cumulative, point)]
+
+
+class RandomDAG:
+    # Each task depends on each of the `window` tasks before it with
+    # probability `probability`, at most `max_prerequisites` of them. Edges
+    # only point back in arrival order, so the graph is acyclic and a stream
+    # never refers to a task it hasn't produced.
+    def __init__(self, probability=0.05, window=20, max_prerequisites=3):
+        self.probability = probability
+        self.window = window
+        self.max_prerequisites = max_prerequisites
+
+    def sample(self, rng, previous):
+        chosen = [id for id in previous if rng.random() < self.probability]
+        if len(chosen) > self.max_prerequisites:
+            chosen = rng.sample(chosen, self.max_prerequisites)
+        return tuple(chosen)
+
+
+class Workload:
+    # Iterable of `num_tasks` Tasks in arrival order; iterating again gives
+    # the same tasks. With `integer=True` times are rounded to whole units
+    # (durations to at least 1), like the hand-written workloads.
+    def __init__(self, num_tasks, seed=69, arrivals=Poisson(), durations=Uniform(10, 100),
+                 slack=Uniform(10, 1000), priorities=None, prerequisites=None,
+                 integer=True):
+        self.num_tasks = num_tasks
+        self.seed = seed
+        self.arrivals = arrivals
+        self.durations = durations
+        self.slack = slack
+        self.priorities = priorities
+        self.prerequisites = prerequisites
+        self.integer = integer
+
+    def __len__(self):
+        return self.num_tasks
+
+    def __iter__(self):
+        # Arrival times get their own generator, so changing e.g. the
+        # durations doesn't move the arrivals
+        rng = random.Random(f'{self.seed}/tasks')
+        times = self.arrivals.times(random.Random(f'{self.seed}/arrivals'), self.num_tasks)
+        integer = self.integer
+        previous = deque(maxlen=self.prerequisites.window if self.prerequisites else 0)
+        for id, arrival_time in enumerate(times):
+            duration = self.durations.sample(rng)
+            if isinstance(self.slack, SlackFactor):
+                slack = self.slack.sample(rng, duration)
+            else:
+                slack = self.slack.sample(rng)
+            if integer:
+                arrival_time = round(arrival_time)
+                duration = max(1, round(duration))
+                slack = round(slack)
+            priority = self.priorities.sample(rng) if self.priorities else 1
+            prerequisite = ()
+            if self.prerequisites:
+                prerequisite = self.prerequisites.sample(rng, previous)
+                previous.append(id)
+            yield Task(id=id, name="Task_" + str(id), arrival_time=arrival_time,
+                       estimated_time=duration, deadline=arrival_time + slack,
+                       priority=priority, prerequisite=prerequisite)
+
+    def tasks(self):
+        return list(self)
+
+
+# Traces: CSV in the layout table.read_csv reads, gzipped if the path ends
+# in .gz. Both ends stream, one row at a time.
+TRACE_FIELDS = [column for column, _ in COLUMNS] + ['name', 'prerequisite']
+
+
+def open_trace(path, mode):
+    if path.endswith('.gz'):
+        return gzip.open(path, mode + 't', newline='')
+    return open(path, mode, newline='')
+
+
+def write_trace(task_iterable, path):
+    # Returns the number of tasks written
+    count = 0
+    with open_trace(path, 'w') as f:
+        writer = csv.writer(f)
+        writer.writerow(TRACE_FIELDS)
+        for task in task_iterable:
+            writer.writerow([getattr(task, column) if column != 'preemptible'
+                             else int(task.preemptible) for column, _ in COLUMNS]
+                            + [task.name, ' '.join(str(getattr(id, 'id', id))
+                                                   for id in task.prerequisite)])
+            count += 1
+    return count
+
+
+def read_trace(path):
+    # Generator of the Tasks of a trace, in file order
+    with open_trace(path, 'r') as f:
+        reader = csv.DictReader(f)
+        for record in reader:
+            yield Task(id=parse_number(record['id']), name=record['name'],
+                       arrival_time=parse_number(record['arrival_time']),
+                       estimated_time=parse_number(record['estimated_time']),
+                       deadline=parse_number(record['deadline']),
+                       priority=parse_number(record['priority']),
+                       min_quantum=parse_number(record['min_quantum']),
+                       preemptible=bool(parse_number(record['preemptible'])),
+                       prerequisite=tuple(parse_number(id) for id in record['prerequisite'].split()))
+
+
+ARRIVALS = {'poisson': Poisson, 'bursty': Bursty, 'diurnal': Diurnal,
+            'uniform': UniformArrivals, 'batch': Batch}
+DURATIONS = {'uniform': Uniform, 'exponential': Exponential,
+             'lognormal': LogNormal, 'pareto': Pareto}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Write a synthetic workload trace.')
+    parser.add_argument('path', help='output CSV, gzipped if it ends in .gz')
+    parser.add_argument('--tasks', type=int, default=100000)
+    parser.add_argument('--seed', type=int, default=69)
+    parser.add_argument('--arrivals', choices=ARRIVALS, default='poisson')
+    parser.add_argument('--durations', choices=DURATIONS, default='uniform')
+    parser.add_argument('--slack-factor', action='store_true',
+                        help='deadlines proportional to durations')
+    parser.add_argument('--dag', type=float, default=0, metavar='PROBABILITY',
+                        help='random prerequisites among recent tasks')
+    args = parser.parse_args(argv)
+
+    workload = Workload(args.tasks, args.seed, ARRIVALS[args.arrivals](),
+                        DURATIONS[args.durations](),
+                        SlackFactor() if args.slack_factor else Uniform(10, 1000),
+                        prerequisites=RandomDAG(args.dag) if args.dag else None)
+    print(f'{write_trace(workload, args.path)} tasks written to {args.path}')
+
+
+if __name__ == '__main__':
+    main()
@@ -20,6 +20,9 @@ setup(
     author_email='me@kennethreitz.com',
     url='https://github.com/kennethreitz/samplemod',
     license=license,
-    packages=find_packages(exclude=('tests', 'docs'))
+    packages=find_packages(exclude=('tests', 'docs')),
+    # numpy is only needed by the array engine in life_scheduler.fast,
+    # pyarrow by the Parquet readers and writers in life_scheduler.table
+    extras_require={'fast': ['numpy'], 'parquet': ['pyarrow']}
 )
 
@@ -5,4 +5,5 @@ import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import sample
-from life_scheduler import Task, TaskList
+import life_scheduler
+from life_scheduler import Task, get_scheduler_from_string
@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.availability import Calendar, daily, weekly, DAY
+from life_scheduler.scheduler import random_workload
+from life_scheduler.session import SchedulingSession
+
+import copy
+import math
+import random
+import unittest
+
+
+POLICIES = ("FCFS", "EDF", "RR", "SJF", "WSPT", "STRIDE", "MLFQ")
+
+
+def inside(calendar, start, end):
+    # Whether [start, end) is open throughout
+    return any(low <= start and end <= high for low, high in calendar.open_intervals(start, end))
+
+
+class AvailabilityTestSuite(unittest.TestCase):
+    """Availability calendars and task windows."""
+
+    def test_calendar(self):
+        calendar = Calendar([(5000, 5100)], rules=[daily(540, 1020)], blocked=[(600, 660)])
+        self.assertEqual(calendar.next_open(0), 540)
+        self.assertEqual(calendar.open_until(540), 600)
+        self.assertFalse(calendar.is_open(620))
+        self.assertEqual(calendar.next_open(620), 660)
+        self.assertEqual(calendar.next_open(1020), DAY + 540)
+        self.assertEqual(list(calendar.open_intervals(0, 2 * DAY)),
+                         [(540, 600), (660, 1020), (DAY + 540, DAY + 1020)])
+        self.assertEqual(calendar.next_open(5050), 5050)
+        # Meetings alone: open except then
+        meetings = Calendar(blocked=[(10, 20), (20, 30)])
+        self.assertEqual((meetings.next_open(15), meetings.open_until(0), meetings.open_until(30)),
+                         (30, 10, math.inf))
+        self.assertEqual(Calendar([(0, 10)]).next_open(10), math.inf)
+        self.assertEqual(Calendar(rules=[daily(0, 100)], blocked=[(50, math.inf)]).next_open(60),
+                         math.inf)
+
+    def test_lazy_expansion(self):
+        calendar = Calendar(rules=[weekly(540, 1020)])
+        self.assertEqual(calendar.next_open(5 * DAY), 7 * DAY + 540)  # The weekend
+        self.assertLessEqual(len(calendar.starts), 15)
+        calendar.next_open(365 * DAY)
+        self.assertEqual(len(calendar.starts), 5 * 53)
+        # Night shifts spill over midnight
+        nights = Calendar(rules=[daily(1320, 1800)])
+        self.assertEqual(nights.open_until(DAY + 100), DAY + 360)
+
+    def test_calendar_schedule(self):
+        scheduler = get_scheduler_from_string("EDF", False)
+        scheduler.calendar = Calendar(rules=[daily(540, 1020)])
+        scheduler.schedule([Task(name="A", id=0, arrival_time=0, estimated_time=600, deadline=5000),
+                            Task(name="B", id=1, arrival_time=100, estimated_time=60, deadline=50)])
+        # Both arrived before opening time; A stops at closing time and
+        # goes on the next morning
+        self.assertEqual([(s.task_id, s.start, s.end) for s in scheduler.scheduled_tasks.slices],
+                         [(1, 540, 600), (0, 600, 1020), (0, DAY + 540, DAY + 720)])
+
+    def test_never_runs_when_closed(self):
+        calendar = Calendar(rules=[weekly(540, 1020)], blocked=[(DAY + 600, DAY + 700)])
+        task_list = random_workload(150, 4)
+        for policy in POLICIES:
+            for preemptive in (False, True):
+                with self.subTest(policy=policy, preemptive=preemptive):
+                    scheduler = get_scheduler_from_string(policy, preemptive)
+                    scheduler.calendar = calendar
+                    scheduler.schedule(task_list)
+                    slices = scheduler.scheduled_tasks.slices
+                    self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 150)
+                    self.assertTrue(all(inside(calendar, s.start, s.end) for s in slices))
+                    self.assertEqual(sum(s.length for s in slices),
+                                     sum(task.estimated_time for task in task_list))
+
+    def test_task_windows(self):
+        scheduler = get_scheduler_from_string("EDF", True)
+        scheduler.windows[1] = Calendar([(100, 130), (200, 300)])
+        scheduler.schedule([Task(name="A", id=0, arrival_time=0, estimated_time=300, deadline=5000),
+                            Task(name="B", id=1, arrival_time=0, estimated_time=60, deadline=50)])
+        self.assertEqual([(s.task_id, s.start, s.end) for s in scheduler.scheduled_tasks.slices],
+                         [(0, 0, 100), (1, 100, 130), (0, 130, 200), (1, 200, 230), (0, 230, 360)])
+
+        rng = random.Random(3)
+        task_list = random_workload(100, 6)
+        windows = {task.id: Calendar(rules=[daily(rng.randint(0, 1000), 1200)])
+                   for task in task_list if rng.random() < 0.3}
+        for policy in POLICIES:
+            for preemptive in (False, True):
+                with self.subTest(policy=policy, preemptive=preemptive):
+                    scheduler = get_scheduler_from_string(policy, preemptive)
+                    scheduler.windows = windows
+                    scheduler.schedule(task_list)
+                    self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 100)
+                    for s in scheduler.scheduled_tasks.slices:
+                        if s.task_id in windows:
+                            self.assertTrue(inside(windows[s.task_id], s.start, s.end))
+
+    def test_session(self):
+        # Rewinding through closed time and set-aside tasks
+        rng = random.Random(8)
+        task_list = random_workload(60, 2)
+        windows = {task.id: Calendar(rules=[daily(300, 900)]) for task in task_list[::4]}
+        calendar = Calendar(rules=[daily(0, 1200)], blocked=[(400, 500)])
+
+        def configured(policy, preemptive):
+            scheduler = get_scheduler_from_string(policy, preemptive)
+            scheduler.calendar = calendar
+            scheduler.windows = windows
+            return scheduler
+
+        for policy in ("EDF", "RR"):
+            session = SchedulingSession(configured(policy, True), task_list, checkpoint_interval=4)
+            for _ in range(10):
+                session.remove(rng.choice(session.tasks).id)
+                reference = configured(policy, True)
+                fresh = copy.deepcopy(session.tasks)
+                for task in fresh:
+                    task.reset()
+                reference.schedule(fresh)
+                self.assertEqual([(s.task_id, s.start, s.length) for s in session.scheduled_tasks.slices],
+                                 [(s.task_id, s.start, s.length) for s in reference.scheduled_tasks.slices])
+
+
+if __name__ == '__main__':
+    unittest.main()
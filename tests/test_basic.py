@@ -1,31 +1,86 @@
 # -*- coding: utf-8 -*-
 
-from .context import sample, Task, TaskList
+from .context import sample, Task, get_scheduler_from_string
+from life_scheduler import Scheduler
 
 import random
 import unittest
 
 
+def random_tasks(num_tasks=10):
+    random.seed(69)
+    task_list = []
+    arrival_time = 0
+    for i in range(num_tasks):
+        arrival_time += random.randint(1, 5)
+        task_list.append(Task(name="Task_" + str(i), id=i, arrival_time=arrival_time, estimated_time=random.randint(10, 100), deadline=arrival_time + random.randint(100, 1000)))
+    return task_list
+
+
 class BasicTestSuite(unittest.TestCase):
     """Basic test cases."""
 
     def test_absolute_truth_and_meaning(self):
         assert True
+
     def test_scheduling(self):
-        random.seed(69)
-        task_list = []
-        arrival_time = 0
-        for i in range(10):
-            arrival_time += random.randint(1,5)
-            task_list.append(Task(name="Task_" + str(i), arrival_time=arrival_time, estimated_time=random.randint(10, 100), deadline=arrival_time + random.randint(100, 1000)))
-
-        RR = TaskList(task_list, "RR")
-        FCFS = TaskList(task_list, "FCFS")
-        # RR.print()
-        # FCFS.print()
-        # FCFS.schedule()
-        # RR.print()
-        RR.schedule()
+        task_list = random_tasks()
+        for name in ["FCFS", "EDF", "RR", "SJF", "LJF"]:
+            for preemptive in (False, True):
+                scheduler = get_scheduler_from_string(name, preemptive)
+                scheduler.schedule(task_list)
+                scheduled = scheduler.scheduled_tasks
+                # Every task ran to completion, for exactly its estimated time
+                self.assertEqual(len(scheduler.completed), len(task_list))
+                self.assertEqual(sum(s.length for s in scheduled.slices),
+                                 sum(t.estimated_time for t in task_list))
+                # The input list is left untouched
+                self.assertTrue(all(t.remaining_time == t.estimated_time for t in task_list))
+
+    def test_non_preemptive_fcfs(self):
+        task_list = random_tasks()
+        scheduler = get_scheduler_from_string("FCFS")
+        scheduler.schedule(task_list)
+        slices = scheduler.scheduled_tasks.slices
+        self.assertEqual([s.task_id for s in slices], [t.id for t in task_list])
+        clock = 0
+        for s, task in zip(slices, task_list):
+            self.assertEqual(s.start, max(clock, task.arrival_time))
+            self.assertEqual(s.length, task.estimated_time)
+            clock = s.end
+
+    def test_tie_break_order(self):
+        # Pinned against the original list-sorting schedulers: equal keys
+        # are served first-in first-out
+        tasks = [("A", 0, 4, 20), ("B", 0, 4, 20), ("C", 1, 2, 20), ("D", 1, 4, 15),
+                 ("E", 1, 2, 15), ("F", 3, 4, 20), ("G", 3, 1, 15), ("H", 3, 1, 20)]
+        expected = {
+            ("FCFS", False): "ABCDEFGH",
+            ("FCFS", True): "ABABACDEDFGHF",
+            ("EDF", False): "ADEGBCFH",
+            ("EDF", True): "ADEGDBCAFHBAF",
+            ("SJF", False): "AGHCEBDF",
+            ("SJF", True): "ACGHEBDAFBDAF",
+            ("LJF", False): "ABDFCEGH",
+            ("LJF", True): "ABDAFBDAFCEGH",
+        }
+        for (name, preemptive), order in expected.items():
+            task_list = [Task(id=i, name=n, arrival_time=a, estimated_time=e, deadline=d, min_quantum=2)
+                         for i, (n, a, e, d) in enumerate(tasks)]
+            scheduler = get_scheduler_from_string(name, preemptive)
+            scheduler.schedule(task_list)
+            scheduled = scheduler.scheduled_tasks
+            self.assertEqual("".join(scheduled.tasks[s.task_id].name for s in scheduled.slices), order,
+                             (name, preemptive))
+
+    def test_unknown_scheduler(self):
+        with self.assertRaises(AssertionError):
+            get_scheduler_from_string("NOPE")
+
+    def test_base_scheduler_is_abstract(self):
+        with self.assertRaises(TypeError):
+            Scheduler(False)
+
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+
+from life_scheduler.benchmark import (DISTRIBUTIONS, compare_to_baseline,
+                                      make_workload, run_benchmarks)
+
+import unittest
+
+
+class BenchmarkTestSuite(unittest.TestCase):
+    """Benchmark harness, on tiny workloads."""
+
+    def test_workloads(self):
+        for distribution in DISTRIBUTIONS:
+            task_list = make_workload(distribution, 200)
+            arrivals = [task.arrival_time for task in task_list]
+            self.assertEqual(len(task_list), 200)
+            self.assertEqual(arrivals, sorted(arrivals))
+            self.assertEqual(make_workload(distribution, 200)[-1].deadline, task_list[-1].deadline)
+
+    def test_run_and_compare(self):
+        results = run_benchmarks(["EDF", "RR"], sizes=[50], isolate=False)
+        self.assertEqual(len(results), 2 * 2 * len(DISTRIBUTIONS))
+        for result in results.values():
+            self.assertGreater(result['ticks'], 0)
+            self.assertGreater(result['alloc_peak'], 0)
+        self.assertEqual(compare_to_baseline(results, results), [])
+
+        name = "EDF/preemptive/poisson/50"
+        slower = dict(results[name], elapsed=results[name]['elapsed'] * 3,
+                      ticks_per_second=results[name]['ticks_per_second'] / 3)
+        regressions = compare_to_baseline({name: slower}, results)
+        self.assertEqual(sorted(metric for _, metric, _, _ in regressions),
+                         ['elapsed', 'ticks_per_second'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+
+from .context import get_scheduler_from_string
+
+from life_scheduler.cache import ScheduleCache, fingerprint
+from life_scheduler.scheduler import random_workload
+from life_scheduler.table import TaskTable
+
+import copy
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+
+def records(scheduled):
+    return [(s.task_id, s.start, s.length, s.remaining_after) for s in scheduled.slices]
+
+
+class CacheTestSuite(unittest.TestCase):
+    """Memoized schedules."""
+
+    def test_hits_and_misses(self):
+        cache = ScheduleCache()
+        task_list = random_workload(100, 1)
+        first = cache.schedule(task_list, "EDF", True)
+        reference = get_scheduler_from_string("EDF", True)
+        reference.schedule(task_list)
+        self.assertEqual(records(first), records(reference.scheduled_tasks))
+        # Equal tasks, another list: the same entry
+        self.assertIs(cache.schedule(copy.deepcopy(task_list), "EDF", True), first)
+        self.assertIsNot(cache.schedule(task_list, "EDF", False), first)
+        changed = copy.deepcopy(task_list)
+        changed[40].deadline += 1
+        self.assertIsNot(cache.schedule(changed, "EDF", True), first)
+        cache.schedule(TaskTable.from_tasks(task_list), "EDF", True)
+        self.assertEqual(cache.stats(), {'hits': 1, 'disk_hits': 0, 'misses': 4, 'evictions': 0,
+                                         'hit_rate': 0.2, 'entries': 4,
+                                         'slices': cache.num_slices})
+
+    def test_eviction(self):
+        workloads = [random_workload(20, seed) for seed in range(4)]
+        cache = ScheduleCache(max_entries=2)
+        for task_list in workloads[:3]:
+            cache.schedule(task_list, "FCFS")
+        cache.schedule(workloads[1], "FCFS")  # Now the most recently used
+        cache.schedule(workloads[3], "FCFS")
+        self.assertEqual(cache.stats()['evictions'], 2)
+        keys = [fingerprint(task_list, "FCFS", False) for task_list in workloads]
+        self.assertEqual(list(cache.entries), [keys[1], keys[3]])
+
+        sized = ScheduleCache(max_slices=50)
+        for task_list in workloads:
+            sized.schedule(task_list, "FCFS")
+            self.assertLessEqual(sized.num_slices, 50)
+        self.assertEqual(sized.num_slices, sum(len(s.slices) for s in sized.entries.values()))
+        self.assertGreater(sized.evictions, 0)
+
+    def test_disk_tier(self):
+        directory = tempfile.mkdtemp()
+        task_list = random_workload(50, 2)
+        first = ScheduleCache(directory=directory).schedule(task_list, "RR", True)
+        # A new cache, e.g. after a restart, finds it on disk
+        cache = ScheduleCache(directory=directory)
+        again = cache.schedule(task_list, "RR", True)
+        self.assertEqual(records(again), records(first))
+        self.assertEqual(again.metrics.as_dict(), first.metrics.as_dict())
+        cache.schedule(task_list, "RR", True)
+        self.assertEqual((cache.hits, cache.disk_hits, cache.misses), (1, 1, 0))
+        # A damaged file is only a miss
+        key = fingerprint(task_list, "RR", True)
+        with open(os.path.join(directory, key + '.schedule'), 'wb') as f:
+            f.write(b'garbage')
+        cache.clear()
+        cache.schedule(task_list, "RR", True)
+        self.assertEqual(cache.misses, 1)
+
+    def test_stable_fingerprint(self):
+        # The same in another process, whatever its hash seed
+        code = ("from life_scheduler.cache import fingerprint;"
+                "from life_scheduler.scheduler import random_workload;"
+                "print(fingerprint(random_workload(30, 5), 'SJF', True))")
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        output = subprocess.run([sys.executable, '-c', code], cwd=root, check=True,
+                                capture_output=True, text=True,
+                                env=dict(os.environ, PYTHONHASHSEED='123')).stdout.strip()
+        self.assertEqual(output, fingerprint(random_workload(30, 5), 'SJF', True))
+
+
+if __name__ == '__main__':
+    unittest.main()
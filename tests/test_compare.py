@@ -0,0 +1,50 @@
+# -*- coding: utf-8 -*-
+
+from .context import get_scheduler_from_string
+
+from life_scheduler.compare import POLICIES, compare_schedulers, pack_tasks, unpack_tasks
+from life_scheduler.scheduler import random_workload
+
+import unittest
+
+
+class CompareTestSuite(unittest.TestCase):
+    """Multi-policy comparison runner."""
+
+    def test_pack_round_trip(self):
+        task_list = random_workload(20, seed=1)
+        unpacked = unpack_tasks(pack_tasks(task_list))
+        for row, (a, b) in enumerate(zip(task_list, unpacked)):
+            self.assertEqual(b.id, row)
+            self.assertEqual((a.arrival_time, a.estimated_time, a.deadline, a.priority, a.min_quantum, a.preemptible),
+                             (b.arrival_time, b.estimated_time, b.deadline, b.priority, b.min_quantum, b.preemptible))
+
+    def test_pack_any_ids(self):
+        task_list = random_workload(3, seed=1)
+        for task, id in zip(task_list, ["a", 2.5, None]):
+            task.id = id
+        self.assertEqual([t.id for t in unpack_tasks(pack_tasks(task_list))], [0, 1, 2])
+        task_list[0].deadline = None
+        with self.assertRaises(AssertionError):
+            pack_tasks(task_list)
+
+    def test_matches_direct_runs(self):
+        workloads = [random_workload(30, seed) for seed in range(3)]
+        results = compare_schedulers(workloads, max_workers=1)
+        self.assertEqual(len(results), 3 * len(POLICIES) * 2)
+        for r in results:
+            scheduler = get_scheduler_from_string(r.policy, r.preemptive)
+            scheduler.schedule(workloads[r.workload])
+            self.assertEqual(r.makespan, scheduler.scheduled_tasks.makespan)
+            self.assertEqual(r.deadline_missed, scheduler.scheduled_tasks.deadline_missed)
+
+    def test_process_pool(self):
+        workloads = [random_workload(30, seed) for seed in range(2)]
+        serial = compare_schedulers(workloads, ["EDF", "RR"], max_workers=1)
+        parallel = compare_schedulers(workloads, ["EDF", "RR"], max_workers=2)
+        strip = lambda rows: [r._replace(elapsed=0) for r in rows]
+        self.assertEqual(strip(serial), strip(parallel))
+
+
+if __name__ == '__main__':
+    unittest.main()
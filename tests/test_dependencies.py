@@ -0,0 +1,120 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.dependencies import DependencyIndex
+from life_scheduler.session import SchedulingSession
+
+import copy
+import random
+import time
+import unittest
+
+
+def random_dag(rng, num_tasks):
+    # Prerequisites only point to lower ids, so the graph is acyclic
+    task_list = []
+    for i in range(num_tasks):
+        arrival_time = rng.randint(0, 100)
+        prerequisite = rng.sample(range(i), min(i, rng.randint(0, 3)))
+        task_list.append(Task(name="Task_" + str(i), id=i, arrival_time=arrival_time,
+                              estimated_time=rng.randint(1, 20), deadline=arrival_time + rng.randint(5, 200),
+                              prerequisite=prerequisite, min_quantum=rng.choice([2, 5])))
+    return task_list
+
+
+def timeline(scheduled):
+    return ([(s.task_id, s.start, s.length) for s in scheduled.slices],
+            scheduled.makespan, scheduled.lateness, scheduled.deadline_missed)
+
+
+class DependencyTestSuite(unittest.TestCase):
+    """Prerequisites between tasks."""
+
+    def test_prerequisites_finish_first(self):
+        rng = random.Random(1)
+        task_list = random_dag(rng, 60)
+        for name in ["FCFS", "EDF", "RR", "SJF", "LJF"]:
+            for preemptive in (False, True):
+                scheduler = get_scheduler_from_string(name, preemptive)
+                scheduler.schedule(task_list)
+                finish = {s.task_id: s.end for s in scheduler.scheduled_tasks.slices if s.finished()}
+                first = {}
+                for s in scheduler.scheduled_tasks.slices:
+                    first.setdefault(s.task_id, s.start)
+                self.assertEqual(len(finish), len(task_list))
+                for task in task_list:
+                    for prerequisite in task.prerequisite:
+                        self.assertLessEqual(finish[prerequisite], first[task.id])
+
+    def test_waits_outside_ready_queue(self):
+        task_list = [Task(name="A", id=0, arrival_time=0, estimated_time=10, deadline=50),
+                     Task(name="B", id=1, arrival_time=0, estimated_time=1, deadline=5, prerequisite=[0])]
+        scheduler = get_scheduler_from_string("EDF", True)
+        scheduler.load(task_list)
+        self.assertEqual(scheduler.active.name, "A")
+        self.assertFalse(scheduler.pending)
+        self.assertEqual(list(scheduler.dependencies.waiting), [1])
+        scheduler.run()
+        self.assertEqual([s.task_id for s in scheduler.scheduled_tasks.slices], [0, 1])
+
+    def test_task_objects_as_prerequisites(self):
+        a = Task(name="A", id=0, arrival_time=0, estimated_time=10, deadline=50)
+        b = Task(name="B", id=1, arrival_time=0, estimated_time=1, deadline=5, prerequisite=[a])
+        scheduler = get_scheduler_from_string("SJF")
+        scheduler.schedule([a, b])
+        self.assertEqual([s.task_id for s in scheduler.scheduled_tasks.slices], [0, 1])
+
+    def test_invalid_graphs(self):
+        def task(id, prerequisite):
+            return Task(name=str(id), id=id, arrival_time=0, estimated_time=1, deadline=5,
+                        prerequisite=prerequisite)
+        with self.assertRaisesRegex(AssertionError, "cycle"):
+            DependencyIndex([task(0, [2]), task(1, [0]), task(2, [1]), task(3, [])])
+        with self.assertRaisesRegex(AssertionError, "cycle"):
+            DependencyIndex([task(0, [0])])
+        with self.assertRaisesRegex(AssertionError, "Unknown prerequisite"):
+            DependencyIndex([task(0, [7])])
+
+    def test_large_graph(self):
+        # 100k tasks, ~300k edges
+        rng = random.Random(2)
+        n = 100000
+        task_list = [Task(name=str(i), id=i, arrival_time=0, estimated_time=1, deadline=n,
+                          prerequisite=[rng.randrange(i) for _ in range(3)] if i else [])
+                     for i in range(n)]
+        start = time.perf_counter()
+        scheduler = get_scheduler_from_string("FCFS")
+        scheduler.load(task_list)
+        scheduler.run()
+        self.assertEqual(len(scheduler.completed), n)
+        self.assertLess(time.perf_counter() - start, 30)
+
+    def test_session(self):
+        rng = random.Random(3)
+        task_list = random_dag(rng, 40)
+        session = SchedulingSession(get_scheduler_from_string("EDF", True), task_list,
+                                    checkpoint_interval=4)
+        next_id = 40
+        for _ in range(20):
+            if rng.random() < 0.5:
+                session.insert(Task(name="x", id=next_id, arrival_time=rng.randint(0, 100),
+                                    estimated_time=rng.randint(1, 20), deadline=rng.randint(5, 300),
+                                    prerequisite=rng.sample(sorted(session.by_id), rng.randint(0, 2))))
+                next_id += 1
+            else:
+                session.update(rng.choice(session.tasks).id, estimated_time=rng.randint(1, 20))
+            task_list = copy.deepcopy(session.tasks)
+            for task in task_list:
+                task.reset()
+            reference = get_scheduler_from_string("EDF", True)
+            reference.schedule(task_list)
+            self.assertEqual(timeline(session.scheduled_tasks), timeline(reference.scheduled_tasks))
+
+        required = next(task.prerequisite[0] for task in session.tasks if task.prerequisite)
+        with self.assertRaisesRegex(AssertionError, "prerequisite of other tasks"):
+            session.remove(required)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+import random
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+def random_tasks(rng, num_tasks, steps=(0, 0, 1, 5, 30)):
+    task_list = []
+    arrival_time = 0
+    for i in range(num_tasks):
+        # Small ranges so that ties in every key are common
+        arrival_time += rng.choice(steps)
+        task_list.append(Task(name="Task_" + str(i), id=i, arrival_time=arrival_time,
+                              estimated_time=rng.randint(1, 10), deadline=arrival_time + rng.randint(5, 50),
+                              priority=rng.randint(1, 3)))
+    rng.shuffle(task_list)
+    return task_list
+
+
+@unittest.skipUnless(numpy, "numpy is not installed")
+class FastPathTestSuite(unittest.TestCase):
+    """Array engine for the non-preemptive policies."""
+
+    def test_matches_object_engine(self):
+        from life_scheduler.fast import FAST_POLICIES, schedule_tasks
+        rng = random.Random(7)
+        for trial in range(100):
+            # Half of the workloads have non-integer arrival times
+            steps = (0, 0, 1, 5, 30) if trial % 2 else (0, 0.25, 0.5, 1.75, 30.5)
+            task_list = random_tasks(rng, rng.randint(1, 60), steps)
+            for policy in FAST_POLICIES:
+                scheduler = get_scheduler_from_string(policy)
+                scheduler.schedule(task_list)
+                expected = scheduler.scheduled_tasks
+                result = schedule_tasks(policy, task_list)
+
+                index = {task.id: i for i, task in enumerate(task_list)}
+                self.assertEqual([index[s.task_id] for s in expected.slices],
+                                 result.order.tolist())
+                for s in expected.slices:
+                    self.assertEqual(s.start, result.start[index[s.task_id]])
+                    self.assertEqual(s.end, result.finish[index[s.task_id]])
+                self.assertEqual(expected.makespan, result.object_engine_makespan)
+                self.assertEqual(expected.lateness, result.object_engine_lateness)
+                self.assertEqual(expected.deadline_missed, result.object_engine_deadline_missed)
+                self.assertEqual(expected.metrics.weighted_flow_time, result.weighted_flow_time)
+                self.assertEqual(expected.metrics.weighted_tardiness, result.weighted_tardiness)
+
+    def test_float_arrivals(self):
+        from life_scheduler.fast import schedule_arrays
+        for policy in ("FCFS", "SJF"):
+            result = schedule_arrays(policy, [0.5, 0.7], [1, 1], [5, 5])
+            self.assertEqual(result.start.tolist(), [0.5, 1.5])
+
+    def test_finish_time_metrics(self):
+        from life_scheduler.fast import schedule_arrays
+        result = schedule_arrays("EDF", [0, 0], [10, 10], [5, 5])
+        self.assertEqual(result.lateness.tolist(), [5, 15])
+        self.assertEqual(result.deadline_missed, 2)
+        self.assertEqual(result.average_lateness, 10)
+        self.assertEqual(result.average_flow_time, 15)
+
+
+if __name__ == '__main__':
+    unittest.main()
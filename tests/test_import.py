@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+
+# Generous on purpose: a bare import should take well under a millisecond,
+# but it must never go back to running simulations at import time.
+IMPORT_BUDGET = 0.05
+
+PROBE = '''
+import sys, time
+start = time.perf_counter()
+import life_scheduler
+elapsed = time.perf_counter() - start
+loaded = sorted(m for m in sys.modules if m.startswith('life_scheduler.'))
+print(elapsed)
+print(loaded)
+'''
+
+
+class ImportTestSuite(unittest.TestCase):
+    """Import-time regression tests."""
+
+    def run_probe(self):
+        result = subprocess.run([sys.executable, '-c', PROBE], cwd=ROOT,
+                                capture_output=True, text=True, check=True)
+        return result.stdout.splitlines()
+
+    def test_import_is_cheap(self):
+        # Best of a few runs to keep a loaded machine from failing the test
+        elapsed = min(float(self.run_probe()[0]) for _ in range(3))
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+    def test_import_is_lazy_and_quiet(self):
+        lines = self.run_probe()
+        # Nothing printed besides the probe's own output, nothing loaded
+        self.assertEqual(len(lines), 2)
+        self.assertEqual(lines[1], '[]')
+
+    def test_public_api(self):
+        import life_scheduler
+        for name in life_scheduler.__all__:
+            self.assertIsNotNone(getattr(life_scheduler, name))
+        with self.assertRaises(AttributeError):
+            life_scheduler.TaskList
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+from .context import get_scheduler_from_string
+
+from life_scheduler.metrics import Summary
+from life_scheduler.scheduler import random_workload
+
+import random
+import unittest
+
+
+class MetricsTestSuite(unittest.TestCase):
+    """Streaming statistics."""
+
+    def test_percentiles(self):
+        rng = random.Random(5)
+        # Flow-time-like and lateness-like values: heavy tail, both signs
+        for values in ([rng.expovariate(0.01) for _ in range(20000)],
+                       [rng.randint(-500, 100) for _ in range(20000)]):
+            summary = Summary()
+            for value in values:
+                summary.add(value)
+            values.sort()
+            for p in (0.01, 0.5, 0.9, 0.99):
+                exact = values[int(p * (len(values) - 1))]
+                self.assertAlmostEqual(summary.percentile(p), exact, delta=0.01 * abs(exact))
+            self.assertEqual(summary.percentile(0), values[0])
+            self.assertEqual(summary.percentile(1), values[-1])
+            self.assertLess(len(summary.sketch.positive) + len(summary.sketch.negative), 1000)
+
+    def test_metrics_match_slices(self):
+        task_list = random_workload(200, seed=2)
+        by_id = {task.id: task for task in task_list}
+        for name in ["FCFS", "EDF", "RR", "SJF", "LJF"]:
+            for preemptive in (False, True):
+                scheduler = get_scheduler_from_string(name, preemptive)
+                scheduler.schedule(task_list)
+                scheduled = scheduler.scheduled_tasks
+                finish, first = {}, {}
+                for s in scheduled.slices:
+                    first.setdefault(s.task_id, s.start)
+                    if s.finished():
+                        finish[s.task_id] = s.end
+                # Consecutive slices are merged as they come in
+                self.assertTrue(all(a.task_id != b.task_id for a, b in zip(scheduled.slices, scheduled.slices[1:])))
+
+                metrics = scheduled.metrics
+                flow = [finish[i] - by_id[i].arrival_time for i in finish]
+                lateness = [finish[i] - by_id[i].deadline for i in finish]
+                self.assertEqual(metrics.num_finished, len(task_list))
+                self.assertEqual(metrics.makespan, max(finish.values()))
+                self.assertAlmostEqual(metrics.flow_time.mean, sum(flow) / len(flow))
+                self.assertEqual(metrics.lateness.max, max(lateness))
+                self.assertEqual(metrics.deadline_missed, sum(1 for l in lateness if l > 0))
+                self.assertAlmostEqual(metrics.response_time.mean,
+                                       sum(first[i] - by_id[i].arrival_time for i in first) / len(first))
+
+    def test_bounded_log(self):
+        task_list = random_workload(100, seed=3)
+        scheduler = get_scheduler_from_string("RR", True)
+        scheduler.keep_slices = False
+        scheduler.schedule(task_list)
+        scheduled = scheduler.scheduled_tasks
+        scheduled.finalize()  # idempotent
+        self.assertEqual(scheduled.slices, [])
+        self.assertEqual(scheduled.metrics.num_finished, 100)
+        self.assertEqual(scheduled.first_start, {})
+
+        reference = get_scheduler_from_string("RR", True)
+        reference.schedule(random_workload(100, seed=3))
+        self.assertEqual(scheduled.makespan, reference.scheduled_tasks.makespan)
+
+
+if __name__ == '__main__':
+    unittest.main()
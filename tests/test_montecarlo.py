@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.metrics import Summary
+from life_scheduler.montecarlo import evaluate, LogNormalDuration, TriangularDuration
+from life_scheduler.scheduler import random_workload
+
+import unittest
+
+
+class MonteCarloTestSuite(unittest.TestCase):
+    """Monte Carlo robustness under uncertain durations."""
+
+    def test_deterministic_seeding(self):
+        task_list = random_workload(20, 3)
+        serial = evaluate(task_list, replications=60, policies=["EDF", "SJF"],
+                          max_workers=1, batch_size=7)
+        pooled = evaluate(task_list, replications=60, policies=["EDF", "SJF"],
+                          max_workers=2, batch_size=7)
+        self.assertEqual([r.as_dict() for r in serial], [r.as_dict() for r in pooled])
+        self.assertEqual([(r.policy, r.preemptive, r.replications) for r in serial],
+                         [("EDF", False, 60), ("EDF", True, 60), ("SJF", False, 60), ("SJF", True, 60)])
+        other_seed = evaluate(task_list, replications=60, policies=["EDF"], preemptive=(False,),
+                              seed=1, max_workers=1)
+        self.assertNotEqual(other_seed[0].as_dict(), serial[0].as_dict())
+
+    def test_exact_estimates(self):
+        # Without uncertainty every replication is the plain schedule
+        task_list = [Task(name="A", id=0, arrival_time=0, estimated_time=4, deadline=3),
+                     Task(name="B", id=1, arrival_time=0, estimated_time=2, deadline=10)]
+        [result] = evaluate(task_list, durations={}, replications=5, policies=["FCFS"],
+                            preemptive=(False,), max_workers=1)
+        self.assertEqual(result.task_miss_probability(), [1, 0])
+        self.assertEqual(result.miss_probability, 0.5)
+        self.assertEqual((result.lateness.min, result.lateness.max), (-4, 1))
+        self.assertEqual(result.makespan.mean, 6)
+
+    def test_overruns_and_unknown_estimates(self):
+        task_list = [Task(name="A", id=0, arrival_time=0, estimated_time=10, deadline=10),
+                     Task(name="B", id=1, arrival_time=0, deadline=1000)]  # Unknown estimate
+        durations = {0: TriangularDuration(low=1.1, mode=1.5, high=2), 1: LogNormalDuration()}
+        [result] = evaluate(task_list, durations, replications=50, policies=["EDF"],
+                            preemptive=(True,), max_workers=1)
+        # A always overruns its deadline; B rarely runs past 1000
+        self.assertEqual(result.task_miss_probability()[0], 1)
+        self.assertLess(result.task_miss_probability()[1], 0.1)
+        self.assertGreaterEqual(result.lateness.max, 1)
+
+    def test_float_durations_finish(self):
+        # Float slices must not leave a sliver of work behind
+        task_list = [Task(name=str(i), id=i, arrival_time=i * 0.1, estimated_time=0.7,
+                          deadline=5, min_quantum=0.3) for i in range(30)]
+        for policy in ("EDF", "RR", "MLFQ"):
+            scheduler = get_scheduler_from_string(policy, True)
+            scheduler.schedule(task_list)
+            self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 30)
+
+    def test_summary_merge(self):
+        left, right, both = Summary(), Summary(), Summary()
+        for value in range(-50, 100):
+            (left if value % 3 else right).add(value)
+            both.add(value)
+        left.merge(right)
+        self.assertEqual(left.as_dict(), both.as_dict())
+
+
+if __name__ == '__main__':
+    unittest.main()
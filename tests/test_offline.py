@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.offline import (OfflineSchedule, branch_and_bound, compare_solvers,
+                                    dp_weighted_tardiness, local_search, moore_hodgson,
+                                    random_batch, weighted_tardiness)
+
+import itertools
+import random
+import unittest
+
+
+def random_tasks(rng, num_tasks, arrivals=False):
+    return [Task(name=str(i), id=i, arrival_time=rng.randint(0, 20) if arrivals else 0,
+                 estimated_time=rng.randint(1, 10), priority=rng.randint(1, 3),
+                 deadline=rng.randint(1, 6 * num_tasks))
+            for i in range(num_tasks)]
+
+
+def brute_force(task_list, objective):
+    return min(objective(OfflineSchedule(sequence)) for sequence in itertools.permutations(task_list))
+
+
+class OfflineTestSuite(unittest.TestCase):
+    """Offline solvers against brute force."""
+
+    def test_exact_solvers(self):
+        rng = random.Random(11)
+        for trial in range(30):
+            task_list = random_tasks(rng, rng.randint(1, 6))
+            tardiness = brute_force(task_list, lambda s: s.weighted_tardiness)
+            late = brute_force(task_list, lambda s: s.num_late)
+            self.assertEqual(moore_hodgson(task_list).num_late, late)
+            self.assertEqual(dp_weighted_tardiness(task_list).weighted_tardiness, tardiness)
+            result = branch_and_bound(task_list)
+            self.assertTrue(result.optimal)
+            self.assertEqual(result.weighted_tardiness, tardiness)
+
+    def test_release_dates(self):
+        rng = random.Random(12)
+        for trial in range(30):
+            task_list = random_tasks(rng, rng.randint(1, 6), arrivals=True)
+            result = branch_and_bound(task_list)
+            self.assertEqual(result.weighted_tardiness,
+                             brute_force(task_list, lambda s: s.weighted_tardiness))
+            for start, task in zip(result.start, result.sequence):
+                self.assertGreaterEqual(start, task.arrival_time)
+        with self.assertRaises(AssertionError):
+            dp_weighted_tardiness(task_list)
+
+    def test_budgets(self):
+        task_list = random_batch(40, seed=3)
+        initial = sorted(task_list, key=lambda task: task.deadline)
+        result = branch_and_bound(task_list, node_budget=50, initial=initial)
+        self.assertFalse(result.optimal)
+        self.assertLessEqual(result.nodes, 51)
+        self.assertLessEqual(result.weighted_tardiness, weighted_tardiness(initial))
+        self.assertFalse(dp_weighted_tardiness(task_list).optimal)
+        self.assertFalse(branch_and_bound(task_list, time_budget=0.01).optimal)
+
+    def test_local_search(self):
+        task_list = random_batch(30, seed=5)
+        for preemptive in (False, True):
+            scheduler = get_scheduler_from_string("EDF", preemptive)
+            scheduler.schedule(task_list)
+            result = local_search(task_list, scheduler.scheduled_tasks)
+            self.assertEqual(sorted(t.id for t in result.sequence), list(range(30)))
+            start = OfflineSchedule(sorted(task_list, key=lambda task: task.deadline))
+            self.assertLessEqual(result.weighted_tardiness, start.weighted_tardiness)
+        self.assertLessEqual(local_search(task_list, "WSPT").weighted_tardiness,
+                             OfflineSchedule(sorted(task_list, key=lambda t: t.estimated_time / t.priority)).weighted_tardiness)
+
+    def test_scheduled_tasks(self):
+        result = moore_hodgson(random_batch(20, seed=6))
+        scheduled = result.scheduled_tasks()
+        self.assertEqual(scheduled.metrics.num_finished, 20)
+        self.assertEqual(scheduled.metrics.deadline_missed, result.num_late)
+        self.assertEqual(scheduled.metrics.weighted_tardiness, result.weighted_tardiness)
+
+    def test_compare_solvers(self):
+        rows = compare_solvers(random_batch(10, seed=7), time_budget=0.5)
+        by_method = {row[0]: row for row in rows}
+        self.assertEqual(by_method["DP"][1], by_method["branch and bound"][1])
+        self.assertLessEqual(by_method["Moore-Hodgson"][2], min(row[2] for row in rows))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.parallel import ParallelScheduler
+from life_scheduler.scheduler import random_workload
+from life_scheduler.workload import Workload, Poisson, RandomDAG
+
+import unittest
+
+
+def records(slices):
+    return [(s.task_id, s.start, s.length) for s in slices]
+
+
+class ParallelTestSuite(unittest.TestCase):
+    """Scheduling on several parallel workers."""
+
+    def test_one_worker(self):
+        # A single worker is the plain non-preemptive scheduler
+        task_list = random_workload(300, 2)
+        for policy, single in (("FCFS", "FCFS"), ("EDF", "EDF"), ("SPT", "SJF"),
+                               ("LPT", "LJF"), ("WSPT", "WSPT")):
+            for partitioned in (False, True):
+                with self.subTest(policy=policy, partitioned=partitioned):
+                    scheduler = ParallelScheduler(1, policy, partitioned)
+                    scheduler.schedule(task_list)
+                    reference = get_scheduler_from_string(single, False)
+                    reference.schedule(task_list)
+                    self.assertEqual(records(scheduler.workers[0].scheduled_tasks.slices),
+                                     records(reference.scheduled_tasks.slices))
+                    self.assertEqual(scheduler.scheduled_tasks.metrics.as_dict(),
+                                     reference.scheduled_tasks.metrics.as_dict())
+
+    def test_lpt(self):
+        # Graham's example: LPT gives 4/3 - 1/(3m) of the optimum
+        durations = [5, 5, 4, 4, 3, 3, 3]
+        task_list = [Task(name=str(i), id=i, arrival_time=0, estimated_time=duration, deadline=100)
+                     for i, duration in enumerate(durations)]
+        scheduler = ParallelScheduler(3, "LPT")
+        scheduler.schedule(task_list)
+        self.assertEqual(scheduler.scheduled_tasks.metrics.makespan, 11)  # Optimum is 9
+        scheduler = ParallelScheduler(3, "SPT")
+        scheduler.schedule(task_list)
+        self.assertEqual(scheduler.scheduled_tasks.metrics.makespan, 12)
+        stats = scheduler.worker_stats()
+        self.assertEqual(sum(worker['num_tasks'] for worker in stats), 7)
+        self.assertEqual(sum(worker['busy_time'] for worker in stats), sum(durations))
+
+    def test_work_stealing(self):
+        task_list = [Task(name="A", id=0, arrival_time=0, estimated_time=100, deadline=500),
+                     Task(name="B", id=1, arrival_time=90, estimated_time=10, deadline=500),
+                     Task(name="C", id=2, arrival_time=90, estimated_time=50, deadline=500),
+                     Task(name="D", id=3, arrival_time=90, estimated_time=50, deadline=500)]
+        makespans = []
+        for stealing in (False, True):
+            scheduler = ParallelScheduler(2, "EDF", partitioned=True, stealing=stealing)
+            scheduler.schedule(task_list)
+            makespans.append(scheduler.scheduled_tasks.metrics.makespan)
+        # Without stealing the first worker idles while C and D queue up on
+        # the second
+        self.assertEqual(makespans, [200, 150])
+        self.assertEqual([worker['busy_time'] for worker in scheduler.worker_stats()], [150, 60])
+
+    def test_prerequisites(self):
+        task_list = Workload(500, 3, prerequisites=RandomDAG(0.3, window=10)).tasks()
+        for partitioned in (False, True):
+            scheduler = ParallelScheduler(4, "EDF", partitioned, stealing=True)
+            scheduler.schedule(task_list)
+            finish = {}
+            for worker in scheduler.workers:
+                for record in worker.scheduled_tasks.slices:
+                    finish[record.task_id] = (record.start, record.end)
+            self.assertEqual(len(finish), 500)
+            for task in task_list:
+                for prerequisite in task.prerequisite:
+                    self.assertLessEqual(finish[prerequisite][1], finish[task.id][0])
+
+    def test_many_workers(self):
+        task_list = Workload(20000, 5, Poisson(5)).tasks()
+        for partitioned in (False, True):
+            scheduler = ParallelScheduler(300, "EDF", partitioned, stealing=True)
+            scheduler.schedule(task_list)
+            metrics = scheduler.scheduled_tasks.metrics
+            self.assertEqual(metrics.num_finished, 20000)
+            # Never more running at once than there are workers
+            busy = sum(worker['busy_time'] for worker in scheduler.worker_stats())
+            self.assertLessEqual(busy, 300 * metrics.makespan)
+            self.assertEqual(busy, sum(task.estimated_time for task in task_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from .context import get_scheduler_from_string
+
+from life_scheduler.profiler import Profiler, PHASE_NAMES
+from life_scheduler.scheduler import random_workload
+
+import copy
+import unittest
+
+
+def records(scheduled):
+    return [(s.task_id, s.start, s.length) for s in scheduled.slices]
+
+
+def plain_run(policy, preemptive, task_list):
+    # The schedule, the number of steps and the dispatches, preemptions and
+    # context switches, counted by hand
+    scheduler = get_scheduler_from_string(policy, preemptive)
+    scheduler.load(copy.deepcopy(task_list))
+    steps = dispatches = preemptions = switches = 0
+    while scheduler.num_unfinished:
+        active = scheduler.active
+        scheduler.step()
+        steps += 1
+        if scheduler.active is not active:
+            if active is not None and active.remaining_time > 0:
+                preemptions += 1
+            if scheduler.active is not None:
+                dispatches += 1
+                switches += active is not None
+    scheduler.scheduled_tasks.finalize()
+    return scheduler.scheduled_tasks, (steps, dispatches, preemptions, switches)
+
+
+class ProfilerTestSuite(unittest.TestCase):
+    """Opt-in profiling of a run."""
+
+    def test_exact_counts(self):
+        task_list = random_workload(200, 3)
+        for policy, preemptive in (("FCFS", False), ("EDF", True), ("RR", True)):
+            with self.subTest(policy=policy, preemptive=preemptive):
+                expected, (steps, dispatches, preemptions, switches) = \
+                    plain_run(policy, preemptive, task_list)
+                scheduler = get_scheduler_from_string(policy, preemptive)
+                scheduler.profiler = profiler = Profiler(sample_every=1)
+                scheduler.schedule(copy.deepcopy(task_list))
+                self.assertEqual(records(scheduler.scheduled_tasks), records(expected))
+                stats = profiler.as_dict()
+                self.assertEqual((stats['steps'], stats['arrivals'], stats['completions']),
+                                 (steps, 200, 200))
+                self.assertEqual((stats['dispatches'], stats['preemptions'],
+                                  stats['context_switches']),
+                                 (dispatches, preemptions, switches))
+                self.assertEqual(stats['sampled_steps'], steps)
+                self.assertEqual(stats['phases']['arrival']['calls'], 200)
+                self.assertEqual(stats['queue_length']['count'], steps)
+
+    def test_sampled(self):
+        task_list = random_workload(300, 5)
+        expected, (steps, dispatches, _, _) = plain_run("SJF", True, task_list)
+        scheduler = get_scheduler_from_string("SJF", True)
+        scheduler.profiler = profiler = Profiler(sample_every=7)
+        scheduler.schedule(copy.deepcopy(task_list))
+        self.assertEqual(records(scheduler.scheduled_tasks), records(expected))
+        # Exact whatever the sampling
+        self.assertEqual((profiler.steps, profiler.arrivals, profiler.completions),
+                         (steps, 300, 300))
+        self.assertEqual(profiler.sampled_steps, steps // 7)
+        self.assertAlmostEqual(profiler.dispatches, dispatches, delta=dispatches * 0.3)
+        self.assertEqual(set(profiler.as_dict()['phases']), set(PHASE_NAMES))
+        # Hooks are unwrapped after each sampled step
+        self.assertNotIn('get_next_task', vars(scheduler))
+
+    def test_stream(self):
+        task_list = random_workload(150, 7)
+        _, (steps, _, _, _) = plain_run("EDF", True, task_list)
+        scheduler = get_scheduler_from_string("EDF", True)
+        scheduler.profiler = profiler = Profiler(sample_every=3)
+        list(scheduler.stream(iter(copy.deepcopy(task_list))))
+        self.assertEqual((profiler.steps, profiler.arrivals, profiler.completions),
+                         (steps, 150, 150))
+
+    def test_prometheus(self):
+        scheduler = get_scheduler_from_string("RR", True)
+        scheduler.profiler = profiler = Profiler(sample_every=1)
+        scheduler.schedule(random_workload(50, 1))
+        text = profiler.prometheus(labels={'policy': 'RR'})
+        lines = text.splitlines()
+        self.assertIn('# TYPE life_scheduler_steps_total counter', lines)
+        self.assertIn('life_scheduler_arrivals_total{policy="RR"} 50', lines)
+        self.assertIn('# TYPE life_scheduler_queue_length summary', lines)
+        self.assertTrue(any(line.startswith('life_scheduler_phase_seconds_total{policy="RR",phase="dispatch"} ')
+                            for line in lines))
+        self.assertTrue(any(line.startswith('life_scheduler_queue_length{policy="RR",quantile="0.99"} ')
+                            for line in lines))
+        # Every sample is a name, optional labels and a number
+        for line in lines:
+            if not line.startswith('#'):
+                float(line.rsplit(' ', 1)[1])
+        self.assertTrue(text.endswith('\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
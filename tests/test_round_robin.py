@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.scheduler import RRScheduler, MLFQScheduler
+
+import time
+import unittest
+
+
+def task(name, id, arrival_time, estimated_time, min_quantum=2):
+    return Task(name=name, id=id, arrival_time=arrival_time, estimated_time=estimated_time,
+                deadline=100, min_quantum=min_quantum)
+
+
+def order(scheduler):
+    scheduled = scheduler.scheduled_tasks
+    return [(scheduled.tasks[s.task_id].name, s.start, s.length) for s in scheduled.slices]
+
+
+class RoundRobinTestSuite(unittest.TestCase):
+    """Round robin and multilevel feedback queues."""
+
+    def test_rotation(self):
+        # C arrives mid-quantum: A keeps the CPU until its quantum is up,
+        # then everyone takes turns in arrival order
+        scheduler = get_scheduler_from_string("RR", True)
+        scheduler.schedule([task("A", 0, 0, 5), task("B", 1, 0, 3), task("C", 2, 1, 2)])
+        self.assertEqual(order(scheduler), [("A", 0, 2), ("B", 2, 2), ("C", 4, 2), ("A", 6, 2),
+                                            ("B", 8, 1), ("A", 9, 1)])
+
+    def test_global_quantum(self):
+        scheduler = RRScheduler(True, quantum=3)
+        scheduler.schedule([task("A", 0, 0, 5), task("B", 1, 0, 4)])
+        self.assertEqual(order(scheduler), [("A", 0, 3), ("B", 3, 3), ("A", 6, 2), ("B", 8, 1)])
+
+    def test_non_preemptive_is_fifo(self):
+        scheduler = get_scheduler_from_string("RR")
+        scheduler.schedule([task("A", 0, 0, 5), task("B", 1, 0, 3), task("C", 2, 1, 2)])
+        self.assertEqual([name for name, _, _ in order(scheduler)], ["A", "B", "C"])
+
+    def test_mlfq(self):
+        # A sinks as it uses up quanta of 2 and 4; B arrives at the top
+        # level, preempts A mid-quantum and finishes quickly, then A runs
+        # alone to the end
+        scheduler = MLFQScheduler(True, quanta=(2, 4, 8))
+        scheduler.schedule([task("A", 0, 0, 20), task("X", 1, 0, 1), task("B", 2, 4, 1)])
+        self.assertEqual(order(scheduler), [("A", 0, 2), ("X", 2, 1), ("A", 3, 1), ("B", 4, 1),
+                                            ("A", 5, 17)])
+
+    def test_mlfq_boost(self):
+        # Without boosts the long task at the bottom level waits for all the
+        # short arrivals at the top
+        task_list = [task("L", 0, 0, 50)] + [task(f"S{i}", i, 2 * i - 1, 2) for i in range(1, 60)]
+        plain = MLFQScheduler(True, quanta=(2, 4))
+        plain.schedule(task_list)
+        boosted = MLFQScheduler(True, quanta=(2, 4), boost_interval=20)
+        boosted.schedule(task_list)
+
+        def second_slice(scheduler):
+            return [start for name, start, _ in order(scheduler) if name == "L"][1]
+        self.assertGreater(second_slice(plain), 100)
+        self.assertLess(second_slice(boosted), 30)
+
+    def test_many_pending(self):
+        # 30k tasks pending at once used to cost O(n) per quantum
+        task_list = [task(str(i), i, 0, 5) for i in range(30000)]
+        start = time.perf_counter()
+        scheduler = get_scheduler_from_string("RR", True)
+        scheduler.keep_slices = False
+        scheduler.schedule(task_list)
+        self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 30000)
+        self.assertLess(time.perf_counter() - start, 20)
+
+
+if __name__ == '__main__':
+    unittest.main()
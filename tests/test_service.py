@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.service import SchedulingService
+
+import asyncio
+import json
+import os
+import tempfile
+import time
+import unittest
+
+
+async def request(reader, writer, method, path, body=None):
+    data = json.dumps(body).encode() if body is not None else b''
+    writer.write(f'{method} {path} HTTP/1.1\r\nHost: test\r\nContent-Length: {len(data)}\r\n\r\n'.encode() + data)
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line == b'\r\n':
+            break
+        name, _, value = line.decode().partition(':')
+        if name.lower() == 'content-length':
+            length = int(value)
+    return status, json.loads(await reader.readexactly(length))
+
+
+def service(task_list=()):
+    return SchedulingService(get_scheduler_from_string("EDF", True), task_list, clock=lambda: 0)
+
+
+class ServiceTestSuite(unittest.TestCase):
+    """Live scheduling service."""
+
+    def test_next_task(self):
+        live = service([Task(name="A", id=0, arrival_time=0, estimated_time=3, deadline=10),
+                        Task(name="B", id=1, arrival_time=5, estimated_time=2, deadline=9)])
+        self.assertEqual(live.next_task(1)['task']['name'], "A")
+        self.assertEqual(live.next_task(1)['until'], 3)
+        idle = live.next_task(4)
+        self.assertIsNone(idle['task'])
+        self.assertEqual((idle['next']['task']['name'], idle['next']['start']), ("B", 5))
+        self.assertIsNone(live.next_task(7)['next'])
+
+    def test_http_api(self):
+        async def run():
+            live = service()
+            server = await live.start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            status, task = await request(reader, writer, 'POST', '/tasks',
+                                         {'name': "A", 'estimated_time': 4, 'deadline': 20})
+            self.assertEqual((status, task['id'], task['arrival_time']), (200, 0, 0))
+            status, task = await request(reader, writer, 'POST', '/tasks',
+                                         {'name': "B", 'estimated_time': 2, 'deadline': 5})
+            self.assertEqual(task['id'], 1)
+            _, answer = await request(reader, writer, 'GET', '/next?now=0')
+            self.assertEqual(answer['task']['name'], "B")
+            await request(reader, writer, 'PATCH', '/tasks/0', {'deadline': 3})
+            _, answer = await request(reader, writer, 'GET', '/next?now=0')
+            self.assertEqual(answer['task']['name'], "A")
+            status, task = await request(reader, writer, 'POST', '/tasks/0/complete')
+            self.assertEqual((status, task['completed']), (200, 0))
+            _, tasks = await request(reader, writer, 'GET', '/tasks')
+            self.assertEqual([task['name'] for task in tasks], ["B"])
+            _, slices = await request(reader, writer, 'GET', '/schedule')
+            self.assertEqual([(s['name'], s['start'], s['end']) for s in slices], [("B", 0, 2)])
+            _, stats = await request(reader, writer, 'GET', '/stats')
+            self.assertEqual(stats['num_finished'], 1)
+
+            self.assertEqual((await request(reader, writer, 'DELETE', '/tasks/7'))[0], 404)
+            self.assertEqual((await request(reader, writer, 'POST', '/tasks', {'name': "C"}))[0], 400)
+            self.assertEqual((await request(reader, writer, 'PATCH', '/tasks/1', {'name': "C"}))[0], 400)
+            self.assertEqual((await request(reader, writer, 'GET', '/nowhere'))[0], 404)
+            writer.close()
+            server.close()
+            await server.wait_closed()
+        asyncio.run(run())
+
+    @unittest.skipUnless(hasattr(asyncio, 'start_unix_server'), "needs Unix sockets")
+    def test_unix_socket(self):
+        async def run():
+            path = os.path.join(tempfile.mkdtemp(), 'scheduler.sock')
+            server = await service().start(path=path)
+            reader, writer = await asyncio.open_unix_connection(path)
+            status, answer = await request(reader, writer, 'GET', '/next')
+            self.assertEqual((status, answer['task']), (200, None))
+            writer.close()
+            server.close()
+            await server.wait_closed()
+        asyncio.run(run())
+
+    def test_concurrent_clients(self):
+        # Reads keep being answered while changes are recomputed
+        async def client(port, id):
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            status, _ = await request(reader, writer, 'POST', '/tasks',
+                                      {'id': id, 'arrival_time': id, 'estimated_time': 5,
+                                       'deadline': 1000 - id})
+            for _ in range(5):
+                _, answer = await request(reader, writer, 'GET', f'/next?now={id}')
+            writer.close()
+            return status, answer
+
+        async def run():
+            live = service()
+            server = await live.start(port=0)
+            port = server.sockets[0].getsockname()[1]
+            results = await asyncio.gather(*(client(port, id) for id in range(20)))
+            self.assertTrue(all(status == 200 for status, _ in results))
+            self.assertEqual(len(live.list_tasks()), 20)
+            self.assertEqual(live.stats()['num_finished'], 20)
+            server.close()
+            await server.wait_closed()
+        asyncio.run(run())
+
+    def test_next_task_is_fast(self):
+        task_list = [Task(name=f"T{i}", id=i, arrival_time=i * 3, estimated_time=5,
+                          deadline=i * 3 + 50) for i in range(5000)]
+        live = service(task_list)
+        start = time.perf_counter()
+        for now in range(0, 15000, 15):
+            live.next_task(now)
+        self.assertLess((time.perf_counter() - start) / 1000, 1e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
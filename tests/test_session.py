@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.session import SchedulingSession
+
+import copy
+import random
+import unittest
+
+
+def random_task(rng, i):
+    arrival_time = rng.randint(0, 200)
+    return Task(name="Task_" + str(i), id=i, arrival_time=arrival_time,
+                estimated_time=rng.randint(1, 20), deadline=arrival_time + rng.randint(5, 100),
+                min_quantum=rng.choice([2, 5, 20]), preemptible=rng.random() < 0.9)
+
+
+def timeline(scheduled):
+    return ([(s.task_id, s.start, s.length, s.remaining_after) for s in scheduled.slices],
+            scheduled.makespan, scheduled.lateness, scheduled.deadline_missed)
+
+
+class SessionTestSuite(unittest.TestCase):
+    """Incremental rescheduling."""
+
+    maxDiff = 2000
+
+    def check(self, session, name, preemptive):
+        # Reference: a full run from scratch over fresh copies of the tasks
+        task_list = copy.deepcopy(session.tasks)
+        for task in task_list:
+            task.reset()
+        scheduler = get_scheduler_from_string(name, preemptive)
+        scheduler.schedule(task_list)
+        expected = timeline(scheduler.scheduled_tasks)
+        actual = timeline(session.scheduled_tasks)
+        self.assertEqual(len(actual[0]), len(expected[0]))
+        self.assertEqual(actual, expected)
+
+    def test_matches_full_recompute(self):
+        for seed in range(20):
+            self.run_random_ops(seed)
+
+    def run_random_ops(self, seed):
+        rng = random.Random(seed)
+        for name in ["FCFS", "EDF", "RR", "SJF", "LJF"]:
+            for preemptive in (False, True):
+                next_id = 40
+                task_list = [random_task(rng, i) for i in range(next_id)]
+                session = SchedulingSession(get_scheduler_from_string(name, preemptive),
+                                            task_list, checkpoint_interval=4, max_checkpoints=8)
+                self.check(session, name, preemptive)
+                for _ in range(30):
+                    op = rng.random()
+                    if op < 0.4:
+                        session.insert(random_task(rng, next_id))
+                        next_id += 1
+                    elif op < 0.7 and len(session.tasks) > 1:
+                        session.remove(rng.choice(session.tasks).id)
+                    else:
+                        session.update(rng.choice(session.tasks).id,
+                                       estimated_time=rng.randint(1, 20),
+                                       deadline=rng.randint(5, 300))
+                    self.check(session, name, preemptive)
+
+    def test_late_change_is_incremental(self):
+        task_list = [Task(name=str(i), id=i, arrival_time=10 * i, estimated_time=5, deadline=10 * i + 8)
+                     for i in range(1000)]
+        session = SchedulingSession(get_scheduler_from_string("EDF", True), task_list)
+        full = session.num_recomputed
+        session.insert(Task(name="late", id=1000, arrival_time=9995, estimated_time=5, deadline=10010))
+        self.assertLess(session.num_recomputed - full, full // 10)
+        self.check(session, "EDF", True)
+
+    def test_input_is_copied(self):
+        task = Task(name="A", id=0, arrival_time=0, estimated_time=5, deadline=10)
+        session = SchedulingSession(get_scheduler_from_string("FCFS"), [task])
+        self.assertEqual(task.remaining_time, 5)
+        self.assertEqual(len(session.scheduled_tasks.slices), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
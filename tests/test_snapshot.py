@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.scheduler import random_workload
+from life_scheduler.session import SchedulingSession
+from life_scheduler.snapshot import save_snapshot, load_snapshot, save_session, load_session
+from life_scheduler.table import TaskTable
+from life_scheduler.wal import WriteAheadLog, read_records, replay
+
+import copy
+import os
+import tempfile
+import unittest
+
+
+def slices(scheduler):
+    return [(s.task_id, s.start, s.length, s.remaining_after)
+            for s in scheduler.scheduled_tasks.slices]
+
+
+def workload():
+    task_list = random_workload(200, 11)
+    for task in task_list:
+        task.priority = task.id % 4 + 1
+    return task_list
+
+
+class SnapshotTestSuite(unittest.TestCase):
+    """Binary snapshots and the write-ahead log."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'scheduler.snapshot')
+
+    def assertResumes(self, policy, preemptive, task_list):
+        reference = get_scheduler_from_string(policy, preemptive)
+        reference.load(copy.deepcopy(task_list))
+        reference.run()
+
+        scheduler = get_scheduler_from_string(policy, preemptive)
+        scheduler.load(task_list)
+        for _ in range(150):
+            scheduler.step()
+        save_snapshot(scheduler, self.path)
+        restored = load_snapshot(self.path, get_scheduler_from_string(policy, preemptive))
+        restored.run()
+        self.assertEqual(slices(restored), slices(reference))
+        self.assertEqual(restored.scheduled_tasks.metrics.as_dict(),
+                         reference.scheduled_tasks.metrics.as_dict())
+
+    def test_resume_mid_run(self):
+        for policy in ("EDF", "RR", "PRIO", "STRIDE", "MLFQ"):
+            for preemptive in (False, True):
+                with self.subTest(policy=policy, preemptive=preemptive):
+                    self.assertResumes(policy, preemptive, workload())
+
+    def test_resume_table(self):
+        self.assertResumes("SJF", True, TaskTable.from_tasks(workload()))
+
+    def test_resume_with_prerequisites(self):
+        task_list = workload()
+        for task in task_list[5:]:
+            task.prerequisite = (task.id - 5,)
+        self.assertResumes("EDF", True, task_list)
+
+    def test_finished_run(self):
+        scheduler = get_scheduler_from_string("EDF", False)
+        scheduler.schedule(workload())
+        save_snapshot(scheduler, self.path)
+        restored = load_snapshot(self.path, get_scheduler_from_string("EDF", False))
+        self.assertEqual(restored.scheduled_tasks.makespan, scheduler.scheduled_tasks.makespan)
+        self.assertEqual(slices(restored), slices(scheduler))
+
+    def test_wrong_policy(self):
+        save_snapshot(get_scheduler_from_string("EDF", False), self.path)
+        with self.assertRaises(AssertionError):
+            load_snapshot(self.path, get_scheduler_from_string("SJF", False))
+
+    def test_session_recovery(self):
+        wal_path = os.path.join(self.directory, 'changes.wal')
+        task_list = workload()
+        session = SchedulingSession(get_scheduler_from_string("EDF", True), task_list[:100],
+                                    wal=WriteAheadLog(wal_path))
+        save_session(session, self.path)
+        session.wal.truncate()
+        for task in task_list[100:]:
+            session.insert(task)
+        session.update(3, deadline=5)
+        session.remove(4)
+        session.insert(Task(name="X", id=1000, arrival_time=2.5, estimated_time=1.5, deadline=9))
+        session.wal.close()
+
+        recovered = load_session(self.path, get_scheduler_from_string("EDF", True))
+        self.assertEqual(slices(recovered.scheduler), slices(
+            SchedulingSession(get_scheduler_from_string("EDF", True), task_list[:100]).scheduler))
+        self.assertEqual(replay(wal_path, recovered), len(task_list) - 100 + 3)
+        self.assertEqual(slices(recovered.scheduler), slices(session.scheduler))
+        self.assertEqual(recovered.by_id[1000].estimated_time, 1.5)
+
+    def test_torn_record(self):
+        wal_path = os.path.join(self.directory, 'changes.wal')
+        wal = WriteAheadLog(wal_path)
+        wal.remove(1)
+        wal.update(2, deadline=7.5)
+        wal.close()
+        with open(wal_path, 'ab') as f:
+            f.write(b'\x01\x40\x00\x00\x00')  # Header cut short by a crash
+        self.assertEqual(list(read_records(wal_path)), [(2, (1,)), (3, (2, None, 7.5, None))])
+
+
+if __name__ == '__main__':
+    unittest.main()
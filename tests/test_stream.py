@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.scheduler import random_workload
+from life_scheduler.workload import Workload, Poisson, write_trace, read_trace
+
+import copy
+import os
+import tempfile
+import unittest
+
+
+def records(slices):
+    return [(s.task_id, s.start, s.length, s.remaining_after) for s in slices]
+
+
+class StreamTestSuite(unittest.TestCase):
+    """Streaming scheduler input."""
+
+    def test_same_as_load(self):
+        task_list = random_workload(300, 5)
+        for policy in ("EDF", "RR", "SJF", "STRIDE", "MLFQ"):
+            for preemptive in (False, True):
+                with self.subTest(policy=policy, preemptive=preemptive):
+                    reference = get_scheduler_from_string(policy, preemptive)
+                    reference.schedule(task_list)
+                    scheduler = get_scheduler_from_string(policy, preemptive)
+                    streamed = records(scheduler.stream(iter(copy.deepcopy(task_list))))
+                    self.assertEqual(streamed, records(reference.scheduled_tasks.slices))
+                    self.assertEqual(scheduler.scheduled_tasks.metrics.as_dict(),
+                                     reference.scheduled_tasks.metrics.as_dict())
+
+    def test_bounded_state(self):
+        scheduler = get_scheduler_from_string("EDF", True)
+        most_pending = 0
+        for _ in scheduler.stream(Workload(5000, 2, Poisson(0.015))):
+            most_pending = max(most_pending, len(scheduler.pending))
+        self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 5000)
+        self.assertEqual((len(scheduler.completed), len(scheduler.scheduled_tasks.slices)), (0, 0))
+        self.assertLess(most_pending, 100)
+
+    def test_from_trace(self):
+        path = os.path.join(tempfile.mkdtemp(), 'trace.csv.gz')
+        write_trace(Workload(500, 4), path)
+        scheduler = get_scheduler_from_string("SJF", True)
+        streamed = records(scheduler.stream(read_trace(path)))
+        reference = get_scheduler_from_string("SJF", True)
+        reference.schedule(Workload(500, 4).tasks())
+        self.assertEqual(streamed, records(reference.scheduled_tasks.slices))
+
+    def test_out_of_order(self):
+        task_list = [Task(name="A", id=0, arrival_time=5, estimated_time=1, deadline=10),
+                     Task(name="B", id=1, arrival_time=2, estimated_time=1, deadline=10)]
+        with self.assertRaises(AssertionError):
+            list(get_scheduler_from_string("EDF", False).stream(task_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
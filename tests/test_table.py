@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.scheduler import random_workload
+from life_scheduler.table import TaskTable, read_csv, write_csv, read_parquet, write_parquet
+
+import os
+import random
+import tempfile
+import unittest
+
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+def timeline(scheduled):
+    return ([(s.task_id, s.start, s.length) for s in scheduled.slices],
+            scheduled.makespan, scheduled.lateness, scheduled.deadline_missed)
+
+
+def attributes(task):
+    return (task.id, task.name, task.arrival_time, task.estimated_time, task.deadline,
+            task.priority, task.min_quantum, task.preemptible, tuple(task.prerequisite))
+
+
+def mixed_workload():
+    # Unsorted float and int arrivals, names, a few prerequisites
+    rng = random.Random(4)
+    task_list = random_workload(50, seed=4)
+    rng.shuffle(task_list)
+    for task in task_list[::3]:
+        task.arrival_time += 0.5
+        task.preemptible = False
+    task_list[10].prerequisite = [task_list[3].id, task_list[7].id]
+    return task_list
+
+
+class TableTestSuite(unittest.TestCase):
+    """Columnar task storage."""
+
+    def test_slots(self):
+        task = Task(name="A", id=0, arrival_time=0, estimated_time=3, deadline=10)
+        self.assertFalse(hasattr(task, '__dict__'))
+        self.assertEqual(task.prerequisite, ())
+        task.add_scheduled_time(0, 3)
+        self.assertEqual(task.scheduled_time, [(0, 3)])
+
+    def test_round_trip(self):
+        task_list = mixed_workload()
+        table = TaskTable.from_tasks(task_list)
+        self.assertEqual([attributes(t) for t in table], [attributes(t) for t in task_list])
+        self.assertEqual(table.columns['id'].typecode, 'q')
+        self.assertEqual(table.columns['arrival_time'].typecode, 'd')
+        with self.assertRaises(AssertionError):
+            TaskTable({'id': [0], 'arrival_time': [0], 'deadline': [None]})
+        with self.assertRaisesRegex(AssertionError, "Missing column"):
+            TaskTable({'id': [0], 'arrival_time': [0]})
+
+    def test_schedule_table(self):
+        task_list = mixed_workload()
+        table = TaskTable.from_tasks(task_list)
+        for name in ["FCFS", "EDF", "RR", "SJF", "LJF"]:
+            for preemptive in (False, True):
+                expected = get_scheduler_from_string(name, preemptive)
+                expected.schedule(task_list)
+                actual = get_scheduler_from_string(name, preemptive)
+                actual.schedule(table)
+                self.assertEqual(timeline(actual.scheduled_tasks), timeline(expected.scheduled_tasks))
+
+    def test_lazy_load(self):
+        table = TaskTable.from_tasks(random_workload(1000))
+        built = []
+        get = TaskTable.__getitem__
+        table.__class__ = type('CountingTable', (TaskTable,),
+                               {'__getitem__': lambda self, row: built.append(row) or get(self, row)})
+        scheduler = get_scheduler_from_string("EDF", True)
+        scheduler.load(table)
+        self.assertLessEqual(len(built), 2)
+        scheduler.run()
+        self.assertEqual(sorted(built), list(range(1000)))
+
+    def test_csv(self):
+        table = TaskTable.from_tasks(mixed_workload())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.csv')
+            write_csv(table, path)
+            loaded = read_csv(path)
+        self.assertEqual([attributes(t) for t in loaded], [attributes(t) for t in table])
+
+        plain = TaskTable({'id': [0, 1], 'arrival_time': [0, 2], 'deadline': [5, 9]})
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.csv')
+            write_csv(plain, path)
+            loaded = read_csv(path)
+        self.assertEqual([t.name for t in loaded], ["Task_0", "Task_1"])
+        self.assertIsNone(loaded.prerequisite)
+
+    @unittest.skipUnless(pyarrow, "pyarrow not installed")
+    def test_parquet(self):
+        table = TaskTable.from_tasks(mixed_workload())
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'tasks.parquet')
+            write_parquet(table, path)
+            loaded = read_parquet(path)
+        self.assertEqual([attributes(t) for t in loaded], [attributes(t) for t in table])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.scheduler import random_workload
+from life_scheduler.service import SchedulingService
+from life_scheduler.session import SchedulingSession
+
+import asyncio
+import random
+import unittest
+
+
+def scan(slices, start, end):
+    # What the index answers, by brute force
+    return [s for s in slices if s.end > start and s.start < end]
+
+
+class TimelineTestSuite(unittest.TestCase):
+    """Timeline queries over the scheduled slices."""
+
+    def test_queries(self):
+        rng = random.Random(4)
+        task_list = random_workload(300, 9)
+        for policy, preemptive in (("FCFS", False), ("RR", True), ("EDF", True)):
+            scheduler = get_scheduler_from_string(policy, preemptive)
+            scheduler.schedule(task_list)
+            scheduled = scheduler.scheduled_tasks
+            slices = scheduled.slices
+            horizon = slices[-1].end
+            with self.subTest(policy=policy, preemptive=preemptive):
+                for _ in range(200):
+                    start = rng.uniform(-10, horizon + 10)
+                    end = start + rng.uniform(0, horizon / 10)
+                    self.assertEqual(scheduled.between(start, end), scan(slices, start, end))
+                    self.assertEqual(scheduled.count_between(start, end),
+                                     len(scan(slices, start, end)))
+                    running = scan(slices, start, start + 1e-9)
+                    self.assertIs(scheduled.at(start), running[0] if running else None)
+                    upcoming = [s for s in slices if s.end > start]
+                    self.assertIs(scheduled.next_slice(start), upcoming[0] if upcoming else None)
+                    task = rng.choice(task_list).id
+                    self.assertEqual(scheduled.slices_of(task, start, end),
+                                     [s for s in scan(slices, start, end) if s.task_id == task])
+                # Boundaries: a slice covers [start, end)
+                first = slices[0]
+                self.assertIs(scheduled.at(first.start), first)
+                self.assertIsNot(scheduled.at(first.end), first)
+                self.assertEqual(scheduled.between(first.end, first.end), [])
+                task = task_list[7].id
+                self.assertEqual(scheduled.slices_of(task),
+                                 [s for s in slices if s.task_id == task])
+
+    def test_pages(self):
+        scheduler = get_scheduler_from_string("RR", True)
+        scheduler.schedule(random_workload(200, 2))
+        scheduled = scheduler.scheduled_tasks
+        everything = scheduled.between(100, 5000)
+        pages = [scheduled.between(100, 5000, offset, 25)
+                 for offset in range(0, len(everything) + 25, 25)]
+        self.assertEqual(sum(pages, []), everything)
+        self.assertEqual(pages[-1], [])
+        task = scheduled.slices[3].task_id
+        self.assertEqual(scheduled.slices_of(task, offset=1, limit=2),
+                         scheduled.slices_of(task)[1:3])
+        with self.assertRaises(AssertionError):
+            scheduled.between(offset=-1)
+
+    def test_growing_and_rewinding(self):
+        # The index follows slices added after a query and rewinds with the log
+        rng = random.Random(1)
+        task_list = random_workload(80, 3)
+        session = SchedulingSession(get_scheduler_from_string("EDF", True), task_list,
+                                    checkpoint_interval=4)
+        log = session.scheduler.scheduled_tasks
+        for _ in range(15):
+            log.between(rng.uniform(0, 2000), 3000)  # Indexes what is there now
+            session.remove(rng.choice(session.tasks).id)
+            log = session.scheduler.scheduled_tasks
+            self.assertEqual(log.between(), log.slices)
+            for task in session.tasks:
+                self.assertEqual(log.slices_of(task.id),
+                                 [s for s in log.slices if s.task_id == task.id])
+            published = session.scheduled_tasks
+            self.assertEqual(published.between(500, 1500), scan(published.slices, 500, 1500))
+
+    def test_service(self):
+        live = SchedulingService(get_scheduler_from_string("RR", True),
+                                 [Task(name="A", id=0, arrival_time=0, estimated_time=30, deadline=100),
+                                  Task(name="B", id=1, arrival_time=0, estimated_time=30, deadline=100)],
+                                 clock=lambda: 0)
+        everything = live.list_slices()
+        self.assertEqual(live.list_slices(offset=2, limit=3), everything[2:5])
+        self.assertEqual(live.list_slices(start=15, end=35),
+                         [s for s in everything if s['end'] > 15 and s['start'] < 35])
+        self.assertEqual(live.list_slices(task=1), [s for s in everything if s['task_id'] == 1])
+        self.assertEqual(live.next_task(5)['until'], everything[0]['end'])
+        # As the front end asks for it
+        query = {'start': ['15'], 'offset': ['1'], 'limit': ['2'], 'task': ['0']}
+        self.assertEqual(asyncio.run(live.route('GET', '/schedule', query, {})),
+                         live.list_slices(start=15, offset=1, limit=2, task=0))
+
+
+if __name__ == '__main__':
+    unittest.main()
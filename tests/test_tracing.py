@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+from life_scheduler.tracing import RingBufferSink, JSONLinesSink, ChromeTraceSink
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+
+def two_tasks():
+    return [Task(name="A", id=0, arrival_time=0, estimated_time=3, deadline=10, min_quantum=2),
+            Task(name="B", id=1, arrival_time=1, estimated_time=2, deadline=5)]
+
+
+class TracingTestSuite(unittest.TestCase):
+    """Structured tracing."""
+
+    def test_ring_buffer(self):
+        scheduler = get_scheduler_from_string("EDF", False)
+        sink = scheduler.add_trace_sink(RingBufferSink())
+        scheduler.schedule(two_tasks())
+        self.assertEqual([(e.time, e.kind, e.task_name) for e in sink],
+                         [(0, 'arrive', 'A'), (0, 'dispatch', 'A'), (1, 'arrive', 'B'),
+                          (3, 'retire', 'A'), (3, 'dispatch', 'B'), (5, 'retire', 'B')])
+
+        small = RingBufferSink(capacity=3)
+        scheduler = get_scheduler_from_string("EDF", False)
+        scheduler.add_trace_sink(small)
+        scheduler.schedule(two_tasks())
+        self.assertEqual([e.kind for e in small], ['retire', 'dispatch', 'retire'])
+
+    def test_preemption(self):
+        scheduler = get_scheduler_from_string("EDF", True)
+        sink = scheduler.add_trace_sink(RingBufferSink())
+        scheduler.schedule(two_tasks())
+        self.assertEqual([(e.time, e.kind, e.task_name) for e in sink if e.kind != 'quota-refill'],
+                         [(0, 'arrive', 'A'), (0, 'dispatch', 'A'),
+                          (1, 'arrive', 'B'), (1, 'preempt', 'A'), (1, 'dispatch', 'B'),
+                          (3, 'retire', 'B'), (3, 'dispatch', 'A'), (5, 'retire', 'A')])
+
+    def test_quota_refill(self):
+        scheduler = get_scheduler_from_string("RR", True)
+        sink = scheduler.add_trace_sink(RingBufferSink())
+        scheduler.schedule([Task(name="A", id=0, arrival_time=0, estimated_time=5, deadline=10, min_quantum=2),
+                            Task(name="B", id=1, arrival_time=1, estimated_time=1, deadline=5)])
+        # Each preemptive dispatch starts a fresh quantum
+        self.assertEqual([(e.time, e.task_name) for e in sink if e.kind == 'quota-refill'],
+                         [(e.time, e.task_name) for e in sink if e.kind == 'dispatch'])
+
+    def test_off_does_no_formatting(self):
+        scheduler = get_scheduler_from_string("RR", True)
+        self.assertIsNone(scheduler.tracer)
+        with mock.patch.object(Task, 'name_elasped_time', side_effect=AssertionError), \
+                mock.patch('builtins.print', side_effect=AssertionError):
+            scheduler.schedule(two_tasks())
+
+    def test_file_sinks(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'trace.json')
+            lines = io.StringIO()
+            scheduler = get_scheduler_from_string("EDF", True)
+            scheduler.add_trace_sink(JSONLinesSink(lines))
+            scheduler.add_trace_sink(ChromeTraceSink(path))
+            scheduler.schedule(two_tasks())
+            scheduler.tracer.close()
+
+            events = [json.loads(line) for line in lines.getvalue().splitlines()]
+            self.assertEqual(len(events), 11)
+            self.assertEqual(events[0], {'time': 0, 'kind': 'arrive', 'task_id': 0,
+                                         'task_name': 'A', 'remaining_time': 3})
+
+            with open(path) as f:
+                trace = json.load(f)
+            slices = [(e['ph'], e['ts'], e['name']) for e in trace if e['ph'] in 'BE']
+            self.assertEqual(slices, [('B', 0, 'A'), ('E', 1000, 'A'), ('B', 1000, 'B'), ('E', 3000, 'B'),
+                                      ('B', 3000, 'A'), ('E', 5000, 'A')])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+
+from .context import Task, get_scheduler_from_string
+
+import unittest
+
+
+def task(id, arrival_time, estimated_time, priority, deadline=1000, min_quantum=20):
+    return Task(name=str(id), id=id, arrival_time=arrival_time, estimated_time=estimated_time,
+                deadline=deadline, priority=priority, min_quantum=min_quantum)
+
+
+def run(name, task_list, preemptive=False):
+    scheduler = get_scheduler_from_string(name, preemptive)
+    scheduler.schedule(task_list)
+    return scheduler
+
+
+class WeightedTestSuite(unittest.TestCase):
+    """Policies using Task.priority."""
+
+    def test_wspt(self):
+        # Ratios 10/1, 10/5, 4/1: weighted shortest first
+        scheduler = run("WSPT", [task(0, 0, 10, 1), task(1, 0, 10, 5), task(2, 0, 4, 1)])
+        self.assertEqual([s.task_id for s in scheduler.scheduled_tasks.slices], [1, 2, 0])
+        metrics = scheduler.scheduled_tasks.metrics
+        # Finish times 10, 14, 24
+        self.assertEqual(metrics.weighted_flow_time, 5 * 10 + 1 * 14 + 1 * 24)
+
+    def test_weighted_tardiness(self):
+        scheduler = run("FCFS", [task(0, 0, 10, 2, deadline=4), task(1, 0, 10, 3, deadline=30)])
+        self.assertEqual(scheduler.scheduled_tasks.metrics.weighted_tardiness, 2 * 6)
+
+    def test_priority_aging(self):
+        # A stream of important tasks keeps the CPU busy. Without aging the
+        # unimportant one would wait for all of them; at aging_rate 0.01 it
+        # makes up its priority gap of 1 after 100 time units.
+        task_list = [task(0, 0.5, 5, 1)] + [task(i, 5 * (i - 1), 5, 2) for i in range(1, 400)]
+        scheduler = run("PRIO", task_list)
+        start = next(s.start for s in scheduler.scheduled_tasks.slices if s.task_id == 0)
+        self.assertTrue(100 <= start <= 110, start)
+        # Waiting tasks never overtake each other by aging alone
+        scheduler = run("PRIO", [task(0, 1, 5, 1)] + [task(i, 0, 5, 2) for i in range(1, 50)])
+        self.assertEqual(scheduler.scheduled_tasks.slices[-1].task_id, 0)
+
+    def test_set_priority(self):
+        scheduler = get_scheduler_from_string("PRIO")
+        task_list = [task(0, 0, 5, 1), task(1, 1, 5, 1), task(2, 1, 5, 2)]
+        scheduler.load(task_list)
+        scheduler.step()
+        scheduler.step()  # Both arrivals at 1
+        self.assertEqual(scheduler.pending.peek().id, 2)
+        scheduler.set_priority(task_list[1], 3)
+        self.assertEqual(scheduler.pending.peek().id, 1)
+        scheduler.run()
+        self.assertEqual([s.task_id for s in scheduler.scheduled_tasks.slices], [0, 1, 2])
+
+    def test_stride_shares(self):
+        # Always-busy tasks with weights 1 and 3: while both are running the
+        # heavier one gets three times the CPU
+        scheduler = run("STRIDE", [task(0, 0, 1000, 1, min_quantum=1), task(1, 0, 1000, 3, min_quantum=1),
+                                   task(2, 400, 1, 1)], preemptive=True)
+        ran = {0: 0, 1: 0}
+        for s in scheduler.scheduled_tasks.slices:
+            if s.task_id in ran and s.start < 400:
+                ran[s.task_id] += min(s.end, 400) - s.start
+        self.assertAlmostEqual(ran[1] / ran[0], 3, delta=0.1)
+        # The late arrival joins at the current virtual time and runs soon
+        late = next(s for s in scheduler.scheduled_tasks.slices if s.task_id == 2)
+        self.assertLess(late.start, 410)
+
+    def test_registered(self):
+        for name in ["WSPT", "PRIO", "STRIDE"]:
+            for preemptive in (False, True):
+                scheduler = run(name, [task(i, i % 7, 3 + i % 5, 1 + i % 3) for i in range(30)], preemptive)
+                self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
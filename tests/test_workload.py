@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+from .context import get_scheduler_from_string
+
+from life_scheduler.table import read_csv
+from life_scheduler.workload import (Workload, Poisson, Bursty, Diurnal, UniformArrivals, Batch,
+                                     Pareto, LogNormal, SlackFactor, PriorityMix, RandomDAG,
+                                     write_trace, read_trace)
+
+import itertools
+import os
+import random
+import tempfile
+import unittest
+
+
+def fields(task):
+    return (task.id, task.arrival_time, task.estimated_time, task.deadline,
+            task.priority, task.prerequisite)
+
+
+class WorkloadTestSuite(unittest.TestCase):
+    """Synthetic workload generator."""
+
+    def test_arrival_processes(self):
+        for arrivals in (Poisson(), Bursty(), Diurnal(), UniformArrivals(), Batch()):
+            with self.subTest(arrivals=type(arrivals).__name__):
+                workload = Workload(500, 1, arrivals)
+                times = [task.arrival_time for task in workload]
+                self.assertEqual(len(times), 500)
+                self.assertEqual(times, sorted(times))
+                # Same seed, same trace
+                self.assertEqual(list(map(fields, workload)), list(map(fields, Workload(500, 1, arrivals))))
+
+    def test_lazy(self):
+        # Nothing is generated up front
+        first = next(iter(Workload(10 ** 12, 3)))
+        self.assertEqual(first.id, 0)
+        head = list(itertools.islice(Workload(10 ** 12, 3), 5))
+        self.assertEqual([task.id for task in head], list(range(5)))
+
+    def test_diurnal_rate(self):
+        times = Diurnal(rate=1, amplitude=0.9, period=100).times(random.Random(5), 20000)
+        phases = [time % 100 for time in times]
+        day = sum(1 for phase in phases if phase < 50)
+        self.assertGreater(day, 3 * (len(phases) - day))
+
+    def test_uniform_arrivals(self):
+        times = list(UniformArrivals(horizon=1000).times(random.Random(2), 10000))
+        self.assertTrue(0 <= times[0] and times[-1] <= 1000)
+        self.assertAlmostEqual(sum(times) / len(times), 500, delta=15)
+
+    def test_distributions(self):
+        rng = random.Random(4)
+        bounded = [Pareto(10, 1.1, maximum=1000).sample(rng) for _ in range(5000)]
+        self.assertTrue(all(10 <= value <= 1000 for value in bounded))
+        self.assertGreater(max(bounded), 300)  # The tail is there
+        mix = PriorityMix({1: 0.7, 5: 0.3})
+        draws = [mix.sample(rng) for _ in range(5000)]
+        self.assertAlmostEqual(draws.count(5) / len(draws), 0.3, delta=0.03)
+        self.assertTrue(all(duration * 1.5 <= SlackFactor().sample(rng, duration) <= duration * 4
+                            for duration in (1, 10, 100)))
+
+    def test_prerequisites(self):
+        workload = Workload(300, 7, durations=LogNormal(), slack=SlackFactor(),
+                            priorities=PriorityMix({1: 1, 2: 1}),
+                            prerequisites=RandomDAG(0.2, window=5, max_prerequisites=2))
+        task_list = workload.tasks()
+        self.assertTrue(any(task.prerequisite for task in task_list))
+        for task in task_list:
+            self.assertLessEqual(len(task.prerequisite), 2)
+            self.assertTrue(all(task.id - 5 <= id < task.id for id in task.prerequisite))
+        scheduler = get_scheduler_from_string("EDF", True)
+        scheduler.schedule(task_list)
+        self.assertEqual(scheduler.scheduled_tasks.metrics.num_finished, 300)
+
+    def test_trace_round_trip(self):
+        workload = Workload(200, 9, Bursty(), prerequisites=RandomDAG(0.1))
+        directory = tempfile.mkdtemp()
+        for name in ('trace.csv', 'trace.csv.gz'):
+            path = os.path.join(directory, name)
+            self.assertEqual(write_trace(workload, path), 200)
+            self.assertEqual(list(map(fields, read_trace(path))), list(map(fields, workload)))
+        table = read_csv(os.path.join(directory, 'trace.csv'))
+        self.assertEqual(list(map(fields, table)), list(map(fields, workload)))
+
+
+if __name__ == '__main__':
+    unittest.main()